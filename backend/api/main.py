@@ -1,14 +1,28 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import RedirectResponse
 import logging
 from pathlib import Path
+import os
 from contextlib import asynccontextmanager
+from prometheus_client import REGISTRY
+from prometheus_client import multiprocess
 
 from .models import ModelLoader
-from .routers import predict_router, health_router, foods_router
-from .routers import predict, health
+from .routers import predict_router, health_router, foods_router, admin_router
+from .routers import predict, health, admin, metrics
 from .routers.metrics import router as metrics_router
+from .services import (
+    InferenceExecutor,
+    MicroBatcher,
+    ModelWatcher,
+    PredictionCache,
+    PredictionMetricsMiddleware,
+    RuntimeCollector,
+    observe_predictions,
+    prune_dead_workers
+)
+from .services.http_cache import StaticBody
 
 # Setup logging
 logging.basicConfig(
@@ -17,16 +31,83 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Model loader is created on startup; models load in the background
+model_loader = None
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    global model_loader
     # Startup
+    logger.info("Initializing MzeeChakula API...")
+    model_loader = ModelLoader(lazy=True)
+    model_loader.metrics_observer = observe_predictions
+    if os.getenv('PREDICTION_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes'):
+        cache = PredictionCache()
+        model_loader.prediction_cache = cache
+        shared = f", shared via {cache.sqlite_path}" if cache.sqlite_path else ""
+        logger.info(f"Prediction cache: {cache.max_entries} entries, TTL {cache.ttl:g}s{shared}")
+
+    # Inject model loader into routers
+    predict.set_model_loader(model_loader)
+    health.set_model_loader(model_loader)
+    admin.set_model_loader(model_loader)
+
+    # Local models load in parallel and remote artifacts are fetched in the
+    # background, so connections (and /health) are served immediately
+    model_loader.start()
+
     logger.info("MzeeChakula Nutrition API Started")
     logger.info("Documentation: http://localhost:8000/docs")
     logger.info("Health Check: http://localhost:8000/health")
     logger.info("Prediction: http://localhost:8000/predict")
+    inference_executor = InferenceExecutor()
+    predict.set_inference_executor(inference_executor)
+    logger.info(
+        f"Inference executor: {inference_executor.max_workers} workers, "
+        f"queue limit {inference_executor.max_queue}"
+    )
+    micro_batcher = None
+    if os.getenv('PREDICT_BATCHING_ENABLED', 'false').lower() in ('1', 'true', 'yes'):
+        micro_batcher = MicroBatcher(predict.score_batch)
+        predict.set_micro_batcher(micro_batcher)
+        logger.info(
+            f"Micro-batching enabled: {micro_batcher.max_wait * 1000:g} ms window, "
+            f"max {micro_batcher.max_batch_size} rows"
+        )
+    runtime_collector = RuntimeCollector(model_loader, inference_executor, micro_batcher)
+    metrics.set_runtime_collector(runtime_collector)
+    if metrics.MULTIPROCESS_DIR:
+        dead = prune_dead_workers(metrics.MULTIPROCESS_DIR)
+        runtime_collector.start()
+        logger.info(
+            f"Multiprocess metrics in {metrics.MULTIPROCESS_DIR}"
+            + (f" (cleared gauges of exited workers {dead})" if dead else "")
+        )
+    else:
+        REGISTRY.register(runtime_collector)
+    model_watcher = None
+    if os.getenv('MODEL_WATCH_ENABLED', 'false').lower() in ('1', 'true', 'yes'):
+        model_watcher = ModelWatcher(model_loader)
+        model_watcher.start()
+        logger.info(f"Watching {model_loader.local_model_dir} for new models every {model_watcher.interval:g}s")
     yield
     # Shutdown
     logger.info("MzeeChakula API shutting down...")
+    metrics.set_runtime_collector(None)
+    if metrics.MULTIPROCESS_DIR:
+        await runtime_collector.close()
+        # Remove this worker's live gauges; its counters and histograms stay in the totals
+        multiprocess.mark_process_dead(os.getpid(), metrics.MULTIPROCESS_DIR)
+    else:
+        REGISTRY.unregister(runtime_collector)
+    if model_watcher is not None:
+        await model_watcher.close()
+    if micro_batcher is not None:
+        predict.set_micro_batcher(None)
+        await micro_batcher.close()
+    predict.set_inference_executor(None)
+    inference_executor.shutdown()
 
 # Creating FastAPI app
 app = FastAPI(
@@ -62,34 +143,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Cursor", "ETag"],
 )
 
-# Initialize model loader
-logger.info("Initializing MzeeChakula API...")
-try:
-    model_loader = ModelLoader()
-    
-    # Inject model loader into routers
-    predict.set_model_loader(model_loader)
-    health.set_model_loader(model_loader)
-    
-    available_models = model_loader.get_available_models()
-    logger.info("Available models:")
-    for name, info in available_models.items():
-        if info['available']:
-            logger.info(f"{name}: {info['type']} ({info['size']})")
-        else:
-            logger.info(f"{name}: Not available")
-
-except Exception as e:
-    logger.error(f"Failed to initialize models: {e}")
-    raise
+# Validation, serialization and end-to-end timings for /predict endpoints
+app.add_middleware(PredictionMetricsMiddleware)
 
 # Include routers
 app.include_router(health_router)
 app.include_router(predict_router)
 app.include_router(metrics_router)
 app.include_router(foods_router)
+app.include_router(admin_router)
 
 
 @app.get("/", include_in_schema=False)
@@ -98,11 +163,7 @@ async def root():
     return RedirectResponse(url="/docs")
 
 
-@app.get("/api/info", tags=["Info"])
-async def api_info():
-    """
-    Get API information and available endpoints.
-    """
+def api_info_payload() -> dict:
     return {
         "name": "MzeeChakula Nutrition API",
         "version": "1.0.0",
@@ -122,6 +183,21 @@ async def api_info():
         "repository": "https://huggingface.co/Shakiran/MzeeChakula_Model"
     }
 
+
+# Serialized once per model load or reload instead of on every request
+api_info_body = StaticBody(
+    api_info_payload,
+    version=lambda: (id(model_loader), model_loader.generation if model_loader else None)
+)
+
+
+@app.get("/api/info", tags=["Info"])
+async def api_info(request: Request):
+    """
+    Get API information and available endpoints.
+    """
+    return api_info_body.respond(request)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
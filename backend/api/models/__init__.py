@@ -8,7 +8,15 @@ from .schemas import (
     EncodingReference,
     ModelStatus,
     BatchPredictionInput,
-    BatchPredictionResponse
+    BatchPredictionResponse,
+    ColumnarBatchInput,
+    ColumnarBatchResponse,
+    CatalogueScoreInput,
+    CatalogueScoreResponse,
+    MealPlanInput,
+    MealPlanResponse,
+    BatchRecommendationInput,
+    ModelReloadRequest
 )
 from .loader import ModelLoader
 
@@ -22,5 +30,13 @@ __all__ = [
     'ModelStatus',
     'BatchPredictionInput',
     'BatchPredictionResponse',
+    'ColumnarBatchInput',
+    'ColumnarBatchResponse',
+    'CatalogueScoreInput',
+    'CatalogueScoreResponse',
+    'MealPlanInput',
+    'MealPlanResponse',
+    'BatchRecommendationInput',
+    'ModelReloadRequest',
     'ModelLoader'
 ]
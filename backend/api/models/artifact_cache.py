@@ -0,0 +1,206 @@
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import logging
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# File name hints used to assign a role to each snapshot file
+METADATA_HINTS = ('meta', 'items', 'foods')
+MODEL_HINTS = ('xgboost', 'nutrition_model')
+
+HASH_CHUNK_BYTES = 1 << 20
+
+# Blobs are stored as blobs/<sha256><suffix>
+BLOB_NAME = re.compile(r'[0-9a-f]{64}')
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def artifact_tag(path: Path) -> str:
+    """
+    Short version tag for an artifact, without reading its contents.
+
+    Cache blobs are named by the sha256 their manifest records, so that is
+    reused; any other file is tagged by its size and mtime, like the model
+    watcher's fingerprints.
+    """
+    path = Path(path)
+    if path.parent.name == 'blobs' and BLOB_NAME.fullmatch(path.stem):
+        return path.stem[:12]
+    stat = path.stat()
+    return hashlib.sha256(f"{stat.st_size}:{stat.st_mtime_ns}".encode()).hexdigest()[:12]
+
+
+def assign_roles(files) -> Dict[str, str]:
+    """
+    Pick the embeddings, metadata and model file from snapshot-relative paths.
+
+    Mirrors the rules the loader used when walking a snapshot: JSON embeddings
+    win over ``.npy`` ones and the last matching metadata file is used.
+    """
+    roles: Dict[str, str] = {}
+    ordered = sorted(files)
+    for rel in ordered:
+        name = Path(rel).name.lower()
+        if name.endswith('.json') and 'embedd' in name:
+            roles['embeddings'] = rel
+        if name.endswith('.json') and any(hint in name for hint in METADATA_HINTS):
+            roles['metadata'] = rel
+    if 'embeddings' not in roles:
+        for rel in ordered:
+            name = Path(rel).name.lower()
+            if name.endswith('.npy') and 'embedd' in name:
+                roles['embeddings'] = rel
+                break
+    for rel in ordered:
+        name = Path(rel).name.lower()
+        if name.endswith('.pkl') and any(hint in name for hint in MODEL_HINTS):
+            roles['model'] = rel
+            break
+    return roles
+
+
+class ArtifactCache:
+    """
+    Local content-addressed cache of Hugging Face repo snapshots.
+
+    Each fetched file is stored once under ``blobs/<sha256><suffix>`` and a
+    per-repo manifest records the revision, every file's hash and size, and the
+    file resolved for each role (``model``, ``embeddings``, ``metadata``).
+    Later starts resolve straight from the manifest: no network access and no
+    directory walk. The snapshot is only fetched again when ``refresh`` is
+    requested or the manifest is missing or points at missing blobs.
+
+    ``source_dir`` (default ``HF_ARTIFACT_SOURCE_DIR``) is a local directory laid
+    out like the hub (``<source_dir>/<owner>/<repo>/...``); when set it is used
+    instead of ``snapshot_download`` so the cache can be filled offline.
+    """
+
+    def __init__(self, cache_dir, source_dir: Optional[str] = None):
+        self.cache_dir = Path(cache_dir)
+        source_dir = source_dir or os.getenv('HF_ARTIFACT_SOURCE_DIR')
+        self.source_dir = Path(source_dir) if source_dir else None
+
+    def manifest_path(self, repo_id: str) -> Path:
+        return self.cache_dir / 'manifests' / f"{repo_id.replace('/', '--')}.json"
+
+    def blob_path(self, sha256: str, suffix: str = '') -> Path:
+        return self.cache_dir / 'blobs' / f"{sha256}{suffix}"
+
+    def read_manifest(self, repo_id: str) -> Optional[Dict]:
+        path = self.manifest_path(repo_id)
+        if not path.exists():
+            return None
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable artifact manifest {path.name}: {e}")
+            return None
+
+    def _roles_from_manifest(self, manifest: Dict) -> Optional[Dict[str, Path]]:
+        """Map each role to its blob, or None if any referenced blob is missing."""
+        roles = {}
+        for role, rel in manifest.get('roles', {}).items():
+            entry = manifest['files'].get(rel)
+            if entry is None:
+                return None
+            blob = self.blob_path(entry['sha256'], Path(rel).suffix)
+            if not blob.exists() or blob.stat().st_size != entry['size']:
+                return None
+            roles[role] = blob
+        return roles
+
+    def resolve(self, repo_id: str, refresh: bool = False,
+                fetch: Optional[Callable[[str], str]] = None) -> Dict[str, Path]:
+        """
+        Return ``{role: path}`` for ``repo_id``, fetching the snapshot only if needed.
+
+        ``fetch`` downloads the repo and returns its local directory (normally
+        ``snapshot_download``). If a refresh fails, the existing manifest is used.
+        """
+        manifest = self.read_manifest(repo_id)
+        if manifest is not None and not refresh:
+            roles = self._roles_from_manifest(manifest)
+            if roles is not None:
+                logger.info(f"Resolved {repo_id}@{manifest['revision'][:12]} from artifact cache")
+                return roles
+            logger.info(f"Artifact cache for {repo_id} is incomplete; fetching again")
+
+        try:
+            manifest = self.fetch(repo_id, fetch)
+        except Exception:
+            cached = self.read_manifest(repo_id)
+            roles = self._roles_from_manifest(cached) if cached else None
+            if roles is None:
+                raise
+            logger.warning(f"Refreshing {repo_id} failed; using cached revision {cached['revision'][:12]}")
+            return roles
+        return self._roles_from_manifest(manifest)
+
+    def _snapshot_dir(self, repo_id: str, fetch: Optional[Callable[[str], str]]) -> Path:
+        if self.source_dir is not None:
+            repo_dir = self.source_dir / repo_id
+            if not repo_dir.is_dir():
+                raise FileNotFoundError(f"{repo_id} not found under {self.source_dir}")
+            return repo_dir
+        if fetch is None:
+            raise RuntimeError(f"No source available to fetch {repo_id}")
+        return Path(fetch(repo_id))
+
+    def fetch(self, repo_id: str, fetch: Optional[Callable[[str], str]] = None) -> Dict:
+        """Copy a snapshot of ``repo_id`` into the blob store and write its manifest."""
+        repo_dir = self._snapshot_dir(repo_id, fetch)
+        blobs_dir = self.cache_dir / 'blobs'
+        blobs_dir.mkdir(parents=True, exist_ok=True)
+
+        files = {}
+        for path in sorted(repo_dir.rglob('*')):
+            rel = path.relative_to(repo_dir).as_posix()
+            if not path.is_file() or rel.startswith('.'):
+                continue
+            real = path.resolve()
+            sha = file_sha256(real)
+            size = real.stat().st_size
+            blob = self.blob_path(sha, path.suffix)
+            if not blob.exists():
+                tmp = blob.with_name(f"{blob.name}.{os.getpid()}.tmp")
+                shutil.copyfile(real, tmp)
+                os.replace(tmp, blob)
+            files[rel] = {'sha256': sha, 'size': size}
+
+        # hub snapshots live in .../snapshots/<commit>; local sources are versioned by content
+        if repo_dir.parent.name == 'snapshots':
+            revision = repo_dir.name
+        else:
+            listing = ''.join(f"{rel}:{entry['sha256']}\n" for rel, entry in files.items())
+            revision = 'local-' + hashlib.sha256(listing.encode()).hexdigest()
+
+        manifest = {
+            'repo_id': repo_id,
+            'revision': revision,
+            'fetched_at': time.time(),
+            'files': files,
+            'roles': assign_roles(files),
+        }
+        path = self.manifest_path(repo_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, path)
+
+        logger.info(f"Cached {repo_id}@{revision[:12]} ({len(files)} files, roles: {sorted(manifest['roles'])})")
+        return manifest
@@ -0,0 +1,279 @@
+import os
+import json
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Objectives whose prediction is the raw margin (identity link)
+XGBOOST_IDENTITY_OBJECTIVES = ('reg:squarederror', 'reg:absoluteerror', 'reg:pseudohubererror', 'reg:quantileerror')
+HISTGRADIENT_IDENTITY_LOSSES = ('squared_error', 'absolute_error', 'quantile')
+
+PREDICT_CHUNK_ROWS = 256
+
+
+class UnsupportedModelError(ValueError):
+    """Raised when a model cannot be flattened into a :class:`CompiledTreeEnsemble`."""
+
+
+class CompiledTreeEnsemble:
+    """
+    Tree ensemble flattened into NumPy arrays for low-overhead inference.
+
+    All trees share one node array and leaves point back to themselves, so
+    every row walks every tree in lockstep for ``max_depth`` vectorized steps
+    with no per-node Python work. Missing values follow each split's default
+    direction.
+
+    Traversal runs on "slots" (``2 * node``): feature and threshold are
+    repeated per slot and ``slot_children[slot + go_right]`` already holds the
+    child's slot, which saves one array operation per level.
+
+    ``right_if_equal`` selects the split rule: XGBoost sends ``x < threshold``
+    left, scikit-learn sends ``x <= threshold`` left. Thresholds keep the
+    source model's dtype (float32 for XGBoost) so comparisons match exactly.
+    """
+
+    def __init__(self, feature, threshold, children, default_left, value, roots,
+                 max_depth: int, base_score: float, right_if_equal: bool, source: str):
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold)
+        self.children = np.ascontiguousarray(children, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=np.float64)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.base_score = float(base_score)
+        self.source = source
+        self.n_features_in_ = int(self.feature.max()) + 1 if len(self.feature) else 0
+
+        self._slot_feature = np.repeat(self.feature, 2)
+        self._slot_threshold = np.repeat(self.threshold, 2)
+        self._slot_default_right = np.repeat(~np.asarray(default_left, dtype=bool), 2)
+        self._slot_children = 2 * self.children
+        self._slot_roots = 2 * self.roots
+        self._go_right = np.greater_equal if right_if_equal else np.greater
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _leaf_slots(self, X: np.ndarray) -> np.ndarray:
+        has_missing = bool(np.isnan(X).any())
+        if X.shape[0] == 1:
+            # Single row: 1-D gathers avoid the row-offset arithmetic below
+            x = X[0]
+            slot = self._slot_roots
+            for _ in range(self.max_depth):
+                values = x[self._slot_feature[slot]]
+                go_right = self._go_right(values, self._slot_threshold[slot])
+                if has_missing:
+                    go_right |= np.isnan(values) & self._slot_default_right[slot]
+                slot = self._slot_children[slot + go_right]
+            return slot[None, :]
+
+        flat = X.ravel()
+        offsets = (np.arange(X.shape[0]) * X.shape[1])[:, None]
+        slot = np.broadcast_to(self._slot_roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            values = flat[offsets + self._slot_feature[slot]]
+            go_right = self._go_right(values, self._slot_threshold[slot])
+            if has_missing:
+                go_right |= np.isnan(values) & self._slot_default_right[slot]
+            slot = self._slot_children[slot + go_right]
+        return slot
+
+    def predict(self, X) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=self.threshold.dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[0] == 1:
+            return np.array([self.base_score + self.value[self._leaf_slots(X)[0] >> 1].sum()])
+        out = np.empty(X.shape[0])
+        # Chunks keep the per-level (rows x trees) temporaries cache-sized
+        for start in range(0, X.shape[0], PREDICT_CHUNK_ROWS):
+            leaves = self._leaf_slots(X[start:start + PREDICT_CHUNK_ROWS]) >> 1
+            out[start:start + PREDICT_CHUNK_ROWS] = self.base_score + self.value[leaves].sum(axis=1)
+        return out
+
+
+def _assemble(trees: List[dict], base_score: float, dtype, right_if_equal: bool, source: str) -> CompiledTreeEnsemble:
+    """Concatenate per-tree node arrays (local child indices, -1 for leaves) into one ensemble."""
+    features, thresholds, children, default_left, values, roots = [], [], [], [], [], []
+    offset = 0
+    max_depth = 0
+    for tree in trees:
+        n = len(tree['feature'])
+        local = np.arange(n)
+        is_leaf = tree['left'] < 0
+        left = np.where(is_leaf, local, tree['left']) + offset
+        right = np.where(is_leaf, local, tree['right']) + offset
+
+        features.append(np.where(is_leaf, 0, tree['feature']))
+        thresholds.append(np.where(is_leaf, 0, tree['threshold']).astype(dtype))
+        children.append(np.column_stack([left, right]).ravel())
+        default_left.append(tree['default_left'])
+        values.append(np.where(is_leaf, tree['value'], 0.0))
+        roots.append(offset)
+        max_depth = max(max_depth, _depth(tree['left'], tree['right']))
+        offset += n
+
+    if not trees:
+        raise UnsupportedModelError("Model has no trees")
+    return CompiledTreeEnsemble(
+        feature=np.concatenate(features),
+        threshold=np.concatenate(thresholds),
+        children=np.concatenate(children),
+        default_left=np.concatenate(default_left),
+        value=np.concatenate(values),
+        roots=np.array(roots),
+        max_depth=max_depth,
+        base_score=base_score,
+        right_if_equal=right_if_equal,
+        source=source,
+    )
+
+
+def _depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=int)
+    # Nodes are stored parent-before-child in both XGBoost and scikit-learn
+    for node in range(len(left)):
+        if left[node] >= 0:
+            depth[left[node]] = depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def compile_xgboost(model) -> CompiledTreeEnsemble:
+    """Flatten an XGBoost regressor (gbtree, numerical splits, identity objective)."""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    dump = json.loads(booster.save_raw('json'))
+    learner = dump['learner']
+
+    objective = learner['objective']['name']
+    if objective not in XGBOOST_IDENTITY_OBJECTIVES:
+        raise UnsupportedModelError(f"Unsupported XGBoost objective: {objective}")
+    if learner['gradient_booster']['name'] != 'gbtree':
+        raise UnsupportedModelError(f"Unsupported XGBoost booster: {learner['gradient_booster']['name']}")
+    if int(learner['learner_model_param'].get('num_target', '1')) != 1:
+        raise UnsupportedModelError("Multi-target XGBoost models are not supported")
+
+    gbtree = learner['gradient_booster']['model']
+    tree_dumps = gbtree['trees']
+    # Honour early stopping the way XGBRegressor.predict does
+    best_iteration = getattr(model, 'best_iteration', None) if hasattr(model, 'get_booster') else None
+    if best_iteration is not None and 'iteration_indptr' in gbtree:
+        tree_dumps = tree_dumps[:gbtree['iteration_indptr'][best_iteration + 1]]
+
+    trees = []
+    for t in tree_dumps:
+        if any(t.get('split_type', [])):
+            raise UnsupportedModelError("Categorical XGBoost splits are not supported")
+        left = np.asarray(t['left_children'])
+        trees.append({
+            'feature': np.asarray(t['split_indices']),
+            'threshold': np.asarray(t['split_conditions'], dtype=np.float32),
+            'left': left,
+            'right': np.asarray(t['right_children']),
+            'default_left': np.asarray(t['default_left'], dtype=bool),
+            # Leaf values are stored in split_conditions
+            'value': np.asarray(t['split_conditions'], dtype=np.float64),
+        })
+
+    base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+    return _assemble(trees, base_score, np.float32, right_if_equal=True, source='xgboost')
+
+
+def compile_histgradient(model) -> CompiledTreeEnsemble:
+    """Flatten a scikit-learn HistGradientBoostingRegressor with numerical features."""
+    loss = getattr(model, 'loss', None)
+    if loss not in HISTGRADIENT_IDENTITY_LOSSES:
+        raise UnsupportedModelError(f"Unsupported HistGradientBoosting loss: {loss}")
+    if getattr(model, '_preprocessor', None) is not None:
+        raise UnsupportedModelError("HistGradientBoosting models with a categorical preprocessor are not supported")
+
+    trees = []
+    for iteration in model._predictors:
+        if len(iteration) != 1:
+            raise UnsupportedModelError("Multi-output HistGradientBoosting models are not supported")
+        nodes = iteration[0].nodes
+        if nodes['is_categorical'].any():
+            raise UnsupportedModelError("Categorical HistGradientBoosting splits are not supported")
+        is_leaf = nodes['is_leaf'].astype(bool)
+        trees.append({
+            'feature': nodes['feature_idx'].astype(np.intp),
+            'threshold': nodes['num_threshold'].astype(np.float64),
+            'left': np.where(is_leaf, -1, nodes['left'].astype(np.intp)),
+            'right': np.where(is_leaf, -1, nodes['right'].astype(np.intp)),
+            'default_left': nodes['missing_go_to_left'].astype(bool),
+            'value': nodes['value'].astype(np.float64),
+        })
+
+    base_score = float(np.ravel(model._baseline_prediction)[0])
+    return _assemble(trees, base_score, np.float64, right_if_equal=False, source='histgradient')
+
+
+def compile_model(model) -> CompiledTreeEnsemble:
+    """Flatten a supported tree ensemble; raises UnsupportedModelError otherwise."""
+    if hasattr(model, 'get_booster'):
+        return compile_xgboost(model)
+    if hasattr(model, '_predictors') and hasattr(model, '_baseline_prediction'):
+        return compile_histgradient(model)
+    raise UnsupportedModelError(f"No compiled path for {type(model).__name__}")
+
+
+def probe_matrix(compiled: CompiledTreeEnsemble, n_features: int, rows: int = 256, seed: int = 0) -> np.ndarray:
+    """Rows spread over every feature's split thresholds, so most branches are exercised."""
+    rng = np.random.default_rng(seed)
+    X = np.zeros((rows, n_features))
+    internal = compiled.children[2 * np.arange(len(compiled.feature))] != np.arange(len(compiled.feature))
+    for f in range(n_features):
+        cuts = compiled.threshold[internal & (compiled.feature == f)].astype(np.float64)
+        cuts = cuts[np.isfinite(cuts)]
+        if len(cuts):
+            lo, hi = cuts.min(), cuts.max()
+            pad = max(1.0, 0.1 * (hi - lo))
+            X[:, f] = rng.uniform(lo - pad, hi + pad, size=rows)
+            # Exact threshold values test the equality rule
+            X[:rows // 8, f] = rng.choice(cuts, size=rows // 8)
+    return X
+
+
+def compile_and_verify(model, n_features: int, samples: Optional[np.ndarray] = None,
+                       rtol: float = 1e-5, atol: float = 1e-3) -> Optional[CompiledTreeEnsemble]:
+    """
+    Compile ``model`` and check it against ``model.predict`` on probe rows.
+
+    Returns None (and the original model keeps serving) when the model type is
+    unsupported, compilation fails or any probe prediction is outside tolerance.
+    Disabled entirely with ``COMPILED_INFERENCE=false``.
+    """
+    if os.getenv('COMPILED_INFERENCE', 'true').lower() in ('0', 'false', 'no'):
+        return None
+    try:
+        compiled = compile_model(model)
+    except UnsupportedModelError as e:
+        logger.info(f"Compiled inference not used: {e}")
+        return None
+    except Exception as e:
+        logger.warning(f"Could not compile {type(model).__name__}: {e}")
+        return None
+
+    if compiled.n_features_in_ > n_features:
+        logger.warning(f"Compiled {compiled.source} model uses {compiled.n_features_in_} features, input has {n_features}")
+        return None
+
+    X = probe_matrix(compiled, n_features)
+    if samples is not None:
+        X = np.vstack([X, np.asarray(samples, dtype=float).reshape(-1, n_features)])
+    X[-1, 0] = np.nan
+    expected = np.asarray(model.predict(X), dtype=np.float64).ravel()
+    actual = compiled.predict(X)
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol, equal_nan=True):
+        worst = float(np.nanmax(np.abs(actual - expected)))
+        logger.warning(f"Compiled {compiled.source} model disagrees with the original (max abs error {worst:.3g}); not used")
+        return None
+
+    logger.info(f"Compiled {compiled.source} model: {compiled.n_trees} trees, depth {compiled.max_depth}, "
+                f"{len(compiled.feature)} nodes")
+    return compiled
@@ -0,0 +1,124 @@
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_DTYPES = ('float32', 'float16', 'int8')
+
+
+class EmbeddingStore:
+    """
+    Compact on-disk copy of normalized ensemble embeddings, memory-mapped on load.
+
+    The source file (JSON or .npy) is parsed once and written as a float32,
+    float16 or int8-quantized ``.npy`` plus an ids sidecar. Later loads use
+    ``np.load(..., mmap_mode='r')`` so every worker on the host shares the
+    same pages through the OS page cache instead of holding its own copy.
+
+    int8 stores keep one global scale (vectors are unit length, so every
+    component fits in [-1, 1]); scores computed on them must be divided by it.
+
+    The dtype defaults to ``EMBEDDING_STORE_DTYPE`` (float32).
+    """
+
+    def __init__(self, store_dir, dtype: Optional[str] = None):
+        self.store_dir = Path(store_dir)
+        self.dtype = (dtype or os.getenv('EMBEDDING_STORE_DTYPE', 'float32')).lower()
+        if self.dtype not in STORE_DTYPES:
+            raise ValueError(f"Unsupported embedding store dtype: {self.dtype}")
+
+    def _paths(self, source: Path) -> Tuple[Path, Path, Path]:
+        key = hashlib.sha1(str(Path(source).resolve()).encode()).hexdigest()[:8]
+        stem = f"{Path(source).stem}-{key}"
+        return (
+            self.store_dir / f"{stem}.{self.dtype}.npy",
+            self.store_dir / f"{stem}.ids.json",
+            self.store_dir / f"{stem}.{self.dtype}.json",
+        )
+
+    @staticmethod
+    def _fingerprint(source: Path) -> dict:
+        stat = Path(source).stat()
+        return {'name': Path(source).name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+    def load(self, source) -> Optional[Tuple[np.ndarray, Optional[List[str]], float]]:
+        """Return ``(embeddings, ids, scale)`` if an up-to-date store exists for ``source``."""
+        data_path, ids_path, meta_path = self._paths(source)
+        if not (data_path.exists() and meta_path.exists()):
+            return None
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('source') != self._fingerprint(source):
+                return None
+
+            embeddings = np.load(data_path, mmap_mode='r')
+            ids = None
+            if ids_path.exists():
+                with open(ids_path, 'r', encoding='utf-8') as f:
+                    ids = json.load(f)
+            return embeddings, ids, float(meta.get('scale', 1.0))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding store for {source}: {e}")
+            return None
+
+    def save(
+        self, source, embeddings: np.ndarray, ids: Optional[List[str]]
+    ) -> Tuple[np.ndarray, Optional[List[str]], float]:
+        """
+        Write normalized ``embeddings`` for ``source`` and return the memory-mapped result.
+
+        Raises OSError when the written store cannot be read back (e.g. the
+        source changed meanwhile).
+        """
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        data_path, ids_path, meta_path = self._paths(source)
+
+        scale = 1.0
+        if self.dtype == 'int8':
+            scale = 127.0
+            compact = np.clip(np.rint(embeddings * scale), -127, 127).astype(np.int8)
+        else:
+            compact = np.ascontiguousarray(embeddings, dtype=self.dtype)
+
+        # Write to temporary files and rename so concurrent workers never see a partial store
+        pid = os.getpid()
+        tmp_data = data_path.with_name(f"{data_path.name}.{pid}.tmp")
+        with open(tmp_data, 'wb') as f:
+            np.save(f, compact)
+        os.replace(tmp_data, data_path)
+
+        if ids is not None:
+            tmp_ids = ids_path.with_name(f"{ids_path.name}.{pid}.tmp")
+            with open(tmp_ids, 'w', encoding='utf-8') as f:
+                json.dump([str(i) for i in ids], f)
+            os.replace(tmp_ids, ids_path)
+        else:
+            # An ids file from an earlier save would be paired with these rows
+            ids_path.unlink(missing_ok=True)
+
+        meta = {
+            'source': self._fingerprint(source),
+            'dtype': self.dtype,
+            'shape': list(compact.shape),
+            'scale': scale,
+        }
+        tmp_meta = meta_path.with_name(f"{meta_path.name}.{pid}.tmp")
+        with open(tmp_meta, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_meta, meta_path)
+
+        logger.info(
+            f"Wrote {self.dtype} embedding store {data_path.name} "
+            f"({compact.nbytes // 1024} KB, {compact.shape[0]} items)"
+        )
+        stored = self.load(source)
+        if stored is None:
+            raise OSError(f"Embedding store {data_path.name} could not be read back after writing")
+        return stored
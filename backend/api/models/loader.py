@@ -1,10 +1,20 @@
+import os
+import time
 import pickle
 import logging
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Dict
-import pandas as pd
+from typing import Optional, Dict, List, Tuple
 import numpy as np
 
+from .schemas import NutritionInput
+from .vector_index import build_index, recall_at_k, ExactIndex
+from .embedding_store import EmbeddingStore
+from .artifact_cache import ArtifactCache, artifact_tag
+from .compiled_trees import compile_and_verify
+
 try:
     # prefer snapshot_download (downloads full repo snapshot)
     from huggingface_hub import snapshot_download, hf_hub_download
@@ -16,6 +26,47 @@ except ImportError:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model column names that differ from the lowercased NutritionInput field name
+FEATURE_COLUMN_ALIASES = {
+    'carbohydrates_g_per_serving': 'carbohydrate_g_per_serving',
+    'vitamina_ug_per_serving': 'vitamin_a_mcg_per_serving',
+    'vitaminc_mg_per_serving': 'vitamin_c_mg_per_serving',
+}
+
+
+def _build_column_lookup() -> Dict[str, str]:
+    """Map every accepted (lowercase) model column name to its NutritionInput field."""
+    lookup = {}
+    for field in NutritionInput.model_fields:
+        lookup[field.lower()] = field
+        alias = FEATURE_COLUMN_ALIASES.get(field.lower())
+        if alias:
+            lookup[alias] = field
+    return lookup
+
+
+FEATURE_COLUMN_LOOKUP = _build_column_lookup()
+
+# Deployment mode reported for each trained model key
+MODEL_STATUS = {
+    'huggingface': 'online',
+    'local_xgboost': 'local',
+    'offline': 'offline',
+}
+
+ENSEMBLE_REPO_ID = 'Shakiran/MzeeChakulaNutritionEnsembleModel'
+
+# Local artifacts (newest match wins) for models that can be reloaded from disk
+RELOAD_ARTIFACTS = {
+    'local_xgboost': ('xgboost_nutrition_model_*.pkl',),
+    'offline': ('baseline_nutrition_model_v2_*.pkl',),
+}
+
+# Model keys populated by a loader other than their own
+LOADER_FOR_KEY = {
+    'ensemble': 'huggingface',
+}
+
 
 class ModelLoader:
     """
@@ -23,9 +74,13 @@ class ModelLoader:
     1. Hugging Face model (XGBoost) - Best accuracy, requires internet
     2. Local XGBoost model - Good accuracy, offline
     3. HistGradient model - Lightweight, offline fallback
+
+    Models load synchronously on construction unless ``lazy=True``, in which
+    case :meth:`start` loads them in the background (or on first use) so the
+    API can accept connections while artifacts are still being fetched.
     """
     
-    def __init__(self, local_model_dir: Optional[str] = None):
+    def __init__(self, local_model_dir: Optional[str] = None, lazy: bool = False):
         # Use absolute path from project root
         if local_model_dir is None:
             project_root = Path(__file__).parent.parent.parent.parent
@@ -36,31 +91,153 @@ class ModelLoader:
         self.feature_names = None
         
         logger.info(f"Looking for models in: {self.local_model_dir}")
-        
-        # Load feature names (best-effort; non-fatal)
-        self._load_feature_names()
 
-        # Load local models first (local XGBoost as primary, offline as fallback)
-        self._load_local_xgboost()
-        self._load_offline_model()
+        # Local XGBoost as primary, offline as fallback,
+        # Hugging Face ensemble/model as an online fallback
+        self._loaders = {
+            'local_xgboost': self._load_local_xgboost,
+            'offline': self._load_offline_model,
+        }
+        cache_dir = os.getenv('HF_ARTIFACT_CACHE_DIR') or self.local_model_dir / 'hf_cache'
+        self.artifact_cache = ArtifactCache(cache_dir)
+        if HF_AVAILABLE or self.artifact_cache.source_dir is not None:
+            self._loaders['huggingface'] = self._load_hf_model
+
+        self.load_state = {name: 'pending' for name in self._loaders}
+        self.load_seconds: Dict[str, float] = {}
+        self._load_locks = {name: threading.Lock() for name in self._loaders}
+        self._feature_names_lock = threading.Lock()
+        self._feature_names_loaded = False
+
+        # Largest batch scored with the compiled tree path (see compiled_trees)
+        self.compiled_max_batch = int(os.getenv('COMPILED_INFERENCE_MAX_BATCH', '32'))
+
+        # Optional result cache (services.PredictionCache), attached by the app
+        self.prediction_cache = None
+
+        # Optional metrics hook, attached by the app:
+        # observer(model_key, status, rows, phase_seconds) once per outcome of a predict_batch call
+        self.metrics_observer = None
+
+        # Entries replaced by reload_model, newest last, for rollback_model
+        self.previous_versions: Dict[str, List[Dict]] = {}
+        self._reload_lock = threading.Lock()
+
+        # Changes whenever a model or loader state changes, so responses
+        # derived from get_available_models() can be cached until then
+        self.generation = 0
+        self._generations = itertools.count(1)
+
+        if not lazy:
+            self.load_all()
+
+    def _ensure_feature_names(self):
+        """Load feature names once (best-effort; non-fatal)."""
+        with self._feature_names_lock:
+            if not self._feature_names_loaded:
+                self._load_feature_names()
+                self._feature_names_loaded = True
+
+    def _run_loader(self, name: str):
+        """Run one model loader at most once, recording its state and duration."""
+        with self._load_locks[name]:
+            if self.load_state[name] != 'pending':
+                return
+            self.load_state[name] = 'loading'
+            self._models_changed()
+            started = time.perf_counter()
+            try:
+                if name != 'huggingface':
+                    self._ensure_feature_names()
+                self._loaders[name]()
+            except Exception as e:
+                logger.error(f"Loader {name} failed: {e}")
+            finally:
+                self.load_seconds[name] = time.perf_counter() - started
+                produced = [key for key in self.models if LOADER_FOR_KEY.get(key, key) == name]
+                available = any(self.models[key].get('available') for key in produced)
+                self.load_state[name] = 'ready' if available else 'unavailable'
+                self._models_changed()
+                logger.info(f"Loader {name} finished in {self.load_seconds[name]:.2f}s ({self.load_state[name]})")
+
+    def _models_changed(self):
+        # Distinct, increasing values even when threads race (next() is atomic)
+        self.generation = next(self._generations)
+
+    def load_all(self):
+        """Load every model, running the loaders in parallel, and block until done."""
+        with ThreadPoolExecutor(max_workers=len(self._loaders) or 1, thread_name_prefix='model-loader') as pool:
+            list(pool.map(self._run_loader, self._loaders))
+
+        for name, info in self.get_available_models().items():
+            if info['available']:
+                logger.info(f"{name}: {info['type']} ({info['size']})")
+            else:
+                logger.info(f"{name}: Not available")
 
-        # Finally try to load Hugging Face ensemble/model as an online fallback
-        if HF_AVAILABLE:
-            self._load_hf_model()
+    def start(self, load_on_first_use: Optional[bool] = None):
+        """
+        Begin loading models without blocking the caller.
+
+        With ``load_on_first_use`` (default from ``MODEL_LOAD_ON_FIRST_USE``)
+        nothing is loaded until a request needs it.
+        """
+        if load_on_first_use is None:
+            load_on_first_use = os.getenv('MODEL_LOAD_ON_FIRST_USE', 'false').lower() in ('1', 'true', 'yes')
+        if load_on_first_use:
+            logger.info("Models will load on first use")
+            return
+        threading.Thread(target=self.load_all, name='model-loader', daemon=True).start()
+
+    def ensure_loaded(self, key: str, wait: bool = True) -> bool:
+        """
+        Make sure the loader for model ``key`` has run.
+
+        With ``wait=False`` a pending loader is started in the background and
+        the call returns immediately. Returns True once loading has finished.
+        """
+        name = LOADER_FOR_KEY.get(key, key)
+        if name not in self._loaders:
+            return True
+        if self.load_state[name] in ('ready', 'unavailable'):
+            return True
+        if wait:
+            self._run_loader(name)
+            return True
+        if self.load_state[name] == 'pending':
+            threading.Thread(target=self._run_loader, args=(name,), name=f'model-loader-{name}', daemon=True).start()
+        return False
+
+    @property
+    def ready(self) -> bool:
+        """True once every loader has finished."""
+        return all(state in ('ready', 'unavailable') for state in self.load_state.values())
     
+    def _resolve_artifact(self, *patterns: str) -> Optional[Path]:
+        """Return the newest file matching the first pattern that has any match.
+
+        Artifacts carry a date suffix (e.g. ``xgboost_nutrition_model_20251120.pkl``),
+        so the lexically greatest name is the most recent upload.
+        """
+        for pattern in patterns:
+            matches = sorted(self.local_model_dir.glob(pattern))
+            if matches:
+                return matches[-1]
+        return None
+
     def _load_feature_names(self):
         """Load feature names"""
         try:
             # Try v2 first
-            feature_path = self.local_model_dir / 'feature_names_v2_20251120.pkl'
-            if not feature_path.exists():
-                feature_path = self.local_model_dir / 'xgboost_feature_names_20251120.pkl'
+            feature_path = self._resolve_artifact(
+                'feature_names_v2_*.pkl',
+                'xgboost_feature_names_*.pkl'
+            )
+            if feature_path is None:
+                raise FileNotFoundError(f"no feature names pickle in {self.local_model_dir}")
 
             with open(feature_path, 'rb') as f:
-                self.feature_names = pickle.load(f)
-
-            # Normalize feature names to lowercase
-            self.feature_names = [name.lower() for name in self.feature_names]
+                self.feature_names = list(pickle.load(f))
 
             logger.info(f"Loaded {len(self.feature_names)} feature names")
         except Exception as e:
@@ -71,58 +248,72 @@ class ModelLoader:
     def _load_offline_model(self):
         """Load lightweight HistGradient model"""
         try:
-            model_path = self.local_model_dir / 'baseline_nutrition_model_v2_20251120.pkl'
-            if not model_path.exists():
+            model_path = self._resolve_artifact(*RELOAD_ARTIFACTS['offline'])
+            if model_path is None:
                 logger.info("Offline model not found in local uploads")
                 self.models['offline'] = {'available': False}
                 return
             
-            with open(model_path, 'rb') as f:
-                import joblib
-                try:
-                    model = joblib.load(model_path)
-                except:
-                    model = pickle.load(f)
-            
-            self.models['offline'] = {
-                'model': model,
-                'type': 'HistGradientBoostingRegressor',
-                'size': '75 KB',
-                'accuracy': 'R² = 0.5116, MAE = 3.42 kcal/day',
-                'test_r2': 0.5116,
-                'test_mae': 3.42,
-                'available': True
-            }
+            self.models['offline'] = self._offline_entry(model_path)
             logger.info("Loaded offline model (HistGradient)")
         except Exception as e:
             logger.warning(f"Could not load offline model: {e}")
             self.models['offline'] = {'available': False}
+
+    def _offline_entry(self, model_path: Path) -> Dict:
+        with open(model_path, 'rb') as f:
+            import joblib
+            try:
+                model = joblib.load(model_path)
+            except:
+                model = pickle.load(f)
+
+        plan = self._build_feature_plan(model)
+        return {
+            'model': model,
+            'feature_plan': plan,
+            'compiled': self._compile_model(model, plan),
+            'type': 'HistGradientBoostingRegressor',
+            'size': '75 KB',
+            'accuracy': 'R² = 0.5116, MAE = 3.42 kcal/day',
+            'test_r2': 0.5116,
+            'test_mae': 3.42,
+            'available': True,
+            **self._version_info(model_path)
+        }
     
     def _load_local_xgboost(self):
         """Load local XGBoost model"""
         try:
-            model_path = self.local_model_dir / 'xgboost_nutrition_model_20251120.pkl'
-            if not model_path.exists():
+            model_path = self._resolve_artifact(*RELOAD_ARTIFACTS['local_xgboost'])
+            if model_path is None:
                 logger.info("Local XGBoost model not found in local uploads")
                 self.models['local_xgboost'] = {'available': False}
                 return
             
-            with open(model_path, 'rb') as f:
-                model = pickle.load(f)
-            
-            self.models['local_xgboost'] = {
-                'model': model,
-                'type': 'XGBoostRegressor',
-                'size': '297 KB',
-                'accuracy': 'R² = 0.6710, MAE = 2.84 kcal/day',
-                'test_r2': 0.6710,
-                'test_mae': 2.84,
-                'available': True
-            }
+            self.models['local_xgboost'] = self._local_xgboost_entry(model_path)
             logger.info(" Loaded local XGBoost model")
         except Exception as e:
             logger.warning(f"Could not load local XGBoost: {e}")
             self.models['local_xgboost'] = {'available': False}
+
+    def _local_xgboost_entry(self, model_path: Path) -> Dict:
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+
+        plan = self._build_feature_plan(model)
+        return {
+            'model': model,
+            'feature_plan': plan,
+            'compiled': self._compile_model(model, plan),
+            'type': 'XGBoostRegressor',
+            'size': '297 KB',
+            'accuracy': 'R² = 0.6710, MAE = 2.84 kcal/day',
+            'test_r2': 0.6710,
+            'test_mae': 2.84,
+            'available': True,
+            **self._version_info(model_path)
+        }
     
     def _load_hf_model(self):
         """Load model from Hugging Face"""
@@ -130,10 +321,13 @@ class ModelLoader:
             logger.info("Attempting to download ensemble from Hugging Face (snapshot)...")
 
             # Prefer the ensemble repo which contains precomputed JSON embeddings
-            repo_id = 'Shakiran/MzeeChakulaNutritionEnsembleModel'
+            repo_id = ENSEMBLE_REPO_ID
+            refresh = os.getenv('HF_ARTIFACT_REFRESH', 'false').lower() in ('1', 'true', 'yes')
             try:
-                repo_dir = snapshot_download(repo_id)
+                artifacts = self._resolve_hf_artifacts(refresh)
             except Exception:
+                if not HF_AVAILABLE:
+                    raise
                 # fallback to single file download if snapshot unavailable
                 logger.info("snapshot_download failed, falling back to hf_hub_download for model file")
                 model_path = hf_hub_download(
@@ -143,8 +337,11 @@ class ModelLoader:
                 with open(model_path, 'rb') as f:
                     model = pickle.load(f)
 
+                plan = self._build_feature_plan(model)
                 self.models['huggingface'] = {
                     'model': model,
+                    'feature_plan': plan,
+                    'compiled': self._compile_model(model, plan),
                     'type': 'XGBoostRegressor (HF)',
                     'size': '297 KB',
                     'accuracy': 'R² = 0.6710, MAE = 2.84 kcal/day',
@@ -156,109 +353,29 @@ class ModelLoader:
                 logger.info("Loaded Hugging Face model (fallback)")
                 return
 
-            # If snapshot_download succeeded, look for embeddings and metadata
-            from pathlib import Path as _P
-            repo_path = _P(repo_dir)
-
-            # Search for JSON embeddings or numpy arrays
-            embeddings_path = None
-            metadata_path = None
-            for p in repo_path.rglob('*.json'):
-                name = p.name.lower()
-                if 'embedd' in name:
-                    embeddings_path = p
-                if 'meta' in name or 'items' in name or 'foods' in name:
-                    metadata_path = p
-
-            # Also accept .npy files
-            if embeddings_path is None:
-                for p in repo_path.rglob('*.npy'):
-                    if 'embedd' in p.name.lower():
-                        embeddings_path = p
-                        break
+            embeddings_path = artifacts.get('embeddings')
+            metadata_path = artifacts.get('metadata')
 
             if embeddings_path is None:
                 logger.warning("No embeddings file found in HF repo snapshot")
             else:
-                # Load embeddings
+                # Load embeddings, parsing the source only when the compact store is stale
                 try:
-                    if embeddings_path.suffix == '.npy':
-                        emb = np.load(embeddings_path)
-                        ids = None
-                    else:
-                        import json
-                        with open(embeddings_path, 'r', encoding='utf-8') as ef:
-                            data = json.load(ef)
-                        # data could be dict id->vector or list of {id:..., vector:...}
-                        if isinstance(data, dict):
-                            ids = list(data.keys())
-                            emb = np.array(list(data.values()), dtype=float)
-                        elif isinstance(data, list) and len(data) and isinstance(data[0], dict):
-                            ids = [str(item.get('id') or item.get('food_id') or idx) for idx, item in enumerate(data)]
-                            emb = np.array([item.get('vector') or item.get('embedding') for item in data], dtype=float)
-                        else:
-                            emb = np.array(data, dtype=float)
-                            ids = None
-
-                    # Load metadata if present
-                    metadata = {}
-                    if metadata_path and metadata_path.exists():
-                        import json
-                        with open(metadata_path, 'r', encoding='utf-8') as mf:
-                            md = json.load(mf)
-                        # Expect dict id->info or list
-                        if isinstance(md, dict):
-                            metadata = md
-                        elif isinstance(md, list):
-                            # try to create mapping using id key
-                            for item in md:
-                                key = item.get('id') or item.get('food_id')
-                                if key is not None:
-                                    metadata[str(key)] = item
+                    self.models['ensemble'] = self._ensemble_entry(embeddings_path, metadata_path, repo_id)
+                    emb = self.models['ensemble']['embeddings']
+                    logger.info(f"Loaded ensemble embeddings ({emb.shape[0]} items, {emb.dtype})")
                 except Exception as e:
                     logger.warning(f"Failed to load embeddings/metadata: {e}")
-                    emb = None
-                    ids = None
-                    metadata = {}
-
-                if emb is not None:
-                    # normalize embeddings for cosine similarity
-                    norms = np.linalg.norm(emb, axis=1, keepdims=True)
-                    norms[norms == 0] = 1.0
-                    emb_norm = emb / norms
-
-                    self.models['ensemble'] = {
-                        'embeddings': emb_norm,
-                        'ids': ids,
-                        'metadata': metadata,
-                        'available': True,
-                        'repo_id': repo_id
-                    }
-                    logger.info(f"Loaded ensemble embeddings ({emb_norm.shape[0]} items)")
-                else:
                     self.models['ensemble'] = {'available': False}
-                    logger.warning("Ensemble embeddings not available after download")
 
             # Also try to load a model file inside the snapshot if present (xgboost pickle)
-            try:
-                for p in repo_path.rglob('*.pkl'):
-                    if 'xgboost' in p.name.lower() or 'nutrition_model' in p.name.lower():
-                        with open(p, 'rb') as f:
-                            model = pickle.load(f)
-                        self.models['huggingface'] = {
-                            'model': model,
-                            'type': 'XGBoostRegressor (HF-snapshot)',
-                            'size': f"{p.stat().st_size//1024} KB",
-                            'accuracy': 'unknown',
-                            'test_r2': None,
-                            'test_mae': None,
-                            'available': True,
-                            'repo_id': repo_id
-                        }
-                        logger.info("Loaded model from HF snapshot")
-                        break
-            except Exception:
-                pass
+            model_path = artifacts.get('model')
+            if model_path is not None:
+                try:
+                    self.models['huggingface'] = self._hf_snapshot_entry(model_path, repo_id)
+                    logger.info("Loaded model from HF snapshot")
+                except Exception as e:
+                    logger.warning(f"Could not load model from HF snapshot: {e}")
             # If we didn't load a huggingface model file, ensure a key exists
             if 'huggingface' not in self.models:
                 self.models['huggingface'] = {'available': False}
@@ -266,47 +383,468 @@ class ModelLoader:
             logger.warning(f"Could not load Hugging Face model: {e}")
             self.models['huggingface'] = {'available': False}
 
-    def recommend_foods(self, query_vector=None, top_k: int = 5, by_id: str = None):
+    def _resolve_hf_artifacts(self, refresh: bool = False) -> Dict[str, Path]:
+        """Return the ensemble repo's artifacts, from the local manifest unless refreshing."""
+        return self.artifact_cache.resolve(
+            ENSEMBLE_REPO_ID, refresh=refresh, fetch=snapshot_download if HF_AVAILABLE else None
+        )
+
+    def _hf_snapshot_entry(self, model_path: Path, repo_id: str = ENSEMBLE_REPO_ID) -> Dict:
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+        plan = self._build_feature_plan(model)
+        return {
+            'model': model,
+            'feature_plan': plan,
+            'compiled': self._compile_model(model, plan),
+            'type': 'XGBoostRegressor (HF-snapshot)',
+            'size': f"{model_path.stat().st_size//1024} KB",
+            'accuracy': 'unknown',
+            'test_r2': None,
+            'test_mae': None,
+            'available': True,
+            'repo_id': repo_id,
+            **self._version_info(model_path)
+        }
+
+    def _ensemble_entry(self, embeddings_path: Path, metadata_path: Optional[Path] = None,
+                        repo_id: str = ENSEMBLE_REPO_ID) -> Dict:
+        emb, ids, scale = self._load_embedding_store(embeddings_path)
+
+        # Load metadata if present
+        metadata = {}
+        if metadata_path and metadata_path.exists():
+            import json
+            with open(metadata_path, 'r', encoding='utf-8') as mf:
+                md = json.load(mf)
+            # Expect dict id->info or list
+            if isinstance(md, dict):
+                metadata = md
+            elif isinstance(md, list):
+                # try to create mapping using id key
+                for item in md:
+                    key = item.get('id') or item.get('food_id')
+                    if key is not None:
+                        metadata[str(key)] = item
+
+        return {
+            'embeddings': emb,
+            'embedding_scale': scale,
+            'index': build_index(emb, scale=scale),
+            'ids': ids,
+            'id_to_row': self._id_lookup(ids),
+            'metadata': metadata,
+            'available': True,
+            'repo_id': repo_id,
+            **self._version_info(embeddings_path)
+        }
+
+    @staticmethod
+    def _version_info(path: Path) -> Dict:
+        """Version fields recorded on every model entry (file name plus :func:`artifact_tag`)."""
+        return {
+            'version': f"{Path(path).name}@{artifact_tag(path)}",
+            'source': str(path),
+            'loaded_at': time.time(),
+        }
+
+    @staticmethod
+    def _read_embeddings(embeddings_path: Path):
+        """Parse an embeddings JSON or .npy file into ``(matrix, ids)``."""
+        if embeddings_path.suffix == '.npy':
+            return np.load(embeddings_path), None
+
+        import json
+        with open(embeddings_path, 'r', encoding='utf-8') as ef:
+            data = json.load(ef)
+        # data could be dict id->vector or list of {id:..., vector:...}
+        if isinstance(data, dict):
+            ids = list(data.keys())
+            emb = np.array(list(data.values()), dtype=float)
+        elif isinstance(data, list) and len(data) and isinstance(data[0], dict):
+            ids = [str(item.get('id') or item.get('food_id') or idx) for idx, item in enumerate(data)]
+            emb = np.array([item.get('vector') or item.get('embedding') for item in data], dtype=float)
+        else:
+            emb = np.array(data, dtype=float)
+            ids = None
+        return emb, ids
+
+    def _load_embedding_store(self, embeddings_path: Path):
+        """
+        Return ``(embeddings, ids, scale)`` from the memory-mapped embedding store,
+        converting ``embeddings_path`` into it first if needed.
+        """
+        store = EmbeddingStore(self.local_model_dir / 'embedding_cache')
+        stored = store.load(embeddings_path)
+        if stored is not None:
+            return stored
+
+        emb, ids = self._read_embeddings(embeddings_path)
+        # normalize embeddings for cosine similarity
+        norms = np.linalg.norm(emb, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        emb_norm = emb / norms
+
+        try:
+            return store.save(embeddings_path, emb_norm, ids)
+        except OSError as e:
+            logger.warning(f"Could not write embedding store ({e}); keeping embeddings in memory")
+            return emb_norm.astype(np.float32), ids, 1.0
+
+    @staticmethod
+    def _id_lookup(ids) -> Optional[Dict[str, int]]:
+        """Map each item id to its embedding row (first occurrence wins)."""
+        if ids is None:
+            return None
+        lookup = {}
+        for row, item_id in enumerate(ids):
+            lookup.setdefault(str(item_id), row)
+        return lookup
+
+    def _ensemble_index(self, ensemble: Dict):
+        """Return the ensemble's vector index, building one if it was attached without."""
+        index = ensemble.get('index')
+        if index is None or index.embeddings is not ensemble['embeddings']:
+            index = build_index(ensemble['embeddings'], scale=ensemble.get('embedding_scale', 1.0))
+            ensemble['index'] = index
+        return index
+
+    def _ensemble_rows(self, ensemble: Dict) -> Optional[Dict[str, int]]:
+        """Return the ensemble's id -> row dict, building it if it was attached without."""
+        lookup = ensemble.get('id_to_row')
+        if lookup is None and ensemble.get('ids') is not None:
+            lookup = self._id_lookup(ensemble['ids'])
+            ensemble['id_to_row'] = lookup
+        return lookup
+
+    def _format_items(self, ensemble: Dict, rows, scores) -> List[Dict]:
+        ids = ensemble.get('ids')
+        metadata = ensemble.get('metadata', {})
+        items = []
+        for i, score in zip(rows, scores):
+            if i < 0:
+                continue
+            item_id = ids[i] if ids is not None else int(i)
+            items.append({'id': item_id, 'score': float(score), 'meta': metadata.get(str(item_id), {})})
+        return items
+
+    def recommend_foods(
+        self,
+        query_vector=None,
+        top_k: int = 5,
+        by_id: str = None,
+        measure_recall: bool = False
+    ):
         """Return top-k similar food items from the ensemble embeddings.
 
-        Provide either `query_vector` (iterable) or `by_id` to look up an item in the loaded ids.
+        Provide either `query_vector` (iterable) or `by_id` to look up an item in the loaded ids;
+        an item looked up by id is left out of its own results.
+        The result's `index` entry reports the search backend, query latency and recall
+        (estimated at build time, or measured against exact search with `measure_recall`).
         """
+        if not self.ensure_loaded('ensemble', wait=False):
+            return {'success': False, 'error': 'Ensemble embeddings are still loading', 'items': []}
         ensemble = self.models.get('ensemble', {})
         if not ensemble.get('available'):
             return {'success': False, 'error': 'Ensemble embeddings not available', 'items': []}
 
-        emb = ensemble['embeddings']
-        ids = ensemble.get('ids')
-        metadata = ensemble.get('metadata', {})
-
         try:
+            index = self._ensemble_index(ensemble)
+            exclude = None
             if by_id is not None:
-                if ids is None:
+                rows = self._ensemble_rows(ensemble)
+                if rows is None:
                     return {'success': False, 'error': 'No ids available to look up by_id', 'items': []}
-                try:
-                    idx = ids.index(str(by_id))
-                except ValueError:
+                idx = rows.get(str(by_id))
+                if idx is None:
                     return {'success': False, 'error': 'by_id not found', 'items': []}
-                q = emb[idx]
+                q = index.rows(idx)
+                exclude = np.array([idx])
             else:
                 q = np.array(query_vector, dtype=float)
                 q = q / (np.linalg.norm(q) or 1.0)
 
-            # cosine similarity with normalized embeddings -> dot product
-            sims = emb.dot(q)
-            top_idx = np.argsort(-sims)[:top_k]
+            top_idx, scores, latency = index.search(q[np.newaxis, :], top_k, exclude=exclude)
+            items = self._format_items(ensemble, top_idx[0], scores[0])
 
-            items = []
-            for i in top_idx:
-                item_id = ids[i] if ids is not None else i
-                info = metadata.get(str(item_id), {})
-                items.append({'id': item_id, 'score': float(sims[i]), 'meta': info})
+            index_info = {
+                'backend': index.backend,
+                'latency_ms': round(latency * 1000, 3),
+                'recall': float(index.estimated_recall),
+                'recall_measured': False
+            }
+            if measure_recall and not isinstance(index, ExactIndex):
+                exact_idx, _, _ = ExactIndex(index.embeddings, scale=index.scale).search(q[np.newaxis, :], top_k, exclude=exclude)
+                index_info['recall'] = recall_at_k(top_idx, exact_idx)
+                index_info['recall_measured'] = True
 
-            return {'success': True, 'items': items}
+            return {'success': True, 'items': items, 'index': index_info}
         except Exception as e:
             logger.error(f"Recommendation failed: {e}")
             return {'success': False, 'error': str(e), 'items': []}
-    
+
+    def recommend_foods_batch(self, query_vectors=None, by_ids=None, top_k: int = 5):
+        """Return top-k similar items for many ids or vectors with one index search.
+
+        Results are returned per query, in order. Unknown ids get an error entry
+        instead of failing the whole batch.
+        """
+        if not self.ensure_loaded('ensemble', wait=False):
+            return {'success': False, 'error': 'Ensemble embeddings are still loading', 'results': []}
+        ensemble = self.models.get('ensemble', {})
+        if not ensemble.get('available'):
+            return {'success': False, 'error': 'Ensemble embeddings not available', 'results': []}
+
+        try:
+            index = self._ensemble_index(ensemble)
+            if by_ids is not None:
+                rows = self._ensemble_rows(ensemble)
+                if rows is None:
+                    return {'success': False, 'error': 'No ids available to look up by_id', 'results': []}
+                queries = [str(item_id) for item_id in by_ids]
+                found = [rows.get(item_id) for item_id in queries]
+                hit_rows = np.array([row for row in found if row is not None], dtype=np.int64)
+                Q = index.rows(hit_rows)
+                exclude = hit_rows
+            else:
+                Q = np.asarray(query_vectors, dtype=float) if query_vectors else np.empty((0, index.embeddings.shape[1]))
+                norms = np.linalg.norm(Q, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0
+                Q = Q / norms
+                queries = list(range(len(Q)))
+                found = queries
+                exclude = None
+
+            latency = 0.0
+            if len(Q):
+                top_idx, scores, latency = index.search(Q, top_k, exclude=exclude)
+
+            results = []
+            hit = 0
+            for query, row in zip(queries, found):
+                if row is None:
+                    results.append({'query': query, 'success': False, 'error': 'by_id not found', 'items': []})
+                    continue
+                items = self._format_items(ensemble, top_idx[hit], scores[hit])
+                results.append({'query': query, 'success': True, 'items': items})
+                hit += 1
+
+            return {
+                'success': True,
+                'results': results,
+                'index': {
+                    'backend': index.backend,
+                    'latency_ms': round(latency * 1000, 3),
+                    'recall': float(index.estimated_recall)
+                }
+            }
+        except Exception as e:
+            logger.error(f"Batch recommendation failed: {e}")
+            return {'success': False, 'error': str(e), 'results': []}
+
+    def _resolve_model_key(self, model_preference: str = 'auto'):
+        """Resolve a model preference to a loaded model key.
+
+        Returns ``(model_key, error)``. ``model_key`` is None with no error when
+        no trained model is loaded and the heuristic fallback should be used.
+        """
+        if model_preference == 'auto':
+            # Priority: Local XGBoost (offline first) > Hugging Face (online) > offline fallback
+            # Local models are waited for; a still-downloading HF model is skipped.
+            for key in ('local_xgboost', 'huggingface', 'offline'):
+                self.ensure_loaded(key, wait=(key != 'huggingface'))
+                if self.models.get(key, {}).get('available'):
+                    return key, None
+            return None, None
+
+        self.ensure_loaded(model_preference)
+        if model_preference not in self.models or not self.models.get(model_preference, {}).get('available'):
+            return None, f'Model {model_preference} not available'
+        return model_preference, None
+
+    def _heuristic_prediction(self, input_data: Dict) -> Dict:
+        """Lightweight fallback used when no trained models are available."""
+        try:
+            # Basic heuristic: estimate daily caloric needs as Energy_kcal_per_serving * meals per day
+            meals = int(input_data.get('mealsPerDay') or input_data.get('meals_per_day') or 3)
+            energy = float(input_data.get('Energy_kcal_per_serving') or input_data.get('energy') or 250)
+            caloric_needs = float(max(800.0, energy * meals))
+        except Exception:
+            caloric_needs = 2000.0
+
+        return {
+            'success': True,
+            'prediction': {
+                'caloric_needs': float(caloric_needs),
+                'unit': 'kcal/day',
+                'model': 'heuristic-fallback',
+                'accuracy': 'heuristic: approximate'
+            },
+            'model_info': {
+                'type': 'heuristic',
+                'size': 'n/a',
+                'mode': 'fallback',
+                'test_r2': None,
+                'test_mae': None
+            },
+            'status': 'fallback'
+        }
+
+    def _prediction_result(self, model_key: str, prediction: float, model_info: Dict) -> Dict:
+        """Build the response dict for a prediction made with the ``model_info`` entry."""
+        status = MODEL_STATUS.get(model_key, 'unknown')
+        return {
+            'success': True,
+            'prediction': {
+                'caloric_needs': float(prediction),
+                'unit': 'kcal/day',
+                'model': model_info['type'],
+                'accuracy': model_info['accuracy']
+            },
+            'model_info': {
+                'type': model_info['type'],
+                'size': model_info['size'],
+                'mode': status,
+                'test_r2': model_info['test_r2'],
+                'test_mae': model_info['test_mae']
+            },
+            'status': status
+        }
+
+    def _build_feature_plan(self, model) -> Tuple[str, ...]:
+        """
+        Compile the NutritionInput field order for a model's feature columns.
+
+        Runs once per model at load time so requests can go straight from the
+        validated input into a NumPy row. Raises ValueError if the model
+        expects a column that no NutritionInput field provides.
+        """
+        if self.feature_names:
+            columns = list(self.feature_names)
+        elif getattr(model, 'feature_names_in_', None) is not None:
+            columns = list(model.feature_names_in_)
+        else:
+            columns = list(NutritionInput.model_fields)
+
+        missing = [col for col in columns if str(col).lower() not in FEATURE_COLUMN_LOOKUP]
+        if missing:
+            raise ValueError(f"Model features not provided by NutritionInput: {missing}")
+
+        n_features = getattr(model, 'n_features_in_', None)
+        if n_features is not None and int(n_features) != len(columns):
+            raise ValueError(f"Model expects {n_features} features but feature plan has {len(columns)}")
+
+        return tuple(FEATURE_COLUMN_LOOKUP[str(col).lower()] for col in columns)
+
+    def _compile_model(self, model, plan: Tuple[str, ...]):
+        """
+        Flatten a tree model for fast small-batch inference, verified against ``model.predict``.
+
+        Returns None when the model type is unsupported or the check fails, in
+        which case the original model serves every request.
+        """
+        try:
+            sample = self._feature_matrix([NutritionInput.model_config['json_schema_extra']['example']], plan)
+        except ValueError:
+            sample = None
+        return compile_and_verify(model, len(plan), samples=sample)
+
+    def _feature_matrix(self, inputs: List[Dict], plan: Tuple[str, ...]) -> np.ndarray:
+        """Fill a preallocated float matrix with one row per input, in plan order."""
+        X = np.empty((len(inputs), len(plan)), dtype=np.float64)
+        for i, row in enumerate(inputs):
+            try:
+                X[i] = [row[field] for field in plan]
+            except KeyError:
+                # Accept model column names (any case) from direct loader callers
+                canonical = {
+                    FEATURE_COLUMN_LOOKUP.get(str(key).lower(), key): value
+                    for key, value in row.items()
+                }
+                missing = [field for field in plan if field not in canonical]
+                if missing:
+                    raise ValueError(f"Input missing features: {missing}")
+                X[i] = [canonical[field] for field in plan]
+        return X
+
+    def predict_batch(
+        self,
+        inputs: List[Dict],
+        model_preference: str = 'auto'
+    ) -> List[Dict]:
+        """
+        Score many inputs with a single ``model.predict`` call.
+
+        Returns one result dict per input, in order, each shaped like the
+        output of :meth:`predict`. Rows found in ``prediction_cache`` (when one
+        is attached and the batch is within its ``max_batch``) skip the model.
+        If the vectorized call fails the rows are rescored one by one so a bad
+        row only fails itself.
+        """
+        inputs = list(inputs)
+        if not inputs:
+            return []
+        observe = self.metrics_observer
+
+        model_key, error = self._resolve_model_key(model_preference)
+        if error is not None:
+            if observe is not None:
+                observe(model_preference, 'error', len(inputs), None)
+            return [{'success': False, 'error': error, 'status': 'error'} for _ in inputs]
+        if model_key is None:
+            # No trained models are available in this environment.
+            # Provide a lightweight heuristic fallback so the API remains usable for testing.
+            if observe is not None:
+                observe('heuristic', 'fallback', len(inputs), None)
+            return [self._heuristic_prediction(row) for row in inputs]
+
+        # Read the entry once so a concurrent hot reload cannot mix two versions
+        model_info = self.models[model_key]
+        cache = self.prediction_cache
+        if cache is not None and len(inputs) > cache.max_batch:
+            cache = None
+
+        try:
+            started = time.perf_counter()
+            X = self._feature_matrix(inputs, model_info['feature_plan'])
+            results: List[Optional[Dict]] = [None] * len(inputs)
+            keys = None
+            if cache is not None:
+                keys = [cache.key(model_key, model_info.get('version'), row) for row in X]
+                results = [cache.get(key) for key in keys]
+            misses = [i for i, result in enumerate(results) if result is None]
+            if observe is not None and len(misses) < len(inputs):
+                observe(model_key, 'cached', len(inputs) - len(misses), None)
+            if not misses:
+                return results
+
+            # The compiled trees win on small batches; large ones amortize the native call overhead
+            predictor = model_info.get('compiled')
+            if predictor is None or len(misses) > self.compiled_max_batch:
+                predictor = model_info['model']
+            prepared = time.perf_counter()
+            predictions = predictor.predict(X if len(misses) == len(inputs) else X[misses])
+            scored = time.perf_counter()
+            for i, prediction in zip(misses, predictions):
+                results[i] = self._prediction_result(model_key, prediction, model_info)
+                if keys is not None:
+                    cache.set(keys[i], model_key, results[i])
+            if observe is not None:
+                observe(model_key, 'success', len(misses), {
+                    'feature_prep': prepared - started,
+                    'inference': scored - prepared,
+                })
+            return results
+        except Exception as e:
+            if len(inputs) == 1:
+                logger.error(f"Prediction failed with {model_key}: {e}")
+                if observe is not None:
+                    observe(model_key, 'error', 1, None)
+                return [{'success': False, 'error': str(e), 'status': 'error'}]
+            logger.warning(f"Batch prediction failed with {model_key}: {e}; retrying row by row")
+
+        return [self.predict_batch([row], model_key)[0] for row in inputs]
+
     def predict(
         self,
         input_data: Dict,
@@ -315,142 +853,211 @@ class ModelLoader:
         """
         Make prediction with specified model preference.
         """
-        # Determine which model to use
-        if model_preference == 'auto':
-            # Priority: Local XGBoost (offline first) > Hugging Face (online) > offline fallback
-            if self.models.get('local_xgboost', {}).get('available'):
-                model_key = 'local_xgboost'
-            elif self.models.get('huggingface', {}).get('available'):
-                model_key = 'huggingface'
-            elif self.models.get('offline', {}).get('available'):
-                model_key = 'offline'
-            else:
-                # No trained models are available in this environment.
-                # Provide a lightweight heuristic fallback so the API remains usable for testing.
-                try:
-                    # Basic heuristic: estimate daily caloric needs as Energy_kcal_per_serving * meals per day
-                    meals = int(input_data.get('mealsPerDay') or input_data.get('meals_per_day') or 3)
-                    energy = float(input_data.get('Energy_kcal_per_serving') or input_data.get('energy') or 250)
-                    caloric_needs = float(max(800.0, energy * meals))
-                except Exception:
-                    caloric_needs = 2000.0
-
-                return {
-                    'success': True,
-                    'prediction': {
-                        'caloric_needs': float(caloric_needs),
-                        'unit': 'kcal/day',
-                        'model': 'heuristic-fallback',
-                        'accuracy': 'heuristic: approximate'
-                    },
-                    'model_info': {
-                        'type': 'heuristic',
-                        'size': 'n/a',
-                        'mode': 'fallback'
-                    },
-                    'status': 'fallback'
-                }
-        else:
-            model_key = model_preference
-            if model_key not in self.models or not self.models.get(model_key, {}).get('available'):
-                return {
-                    'success': False,
-                    'error': f'Model {model_key} not available',
-                    'status': 'error'
-                }
-        
-        # Get model
+        return self.predict_batch([input_data], model_preference)[0]
+    
+    def predict_frame(
+        self,
+        columns: Dict[str, np.ndarray],
+        model_preference: str = 'auto'
+    ) -> Dict:
+        """
+        Score column arrays (one per feature, any accepted column name) in one call.
+
+        For bulk scoring: no per-row dicts, result objects or cache lookups.
+        Missing values are passed to the model as NaN. Returns
+        ``{'predictions', 'model', 'version', 'status'}``; raises ValueError
+        when a feature column is absent or no trained model is available.
+        """
+        started = time.perf_counter()
+        model_key, error = self._resolve_model_key(model_preference)
+        if error is not None:
+            raise ValueError(error)
+        if model_key is None:
+            raise ValueError("No trained model available")
         model_info = self.models[model_key]
-        model = model_info['model']
-        
-        try:
-            # Prepare input
-            df = pd.DataFrame([input_data])
-            
-            # Normalize column names to match model expectations
-            column_mapping = {
-                'energy_kcal_per_serving': 'energy_kcal_per_serving',
-                'protein_g_per_serving': 'protein_g_per_serving',
-                'fat_g_per_serving': 'fat_g_per_serving',
-                'carbohydrates_g_per_serving': 'carbohydrate_g_per_serving',
-                'fiber_g_per_serving': 'fiber_g_per_serving',
-                'calcium_mg_per_serving': 'calcium_mg_per_serving',
-                'iron_mg_per_serving': 'iron_mg_per_serving',
-                'zinc_mg_per_serving': 'zinc_mg_per_serving',
-                'vitamina_ug_per_serving': 'vitamin_a_mcg_per_serving',
-                'vitaminc_mg_per_serving': 'vitamin_c_mg_per_serving',
-                'potassium_mg_per_serving': 'potassium_mg_per_serving',
-                'region_encoded': 'region_encoded',
-                'condition_encoded': 'condition_encoded',
-                'age_group_encoded': 'age_group_encoded',
-                'season_encoded': 'season_encoded'
-            }
-            df.columns = [col.lower() for col in df.columns]
-            df = df.rename(columns=column_mapping)
 
-            # If we have canonical feature order, apply it. Otherwise try model's
-            # feature_names_in_ attribute. If neither present, pass df as-is.
-            if self.feature_names:
-                try:
-                    df = df[self.feature_names]
-                except Exception as e:
-                    # columns missing or mismatched; fall back
-                    logger.warning(f"Feature names present but input missing some columns: {e}; falling back to available input columns")
-            else:
-                if hasattr(model, 'feature_names_in_'):
-                    cols = list(getattr(model, 'feature_names_in_'))
-                    try:
-                        df = df[cols]
-                    except Exception:
-                        logger.warning("Model expects different feature order; using provided input columns")
-
-            # Make prediction
-            prediction = model.predict(df)[0]
-
-            # Determine status based on model key
-            if model_key == 'huggingface':
-                status = 'online'
-            elif model_key == 'local_xgboost':
-                status = 'local'
-            elif model_key == 'offline':
-                status = 'offline'
-            else:
-                status = 'unknown'
+        by_field = {FEATURE_COLUMN_LOOKUP.get(str(name).lower(), name): values for name, values in columns.items()}
+        plan = model_info['feature_plan']
+        missing = [field for field in plan if field not in by_field]
+        if missing:
+            raise ValueError(f"Input missing features: {missing}")
 
-            return {
-                'success': True,
-                'prediction': {
-                    'caloric_needs': float(prediction),
-                    'unit': 'kcal/day',
-                    'model': model_info['type'],
-                    'accuracy': model_info['accuracy']
-                },
-                'model_info': {
-                    'type': model_info['type'],
-                    'size': model_info['size'],
-                    'mode': status,
-                    'test_r2': model_info['test_r2'],
-                    'test_mae': model_info['test_mae']
-                },
-                'status': status
-            }
-            
-        except Exception as e:
-            logger.error(f"Prediction failed with {model_key}: {e}")
-            return {
-                'success': False,
-                'error': str(e),
-                'status': 'error'
+        n_rows = len(by_field[plan[0]]) if plan else 0
+        X = np.empty((n_rows, len(plan)), dtype=np.float64)
+        for j, field in enumerate(plan):
+            X[:, j] = by_field[field]
+
+        predictor = model_info.get('compiled')
+        if predictor is None or n_rows > self.compiled_max_batch:
+            predictor = model_info['model']
+        prepared = time.perf_counter()
+        predictions = np.asarray(predictor.predict(X), dtype=np.float64).ravel() if n_rows else np.empty(0)
+        if self.metrics_observer is not None and n_rows:
+            self.metrics_observer(model_key, 'success', n_rows, {
+                'feature_prep': prepared - started,
+                'inference': time.perf_counter() - prepared,
+            })
+        return {
+            'predictions': predictions,
+            'model': model_key,
+            'version': model_info.get('version'),
+            'status': MODEL_STATUS.get(model_key, 'unknown'),
+        }
+
+    def _reload_artifacts(self, key: str, filename: Optional[str]) -> Dict[str, Path]:
+        """
+        Resolve the files to reload ``key`` from, keyed by role (model, embeddings, metadata).
+
+        An explicit ``filename`` must live in the local model directory.
+        """
+        role = 'embeddings' if key == 'ensemble' else 'model'
+        if filename is not None:
+            model_dir = self.local_model_dir.resolve()
+            path = (model_dir / filename).resolve()
+            if not path.is_relative_to(model_dir) or not path.is_file():
+                raise FileNotFoundError(f"{filename} not found in {self.local_model_dir}")
+            return {role: path}
+        if key in RELOAD_ARTIFACTS:
+            artifacts = {role: self._resolve_artifact(*RELOAD_ARTIFACTS[key])}
+        else:
+            artifacts = self._resolve_hf_artifacts(refresh=True)
+        if artifacts.get(role) is None:
+            raise FileNotFoundError(f"No artifact found to reload {key}")
+        return artifacts
+
+    def _build_entry(self, key: str, artifacts: Dict[str, Path]) -> Dict:
+        if key == 'local_xgboost':
+            return self._local_xgboost_entry(artifacts['model'])
+        if key == 'offline':
+            return self._offline_entry(artifacts['model'])
+        if key == 'huggingface':
+            return self._hf_snapshot_entry(artifacts['model'])
+
+        entry = self._ensemble_entry(artifacts['embeddings'], artifacts.get('metadata'))
+        current = self.models.get('ensemble', {})
+        if not entry['metadata'] and current.get('available'):
+            # An embeddings-only reload keeps the current item metadata
+            entry['metadata'] = current['metadata']
+        return entry
+
+    def _validate_entry(self, key: str, entry: Dict) -> Dict:
+        """Exercise a freshly built entry before it is swapped in; raises ValueError."""
+        if key == 'ensemble':
+            index = entry['index']
+            if len(index) == 0:
+                raise ValueError("Reloaded ensemble has no embeddings")
+            _, scores, _ = index.search(index.rows(np.array([0])), 1)
+            if not np.all(np.isfinite(scores)):
+                raise ValueError("Reloaded ensemble returned non-finite similarity scores")
+            return {'items': len(index)}
+
+        example = NutritionInput.model_config['json_schema_extra']['example']
+        X = self._feature_matrix([example], entry['feature_plan'])
+        prediction = float(np.asarray(entry['model'].predict(X), dtype=float).ravel()[0])
+        if not np.isfinite(prediction):
+            raise ValueError(f"Reloaded {key} model returned a non-finite prediction on the example input")
+        return {'example_prediction': prediction}
+
+    def _swap_entry(self, key: str, entry: Dict) -> Optional[Dict]:
+        """Replace the entry predictions read in one assignment, keeping the old one for rollback."""
+        previous = self.models.get(key)
+        if previous is not None and previous.get('available'):
+            history = self.previous_versions.setdefault(key, [])
+            history.append(previous)
+            keep = int(os.getenv('MODEL_RELOAD_KEEP_VERSIONS', '3'))
+            del history[:-keep or len(history)]
+        self.models[key] = entry
+        self._models_changed()
+        self._invalidate_cached_predictions(key)
+        return previous
+
+    def _invalidate_cached_predictions(self, key: str):
+        if self.prediction_cache is not None:
+            self.prediction_cache.invalidate(key)
+
+    def reload_model(self, key: str, filename: Optional[str] = None) -> Dict:
+        """
+        Load a new version of model ``key`` and swap it in without downtime.
+
+        The artifact (``filename`` inside the model dir, the newest matching local
+        artifact, or a refreshed Hugging Face snapshot) is loaded into a fresh entry and validated on the
+        ``/predict/example`` input before replacing the live entry in a single
+        assignment, so requests see either the old or the new model, never a
+        partially loaded one. The replaced entry is kept for :meth:`rollback_model`.
+        Raises KeyError, FileNotFoundError or ValueError and leaves the live
+        model untouched on failure.
+        """
+        if key not in RELOAD_ARTIFACTS and key not in ('huggingface', 'ensemble'):
+            raise KeyError(f"Unknown model: {key}")
+        # Let the startup load finish first so it cannot overwrite the reloaded entry
+        self.ensure_loaded(key)
+        with self._reload_lock:
+            started = time.perf_counter()
+            entry = self._build_entry(key, self._reload_artifacts(key, filename))
+            validation = self._validate_entry(key, entry)
+            previous = self._swap_entry(key, entry)
+            seconds = time.perf_counter() - started
+
+        previous_version = (previous or {}).get('version')
+        logger.info(f"Reloaded {key}: {previous_version} -> {entry['version']} in {seconds:.2f}s")
+        return {
+            'model': key,
+            'version': entry['version'],
+            'previous_version': previous_version,
+            'validation': validation,
+            'seconds': round(seconds, 3),
+        }
+
+    def rollback_model(self, key: str) -> Dict:
+        """Swap the most recently replaced version of ``key`` back in. Raises LookupError."""
+        with self._reload_lock:
+            history = self.previous_versions.get(key)
+            if not history:
+                raise LookupError(f"No previous version of {key} to roll back to")
+            entry = history.pop()
+            current = self.models.get(key, {})
+            self.models[key] = entry
+            self._models_changed()
+            self._invalidate_cached_predictions(key)
+
+        logger.info(f"Rolled back {key}: {current.get('version')} -> {entry.get('version')}")
+        return {'model': key, 'version': entry.get('version'), 'previous_version': current.get('version')}
+
+    def model_versions(self) -> Dict:
+        """Live and rollback versions for every model key."""
+        return {
+            key: {
+                'version': info.get('version'),
+                'loaded_at': info.get('loaded_at'),
+                'compiled': info.get('compiled') is not None,
+                'previous_versions': [old.get('version') for old in reversed(self.previous_versions.get(key, []))],
             }
-    
+            for key, info in list(self.models.items())
+            if info.get('available')
+        }
+
+    def watched_artifacts(self) -> Dict[str, Path]:
+        """Newest local artifact currently resolved for each reloadable local model."""
+        watched = {}
+        for key, patterns in RELOAD_ARTIFACTS.items():
+            path = self._resolve_artifact(*patterns)
+            if path is not None:
+                watched[key] = path
+        return watched
+
     def get_available_models(self) -> Dict:
-        """Get status of all models"""
-        return {
+        """Get status of all models, including ones whose loader has not finished"""
+        status = {
             key: {
                 'available': info.get('available', False),
                 'type': info.get('type'),
                 'size': info.get('size'),
-                'accuracy': info.get('accuracy')
+                'accuracy': info.get('accuracy'),
+                'state': self.load_state.get(LOADER_FOR_KEY.get(key, key), 'ready')
             }
-            for key, info in self.models.items()
+            for key, info in list(self.models.items())
         }
+        for name, state in self.load_state.items():
+            if name not in status:
+                status[name] = {'available': False, 'type': None, 'size': None, 'accuracy': None, 'state': state}
+        return status
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, field_validator, ConfigDict
-from typing import Optional, Dict, List, Any
+from pydantic import BaseModel, Field, field_validator, model_validator, ConfigDict, create_model
+from typing import Annotated, Optional, Dict, List, Any, Tuple
 from enum import Enum
 
+import numpy as np
+
 
 class Region(str, Enum):
     """Uganda regions"""
@@ -104,8 +106,8 @@ class ModelInfo(BaseModel):
     type: str = Field(..., description="Model type")
     size: str = Field(..., description="Model size")
     mode: str = Field(..., description="Deployment mode (online/offline)")
-    test_r2: float = Field(..., description="Test R² score")
-    test_mae: float = Field(..., description="Test MAE")
+    test_r2: Optional[float] = Field(None, description="Test R² score (null when not measured)")
+    test_mae: Optional[float] = Field(None, description="Test MAE (null when not measured)")
 
 
 class PredictionResponse(BaseModel):
@@ -122,6 +124,11 @@ class HealthStatus(BaseModel):
     status: str = Field(..., description="API status")
     version: str = Field(..., description="API version")
     models: Dict[str, bool] = Field(..., description="Available models")
+    ready: bool = Field(default=True, description="Whether all models have finished loading")
+    model_states: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Per-model load state (pending/loading/ready/unavailable)"
+    )
     timestamp: str = Field(..., description="Current timestamp")
 
 
@@ -153,3 +160,301 @@ class BatchPredictionResponse(BaseModel):
     total: int
     successful: int
     failed: int
+
+
+def field_bounds(model=None) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """``{field: (ge, le)}`` as declared on ``model``'s fields (default NutritionInput)."""
+    bounds = {}
+    for name, info in (model or NutritionInput).model_fields.items():
+        ge = le = None
+        for constraint in info.metadata:
+            ge = getattr(constraint, 'ge', ge)
+            le = getattr(constraint, 'le', le)
+        bounds[name] = (ge, le)
+    return bounds
+
+
+# Validation errors reported per request; a bad column can fail every row
+MAX_COLUMNAR_ERRORS = 50
+
+COLUMN_BOUNDS = field_bounds()
+
+
+def column_errors(columns: Dict[str, np.ndarray], loc: Tuple = ('body',)) -> List[Dict]:
+    """
+    Pydantic-style error dicts for ragged ``columns`` (NutritionInput field ->
+    float array) and for values outside the fields' ``ge``/``le`` bounds,
+    checked with vectorized comparisons. Locations are ``loc + (field, row)``.
+    """
+    first = next(iter(columns))
+    n_rows = len(columns[first])
+    errors = []
+    for name, values in columns.items():
+        if len(values) != n_rows:
+            errors.append({
+                'type': 'value_error',
+                'loc': loc + (name,),
+                'msg': f"Column has {len(values)} values; expected {n_rows} like {first}",
+                'input': None,
+            })
+    if errors:
+        return errors
+
+    for name, (ge, le) in COLUMN_BOUNDS.items():
+        values = columns.get(name)
+        if values is None:
+            continue
+        # NaN fails both comparisons, as it fails NutritionInput's checks
+        checks = []
+        if ge is not None:
+            checks.append(('greater_than_equal', 'greater than or equal to', 'ge', ge, ~(values >= ge)))
+        if le is not None:
+            checks.append(('less_than_equal', 'less than or equal to', 'le', le, ~(values <= le)))
+        for error_type, text, key, bound, failed in checks:
+            for row in np.flatnonzero(failed)[:MAX_COLUMNAR_ERRORS - len(errors)]:
+                errors.append({
+                    'type': error_type,
+                    'loc': loc + (name, int(row)),
+                    'msg': f"Input should be {text} {bound}",
+                    'input': float(values[row]),
+                    'ctx': {key: bound},
+                })
+            if len(errors) >= MAX_COLUMNAR_ERRORS:
+                return errors
+    return errors
+
+
+def valid_rows(columns: Dict[str, np.ndarray]) -> np.ndarray:
+    """Boolean mask of the rows whose ``columns`` values all lie within COLUMN_BOUNDS (NaN fails)."""
+    n_rows = len(next(iter(columns.values())))
+    valid = np.ones(n_rows, dtype=bool)
+    for name, (ge, le) in COLUMN_BOUNDS.items():
+        values = columns[name]
+        if ge is not None:
+            valid &= values >= ge
+        if le is not None:
+            valid &= values <= le
+    return valid
+
+
+def row_errors(columns: Dict[str, np.ndarray], n_rows: int) -> np.ndarray:
+    """
+    Return an object array with an error message per row (None when valid).
+
+    Uses the same bounds as NutritionInput (NaN fails them); the message
+    names the first failing field of each row. Absent columns are skipped.
+    """
+    errors = np.full(n_rows, None, dtype=object)
+    failed_rows = np.zeros(n_rows, dtype=bool)
+    for name, (ge, le) in COLUMN_BOUNDS.items():
+        values = columns.get(name)
+        if values is None:
+            continue
+        for text, bound, failed in (
+            ('greater than or equal to', ge, None if ge is None else ~(values >= ge)),
+            ('less than or equal to', le, None if le is None else ~(values <= le)),
+        ):
+            if failed is None:
+                continue
+            new = failed & ~failed_rows
+            if new.any():
+                errors[new] = f"{name}: Input should be {text} {bound}"
+                failed_rows |= new
+    return errors
+
+
+class _ColumnarBatch(BaseModel):
+    """Base for ColumnarBatchInput: turns the validated columns into arrays."""
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                name: [value, value]
+                for name, value in NutritionInput.model_config['json_schema_extra']['example'].items()
+            }
+        }
+    )
+
+    def to_arrays(self) -> Tuple[Dict[str, np.ndarray], List[Dict]]:
+        """
+        Return ``(columns, errors)``: one float64 array per NutritionInput field,
+        plus the :func:`column_errors` of those arrays.
+        """
+        columns = {name: np.asarray(getattr(self, name), dtype=np.float64) for name in NutritionInput.model_fields}
+        return columns, column_errors(columns)
+
+
+ColumnarBatchInput = create_model(
+    'ColumnarBatchInput',
+    __base__=_ColumnarBatch,
+    __doc__="""Batch prediction input with one array per NutritionInput field (all the same length)""",
+    prefer_online=(bool, Field(default=True, description="Prefer online model")),
+    **{
+        name: (List[info.annotation], Field(..., description=f"{info.description}, one value per row"))
+        for name, info in NutritionInput.model_fields.items()
+    }
+)
+
+
+class ColumnarBatchResponse(BaseModel):
+    """Columnar batch prediction response"""
+    success: bool
+    total: int = Field(..., description="Number of rows scored")
+    model: str = Field(..., description="Model key used for every row")
+    version: Optional[str] = Field(None, description="Version of that model")
+    status: str = Field(..., description="Status (online/offline)")
+    unit: str = Field(default="kcal/day", description="Unit of measurement")
+    caloric_needs: List[float] = Field(..., description="Predicted daily caloric needs, in input row order")
+
+
+class CatalogueScoreInput(BaseModel):
+    """Demographic profile and portion sizes to score every catalogue food for"""
+    region_encoded: int = Field(..., ge=0, le=3, description="Region code (0-3)")
+    condition_encoded: int = Field(..., ge=0, le=7, description="Health condition code (0-7)")
+    age_group_encoded: int = Field(..., ge=0, le=2, description="Age group code (0-2)")
+    season_encoded: int = Field(..., ge=0, le=1, description="Season code (0-1)")
+    portion_size_g: float = Field(default=250, gt=0, le=5000, description="Portion size in grams for every food")
+    category_portions_g: Dict[str, Annotated[float, Field(gt=0, le=5000)]] = Field(
+        default_factory=dict,
+        description="Portion size in grams per food category, overriding portion_size_g"
+    )
+    category: Optional[str] = Field(None, description="Only rank foods of this category, e.g. 'staples'")
+    local_only: bool = Field(default=False, description="Only rank foods of the profile's region and nationwide foods")
+    available: Optional[bool] = Field(None, description="Only foods that are (or are not) currently available")
+    limit: int = Field(default=50, ge=0, le=5000, description="Number of ranked foods to return")
+    ascending: bool = Field(default=False, description="Rank the lowest predictions first")
+    prefer_online: bool = Field(default=True, description="Prefer online model")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "region_encoded": 0,
+                "condition_encoded": 1,
+                "age_group_encoded": 1,
+                "season_encoded": 0,
+                "portion_size_g": 250,
+                "category_portions_g": {"vegetables": 100, "fats": 15},
+                "local_only": True,
+                "limit": 20
+            }
+        }
+    )
+
+
+class ScoredFood(BaseModel):
+    """One catalogue food with the prediction for a serving of it"""
+    rank: int = Field(..., description="1-based position in the ranking")
+    id: str
+    name: str
+    category: str
+    region: str
+    portion_size_g: float = Field(..., description="Serving size scored, in grams")
+    estimated_cost_ugx: float = Field(..., description="Cost of the serving in UGX")
+    caloric_needs: float = Field(..., description="Predicted daily caloric needs in kcal/day")
+
+
+class CatalogueScoreResponse(BaseModel):
+    """Catalogue foods ranked by their prediction for one profile"""
+    success: bool
+    catalogue_version: str = Field(..., description="Version of the food dataset that was scored")
+    model: str = Field(..., description="Model key used for every food")
+    version: Optional[str] = Field(None, description="Version of that model")
+    status: str = Field(..., description="Status (online/offline)")
+    unit: str = Field(default="kcal/day", description="Unit of measurement")
+    total: int = Field(..., description="Number of scored foods matching the filters")
+    skipped: int = Field(..., description="Foods not scored because a derived feature is outside the model's input range")
+    foods: List[ScoredFood]
+
+
+class MealPlanInput(BaseModel):
+    """Profile and energy target for a minimum-cost daily meal plan"""
+    region_encoded: int = Field(..., ge=0, le=3, description="Region code (0-3): foods sold there or nationwide")
+    condition_encoded: int = Field(..., ge=0, le=7, description="Health condition code (0-7): sets the nutrient targets")
+    season_encoded: int = Field(..., ge=0, le=1, description="Season code (0-1): foods on sale in that season")
+    caloric_needs: Optional[float] = Field(None, ge=800, le=5000, description="Daily energy target in kcal")
+    nutrition: Optional[NutritionInput] = Field(
+        None, description="Input to predict the daily energy target from when caloric_needs is omitted"
+    )
+    max_food_g: float = Field(default=500, gt=0, le=2000, description="Most grams of any one food per day")
+    max_total_g: float = Field(default=2500, gt=0, le=10000, description="Most grams of food per day")
+    portion_step_g: Optional[float] = Field(
+        None, ge=5, le=500, description="Give every amount as whole portions of this many grams (integer solve)"
+    )
+    min_availability: float = Field(default=0.5, ge=0, le=1, description="Leave out foods with a lower availability score")
+    energy_tolerance: float = Field(default=0.05, ge=0, le=0.5, description="Allowed relative deviation from the energy target")
+    prefer_online: bool = Field(default=True, description="Prefer online model")
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "region_encoded": 0,
+                "condition_encoded": 2,
+                "season_encoded": 1,
+                "caloric_needs": 1900,
+                "portion_step_g": 50
+            }
+        }
+    )
+
+    @model_validator(mode='after')
+    def check_energy_target(self):
+        if self.caloric_needs is None and self.nutrition is None:
+            raise ValueError("Provide caloric_needs or nutrition to predict it from")
+        return self
+
+
+class PlannedFood(BaseModel):
+    """One food of a meal plan"""
+    id: str
+    name: str
+    category: str
+    region: str
+    preparation: Optional[str] = None
+    grams: float = Field(..., description="Edible grams per day")
+    cost_ugx: float = Field(..., description="Cost at the regional market price")
+
+
+class NutrientTarget(BaseModel):
+    """Daily bounds for one nutrient"""
+    min: Optional[float] = None
+    max: Optional[float] = None
+
+
+class MealPlanResponse(BaseModel):
+    """Minimum-cost daily meal plan"""
+    success: bool
+    status: str = Field(..., description="Solver status (optimal, limit_reached, infeasible, ...)")
+    error: Optional[str] = None
+    caloric_needs: float = Field(..., description="Daily energy target in kcal")
+    prediction_model: Optional[str] = Field(None, description="Model that predicted the energy target, if predicted")
+    catalogue_version: str = Field(..., description="Version of the food dataset that was planned from")
+    candidates: int = Field(..., description="Foods available to the plan")
+    solve_ms: float = Field(..., description="Solver time in milliseconds")
+    cost_ugx: Optional[float] = Field(None, description="Daily cost of the plan in UGX")
+    lower_bound_ugx: Optional[float] = Field(None, description="Cost of the continuous (LP) optimum")
+    foods: List[PlannedFood]
+    nutrients: Dict[str, float] = Field(..., description="Daily totals of the plan")
+    targets: Dict[str, NutrientTarget]
+
+
+class BatchRecommendationInput(BaseModel):
+    """Batch recommendation input"""
+    by_ids: Optional[List[str]] = Field(None, description="Item ids to find similar foods for")
+    vectors: Optional[List[List[float]]] = Field(None, description="Query vectors to find similar foods for")
+    top_k: int = Field(default=5, ge=1, le=100, description="Number of similar items per query")
+
+    @field_validator('vectors')
+    @classmethod
+    def check_vector_lengths(cls, v):
+        # The vectors are searched as one matrix, so they must share a dimension
+        lengths = {len(vector) for vector in v or []}
+        if len(lengths) > 1:
+            raise ValueError(f"All vectors must have the same length; got lengths {sorted(lengths)}")
+        if 0 in lengths:
+            raise ValueError("Vectors must not be empty")
+        return v
+
+
+class ModelReloadRequest(BaseModel):
+    """Optional artifact to hot reload a model from"""
+    filename: Optional[str] = Field(None, description="Artifact file name inside the model directory (default: newest match)")
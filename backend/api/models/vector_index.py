@@ -0,0 +1,268 @@
+import os
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Above this many vectors `auto` switches from exact search to IVF
+AUTO_IVF_THRESHOLD = 20000
+
+# Rows converted to float32 at a time when scoring compact (float16/int8) stores
+SCORE_CHUNK_ROWS = 16384
+
+
+class VectorIndex:
+    """
+    Base class for cosine-similarity search over L2-normalized embeddings.
+
+    Subclasses implement :meth:`_search`; :meth:`search` adds timing so every
+    query can report its latency alongside the index's recall.
+
+    ``embeddings`` may be a read-only memory map in float32, float16 or int8;
+    compact stores are scored in float32 chunks and divided by ``scale``.
+    """
+
+    backend = 'base'
+
+    def __init__(self, embeddings: np.ndarray, scale: float = 1.0):
+        self.embeddings = embeddings
+        self.scale = float(scale)
+        self.compute_dtype = np.float64 if embeddings.dtype == np.float64 else np.float32
+        self.build_seconds = 0.0
+        # Recall@k against exact search, estimated at build time
+        self.estimated_recall = 1.0
+
+    def __len__(self) -> int:
+        return int(self.embeddings.shape[0])
+
+    def rows(self, selector) -> np.ndarray:
+        """Return the selected embedding rows as floats, undoing any quantization."""
+        rows = np.asarray(self.embeddings[selector], dtype=self.compute_dtype)
+        return rows / self.scale if self.scale != 1.0 else rows
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each query against every embedding."""
+        if self.embeddings.dtype == self.compute_dtype and self.scale == 1.0:
+            return queries @ self.embeddings.T
+        sims = np.empty((len(queries), len(self)), dtype=self.compute_dtype)
+        for start in range(0, len(self), SCORE_CHUNK_ROWS):
+            stop = start + SCORE_CHUNK_ROWS
+            sims[:, start:stop] = queries @ self.rows(slice(start, stop)).T
+        return sims
+
+    def _search(self, queries: np.ndarray, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int,
+        exclude: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray, float]:
+        """
+        Return ``(indices, scores, latency_seconds)`` for a 2-D array of
+        normalized queries. Rows are padded with -1 / -inf when fewer than
+        ``top_k`` candidates are found.
+
+        ``exclude`` optionally gives, per query, a row to leave out of its
+        results (e.g. the item being queried by id); use -1 for none.
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=self.compute_dtype))
+        if queries.shape[1] != self.embeddings.shape[1]:
+            raise ValueError(
+                f"Query dimension {queries.shape[1]} does not match embeddings ({self.embeddings.shape[1]})"
+            )
+        top_k = max(0, min(int(top_k), len(self)))
+        started = time.perf_counter()
+        if exclude is None:
+            indices, scores = self._search(queries, top_k)
+        else:
+            indices, scores = self._search(queries, min(top_k + 1, len(self)))
+            indices, scores = _drop_excluded(indices, scores, np.asarray(exclude), top_k)
+        return indices, scores, time.perf_counter() - started
+
+    def info(self) -> Dict:
+        return {
+            'backend': self.backend,
+            'size': len(self),
+            'build_seconds': round(self.build_seconds, 4),
+            'estimated_recall': round(float(self.estimated_recall), 4),
+        }
+
+
+def top_k_rows(sims: np.ndarray, top_k: int) -> np.ndarray:
+    """Column indices of the ``top_k`` largest values per row, best first.
+
+    Uses a partial selection so only the winners are sorted.
+    """
+    n = sims.shape[1]
+    if top_k <= 0:
+        return np.empty((sims.shape[0], 0), dtype=np.int64)
+    if top_k < n:
+        part = np.argpartition(-sims, top_k - 1, axis=1)[:, :top_k]
+    else:
+        part = np.broadcast_to(np.arange(n), sims.shape)
+    part_scores = np.take_along_axis(sims, part, axis=1)
+    return np.take_along_axis(part, np.argsort(-part_scores, axis=1, kind='stable'), axis=1)
+
+
+def _drop_excluded(indices, scores, exclude, top_k):
+    """Remove each row's excluded index and trim back to ``top_k`` columns."""
+    out_idx = np.full((len(indices), top_k), -1, dtype=np.int64)
+    out_scores = np.full((len(indices), top_k), -np.inf, dtype=np.float64)
+    for row, skip in enumerate(exclude):
+        keep = indices[row] != skip if skip >= 0 else slice(None)
+        kept_idx, kept_scores = indices[row][keep][:top_k], scores[row][keep][:top_k]
+        out_idx[row, :len(kept_idx)] = kept_idx
+        out_scores[row, :len(kept_scores)] = kept_scores
+    return out_idx, out_scores
+
+
+class ExactIndex(VectorIndex):
+    """Brute-force search: one matrix product against every embedding."""
+
+    backend = 'exact'
+
+    def _search(self, queries, top_k):
+        sims = self.similarities(queries)
+        order = top_k_rows(sims, top_k)
+        return order, np.take_along_axis(sims, order, axis=1)
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted-file index built with spherical k-means in pure NumPy.
+
+    Vectors are bucketed under their nearest of ``n_lists`` centroids; a query
+    scores only the members of its ``n_probe`` closest lists.
+    """
+
+    backend = 'ivf'
+
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        n_lists: Optional[int] = None,
+        n_probe: Optional[int] = None,
+        n_iter: int = 10,
+        seed: int = 0,
+        recall_sample: int = 64,
+        scale: float = 1.0
+    ):
+        super().__init__(embeddings, scale=scale)
+        started = time.perf_counter()
+        n = len(self)
+        self.n_lists = max(1, min(n, int(n_lists or round(np.sqrt(n)))))
+        self.n_probe = max(1, min(self.n_lists, int(n_probe or max(1, self.n_lists // 16))))
+        self.n_iter = int(n_iter)
+
+        rng = np.random.default_rng(seed)
+        self.centroids = self.rows(np.sort(rng.choice(n, size=self.n_lists, replace=False)))
+        assignment = self._assign()
+        for _ in range(self.n_iter):
+            sums = self._list_sums(assignment)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            # Re-seed empty lists from random vectors
+            if empty.any():
+                sums[empty] = self.rows(np.sort(rng.choice(n, size=int(empty.sum()), replace=False)))
+                norms[empty] = 1.0
+            self.centroids = sums / norms
+            new_assignment = self._assign()
+            if np.array_equal(new_assignment, assignment):
+                break
+            assignment = new_assignment
+
+        # Members of each list stored contiguously: list i is members[offsets[i]:offsets[i+1]]
+        self.members = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=self.n_lists)
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.build_seconds = time.perf_counter() - started
+
+        if recall_sample:
+            self.estimated_recall = self._estimate_recall(rng, recall_sample)
+
+    def _list_sums(self, assignment: np.ndarray) -> np.ndarray:
+        order = np.argsort(assignment, kind='stable')
+        counts = np.bincount(assignment, minlength=self.n_lists)
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        nonempty = counts > 0
+        sums = np.zeros_like(self.centroids)
+        sums[nonempty] = np.add.reduceat(self.rows(order), starts[nonempty], axis=0)
+        return sums
+
+    def _assign(self, chunk: int = 8192) -> np.ndarray:
+        assignment = np.empty(len(self), dtype=np.int64)
+        for start in range(0, len(self), chunk):
+            block = self.rows(slice(start, start + chunk)) @ self.centroids.T
+            assignment[start:start + chunk] = np.argmax(block, axis=1)
+        return assignment
+
+    def _estimate_recall(self, rng, sample: int, top_k: int = 10) -> float:
+        sample = min(sample, len(self))
+        queries = self.rows(np.sort(rng.choice(len(self), size=sample, replace=False)))
+        approx, _ = self._search(queries, min(top_k, len(self)))
+        exact, _ = ExactIndex(self.embeddings, scale=self.scale)._search(queries, min(top_k, len(self)))
+        return recall_at_k(approx, exact)
+
+    def _search(self, queries, top_k):
+        probe_sims = queries @ self.centroids.T
+        probes = np.argsort(-probe_sims, axis=1)[:, :self.n_probe]
+
+        indices = np.full((len(queries), top_k), -1, dtype=np.int64)
+        scores = np.full((len(queries), top_k), -np.inf, dtype=np.float64)
+        for row, lists in enumerate(probes):
+            candidates = np.concatenate([
+                self.members[self.offsets[i]:self.offsets[i + 1]] for i in lists
+            ])
+            # Sorted row access keeps memory-mapped reads sequential
+            candidates = np.sort(candidates)
+            sims = self.rows(candidates) @ queries[row]
+            order = top_k_rows(sims[np.newaxis, :], min(top_k, len(sims)))[0]
+            indices[row, :len(order)] = candidates[order]
+            scores[row, :len(order)] = sims[order]
+        return indices, scores
+
+    def info(self) -> Dict:
+        return {**super().info(), 'n_lists': self.n_lists, 'n_probe': self.n_probe}
+
+
+def recall_at_k(approx: np.ndarray, exact: np.ndarray) -> float:
+    """Fraction of exact top-k neighbours found by an approximate search."""
+    if exact.size == 0:
+        return 1.0
+    hits = sum(len(np.intersect1d(a[a >= 0], e)) for a, e in zip(approx, exact))
+    return hits / exact.size
+
+
+INDEX_BACKENDS = {
+    'exact': ExactIndex,
+    'ivf': IVFIndex,
+}
+
+
+def build_index(embeddings: np.ndarray, backend: Optional[str] = None, **params) -> VectorIndex:
+    """
+    Build a vector index over normalized ``embeddings``.
+
+    ``backend`` is 'exact', 'ivf' or 'auto' (default from ``VECTOR_INDEX_BACKEND``);
+    'auto' uses IVF above ``AUTO_IVF_THRESHOLD`` vectors. IVF build parameters
+    default to ``VECTOR_INDEX_NLIST`` / ``VECTOR_INDEX_NPROBE`` when set.
+    """
+    backend = (backend or os.getenv('VECTOR_INDEX_BACKEND', 'auto')).lower()
+    if backend == 'auto':
+        backend = 'ivf' if len(embeddings) > AUTO_IVF_THRESHOLD else 'exact'
+    if backend not in INDEX_BACKENDS:
+        raise ValueError(f"Unknown vector index backend: {backend}")
+
+    if backend == 'ivf':
+        for key, env in (('n_lists', 'VECTOR_INDEX_NLIST'), ('n_probe', 'VECTOR_INDEX_NPROBE')):
+            if key not in params and os.getenv(env):
+                params[key] = int(os.getenv(env))
+
+    index = INDEX_BACKENDS[backend](embeddings, **params)
+    logger.info(f"Built {backend} vector index over {len(index)} vectors in {index.build_seconds:.3f}s")
+    return index
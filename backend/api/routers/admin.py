@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import hmac
+import logging
+import os
+
+from ..models import ModelReloadRequest
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    responses={404: {"description": "Not found"}}
+)
+
+# Model loader will be injected by main app
+model_loader = None
+
+
+def set_model_loader(loader):
+    """Set the model loader instance"""
+    global model_loader
+    model_loader = loader
+
+
+def require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints are disabled unless ``ADMIN_TOKEN`` is set and sent as ``X-Admin-Token``."""
+    expected = os.getenv('ADMIN_TOKEN')
+    if not expected:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, expected):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+def _get_loader():
+    if model_loader is None:
+        raise HTTPException(status_code=500, detail="Model loader not initialized")
+    return model_loader
+
+
+@router.get(
+    "/models",
+    summary="Model versions",
+    description="Live and rollback versions for every loaded model",
+    dependencies=[Depends(require_admin_token)]
+)
+async def model_versions():
+    return _get_loader().model_versions()
+
+
+@router.post(
+    "/models/{model_key}/reload",
+    summary="Hot reload a model",
+    description="Load a new model version, validate it on the example input and swap it in without downtime",
+    dependencies=[Depends(require_admin_token)]
+)
+async def reload_model(model_key: str, request: Optional[ModelReloadRequest] = None):
+    """
+    Reload `local_xgboost`, `offline`, `huggingface` or `ensemble`.
+
+    Without a `filename` the newest matching artifact in the model directory
+    (or a refreshed Hugging Face snapshot) is used. The live model keeps
+    serving until the new one has loaded and passed validation.
+    """
+    loader = _get_loader()
+    filename = request.filename if request else None
+    try:
+        # Loading and validation run on a worker thread, off the request path
+        return await run_in_threadpool(loader.reload_model, model_key, filename)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Reload of {model_key} failed: {e}")
+        raise HTTPException(status_code=422, detail=f"Reload failed, live model unchanged: {e}")
+
+
+@router.post(
+    "/models/{model_key}/rollback",
+    summary="Roll back a model",
+    description="Swap the previously live version of a model back in",
+    dependencies=[Depends(require_admin_token)]
+)
+async def rollback_model(model_key: str):
+    try:
+        return _get_loader().rollback_model(model_key)
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
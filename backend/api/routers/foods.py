@@ -1,102 +1,97 @@
-from fastapi import APIRouter
-from pathlib import Path
-import pandas as pd
-
-router = APIRouter(prefix="/foods", tags=["Foods"])
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
 
+from ..services.catalogue import FoodCatalogue, InvalidCursorError, encode_cursor, decode_cursor, query_fingerprint
+from ..services.http_cache import EncodedBody
 
-def _normalize_region(r):
-    if not isinstance(r, str):
-        return 'all'
-    r = r.strip().lower()
-    if r in ('national', 'all', 'countrywide'):
-        return 'all'
-    return r
-
+router = APIRouter(prefix="/foods", tags=["Foods"])
 
-def _normalize_category(cat):
-    if not isinstance(cat, str):
-        return 'other'
-    return cat.strip().lower()
+# Parsed once and reloaded only when the CSV changes on disk
+food_catalogue = FoodCatalogue()
 
 
 @router.get('/local')
-def get_local_foods(limit: int = 500):
+def get_local_foods(
+    request: Request,
+    limit: int = Query(500, ge=0, description="Maximum number of foods to return (page size)"),
+    category: Optional[str] = Query(None, description="Food category, e.g. 'staples'"),
+    region: Optional[str] = Query(None, description="Region, e.g. 'central'; nationwide foods are included"),
+    available: Optional[bool] = Query(None, description="Only foods that are (or are not) currently available"),
+    min_energy: Optional[float] = Query(None, description="Minimum energy (kcal/100g)"),
+    max_energy: Optional[float] = Query(None, description="Maximum energy (kcal/100g)"),
+    min_protein: Optional[float] = Query(None, description="Minimum protein (g/100g)"),
+    max_protein: Optional[float] = Query(None, description="Maximum protein (g/100g)"),
+    min_fat: Optional[float] = Query(None, description="Minimum fat (g/100g)"),
+    max_fat: Optional[float] = Query(None, description="Maximum fat (g/100g)"),
+    min_carbs: Optional[float] = Query(None, description="Minimum carbohydrates (g/100g)"),
+    max_carbs: Optional[float] = Query(None, description="Maximum carbohydrates (g/100g)"),
+    min_fiber: Optional[float] = Query(None, description="Minimum fiber (g/100g)"),
+    max_fiber: Optional[float] = Query(None, description="Maximum fiber (g/100g)"),
+    min_calcium: Optional[float] = Query(None, description="Minimum calcium (mg/100g)"),
+    max_calcium: Optional[float] = Query(None, description="Maximum calcium (mg/100g)"),
+    min_iron: Optional[float] = Query(None, description="Minimum iron (mg/100g)"),
+    max_iron: Optional[float] = Query(None, description="Maximum iron (mg/100g)"),
+    min_price: Optional[float] = Query(None, description="Minimum market price (UGX/kg)"),
+    max_price: Optional[float] = Query(None, description="Maximum market price (UGX/kg)"),
+    sort: Optional[str] = Query(
+        None,
+        description="Sort field (name, energy, protein, fat, carbs, fiber, calcium, iron, "
+                    "pricePerKg, availability_score); prefix with '-' for descending"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page")
+):
     """
     Return a list of local foods derived from the uploaded `food_composition_clean.csv` file.
     The endpoint maps CSV columns to a compact JSON shape used by the frontend.
-    """
-    # Try several common locations for the dataset:
-    # 1) repository root: ../../..
-    # 2) frontend public data: ../../../../frontend/public/data/
-    repo_root = Path(__file__).resolve().parents[3]
-    candidates = [
-        repo_root / 'food_composition_clean.csv',
-        repo_root / 'frontend' / 'public' / 'data' / 'food_composition_clean.csv'
-    ]
-
-    csv_path = None
-    for p in candidates:
-        if p.exists():
-            csv_path = p
-            break
-
-    if csv_path is None:
-        return {"error": "food composition dataset not found", "checked": [str(x) for x in candidates]}
 
-    df = pd.read_csv(csv_path)
+    Filters are answered from indexes built when the dataset loads. The total
+    number of matches is returned in `X-Total-Count` and, when more pages
+    remain, the cursor for the next page in `X-Next-Cursor`; a cursor is only
+    accepted with the filters and sort of the request that issued it.
 
-    foods = []
-    seen = set()
-    for i, row in df.iterrows():
-        try:
-            name = row.get('food_name_english') or row.get('food_name') or ''
-            category = _normalize_category(row.get('food_category', 'other'))
-            region = _normalize_region(row.get('region', 'all'))
-
-            energy = float(row.get('energy_kcal_per_100g', 0) or 0)
-            protein = float(row.get('protein_g_per_100g', 0) or 0)
-            fat = float(row.get('fat_g_per_100g', 0) or 0)
-            carbs = float(row.get('carbohydrate_g_per_100g', 0) or 0)
-            fiber = float(row.get('fiber_g_per_100g', 0) or 0)
-            calcium = float(row.get('calcium_mg_per_100g', 0) or 0)
-            iron = float(row.get('iron_mg_per_100g', 0) or 0)
-
-            price = row.get('avg_market_price_ugx_per_kg')
-            try:
-                price = int(float(price)) if pd.notna(price) else 0
-            except Exception:
-                price = 0
-
-            availability_score = float(row.get('availability_score', 0) or 0)
-            available = availability_score >= 0.5
-
-            # normalize name for deduplication
-            clean_name = str(name).strip()
-            key = clean_name.lower()
-            if key in seen:
-                # skip duplicates by normalized name
-                continue
-            seen.add(key)
-
-            foods.append({
-                'id': f"food_{i}",
-                'name': clean_name,
-                'category': category,
-                'region': region,
-                'energy': round(energy, 1),
-                'protein': round(protein, 2),
-                'fat': round(fat, 2),
-                'carbs': round(carbs, 2),
-                'fiber': round(fiber, 2),
-                'calcium': round(calcium, 1),
-                'iron': round(iron, 2),
-                'pricePerKg': price,
-                'available': bool(available),
-            })
-        except Exception:
-            # Skip problematic rows
-            continue
-
-    # Limit the number of returned items to keep payload small
-    return foods[:int(limit)]
+    Responses carry a content-hash `ETag` (`If-None-Match` gets a 304) and
+    are serialized and gzip/brotli-compressed once per dataset version.
+    """
+    try:
+        catalogue = food_catalogue.get()
+    except FileNotFoundError:
+        return {"error": "food composition dataset not found", "checked": [str(x) for x in food_catalogue.candidates]}
+
+    bounds = {
+        'energy': (min_energy, max_energy),
+        'protein': (min_protein, max_protein),
+        'fat': (min_fat, max_fat),
+        'carbs': (min_carbs, max_carbs),
+        'fiber': (min_fiber, max_fiber),
+        'calcium': (min_calcium, max_calcium),
+        'iron': (min_iron, max_iron),
+        'pricePerKg': (min_price, max_price),
+    }
+    ranges = {field: bound for field, bound in bounds.items() if bound != (None, None)}
+    sort_key = sort or ''
+    query = query_fingerprint(category=category, region=region, available=available, ranges=ranges, sort=sort_key)
+
+    cache_key = (limit, category, region, available, tuple(sorted(ranges.items())), sort_key, cursor)
+    encoded = catalogue.response_cache.get(cache_key)
+    if encoded is not None:
+        return encoded.respond(request)
+
+    try:
+        after = decode_cursor(cursor, catalogue.version, query) if cursor else None
+        foods, total, last_rank = catalogue.query(
+            category=category,
+            region=region,
+            available=available,
+            ranges=ranges,
+            sort=sort,
+            after=after,
+            limit=limit
+        )
+    except (InvalidCursorError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    headers = {'X-Total-Count': str(total)}
+    if last_rank is not None:
+        headers['X-Next-Cursor'] = encode_cursor(catalogue.version, query, last_rank)
+    encoded = catalogue.response_cache.put(cache_key, EncodedBody(foods, headers))
+    return encoded.respond(request)
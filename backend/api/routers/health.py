@@ -1,6 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from datetime import datetime
 from ..models import HealthStatus, ModelStatus, EncodingReference
+from ..services.http_cache import EncodedBody, StaticBody
 
 router = APIRouter(
     prefix="/health",
@@ -27,8 +28,13 @@ def set_model_loader(loader):
 async def health_check():
     """
     Check if API is running and which models are available.
+
+    Responds immediately during startup; `ready` and `model_states` report
+    which models are still loading.
     """
     models_status = {}
+    model_states = {}
+    ready = False
     
     if model_loader:
         available = model_loader.get_available_models()
@@ -36,11 +42,18 @@ async def health_check():
             key: info['available']
             for key, info in available.items()
         }
+        model_states = {
+            key: info.get('state', 'ready')
+            for key, info in available.items()
+        }
+        ready = model_loader.ready
     
     return {
         "status": "healthy",
         "version": "1.0.0",
         "models": models_status,
+        "ready": ready,
+        "model_states": model_states,
         "timestamp": datetime.now().isoformat()
     }
 
@@ -75,64 +88,55 @@ async def get_model_status():
     }
 
 
+ENCODING_REFERENCE = {
+    "regions": {
+        0: "Central Uganda (Buganda)",
+        1: "Western Uganda (Ankole, Tooro, Kigezi, Bunyoro)",
+        2: "Eastern Uganda (Busoga, Bugisu, Teso)",
+        3: "Northern Uganda (Acholi, Lango, Karamoja, West Nile)"
+    },
+    "conditions": {
+        0: "Hypertension",
+        1: "Undernutrition",
+        2: "Anemia",
+        3: "Frailty",
+        4: "Digestive issues",
+        5: "Arthritis",
+        6: "Osteoporosis",
+        7: "Diabetes"
+    },
+    "age_groups": {
+        0: "80+",
+        1: "60-70",
+        2: "70-80"
+    },
+    "seasons": {
+        0: "Dry",
+        1: "Wet"
+    }
+}
+
+# Serialized and compressed once at import
+encoding_body = EncodedBody(ENCODING_REFERENCE, brotli_quality=11, gzip_level=9)
+
+
 @router.get(
     "/encoding",
     response_model=EncodingReference,
     summary="Encoding Reference",
     description="Get encoding mappings for categorical features"
 )
-async def get_encoding_reference():
+async def get_encoding_reference(request: Request):
     """
     Get the encoding mappings for categorical features.
     
     Use these mappings to convert categorical values to encoded integers.
     """
-    return {
-        "regions": {
-            0: "Central Uganda (Buganda)",
-            1: "Western Uganda (Ankole, Tooro, Kigezi, Bunyoro)",
-            2: "Eastern Uganda (Busoga, Bugisu, Teso)",
-            3: "Northern Uganda (Acholi, Lango, Karamoja, West Nile)"
-        },
-        "conditions": {
-            0: "Hypertension",
-            1: "Undernutrition",
-            2: "Anemia",
-            3: "Frailty",
-            4: "Digestive issues",
-            5: "Arthritis",
-            6: "Osteoporosis",
-            7: "Diabetes"
-        },
-        "age_groups": {
-            0: "80+",
-            1: "60-70",
-            2: "70-80"
-        },
-        "seasons": {
-            0: "Dry",
-            1: "Wet"
-        }
-    }
+    return encoding_body.respond(request)
 
 
-@router.get(
-    "/metrics",
-    summary="Model Metrics",
-    description="Get performance metrics for all models"
-)
-async def get_model_metrics():
-    """
-    Get performance metrics for all available models.
-    
-    **Metrics:**
-    - R² Score: Coefficient of determination (higher is better)
-    - MAE: Mean Absolute Error in kcal/day (lower is better)
-    - Size: Model file size
-    """
-    if not model_loader:
-        return {"error": "Model loader not initialized"}
-    
+def model_metrics() -> dict:
+    """The /health/metrics payload for the current models."""
     available = model_loader.get_available_models()
     
     metrics = {}
@@ -151,3 +155,26 @@ async def get_model_metrics():
         "models": metrics,
         "recommendation": "Use 'huggingface' for best accuracy (online), 'local_xgboost' for offline best, or 'offline' for smallest size"
     }
+
+
+# Rebuilt only when a model finishes loading or is reloaded
+metrics_body = StaticBody(model_metrics, version=lambda: (id(model_loader), model_loader.generation))
+
+
+@router.get(
+    "/metrics",
+    summary="Model Metrics",
+    description="Get performance metrics for all models"
+)
+async def get_model_metrics(request: Request):
+    """
+    Get performance metrics for all available models.
+    
+    **Metrics:**
+    - R² Score: Coefficient of determination (higher is better)
+    - MAE: Mean Absolute Error in kcal/day (lower is better)
+    - Size: Model file size
+    """
+    if not model_loader:
+        return {"error": "Model loader not initialized"}
+    return metrics_body.respond(request)
@@ -1,15 +1,34 @@
 from fastapi import APIRouter, Response
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
-import time
+from prometheus_client import REGISTRY, CollectorRegistry, generate_latest, CONTENT_TYPE_LATEST
+from prometheus_client import multiprocess
+
+from ..services.metrics import MULTIPROCESS_DIR
 
 router = APIRouter(tags=["Metrics"])
 
-# Metrics
-prediction_counter = Counter('predictions_total', 'Total number of predictions', ['model', 'status'])
-prediction_duration = Histogram('prediction_duration_seconds', 'Time spent processing prediction')
-model_accuracy = Gauge('model_accuracy', 'Model accuracy', ['model'])
+# Runtime collector will be injected by main app on startup
+runtime_collector = None
+
+
+def set_runtime_collector(collector):
+    """Set the RuntimeCollector whose gauges this worker exposes"""
+    global runtime_collector
+    runtime_collector = collector
+
+
+def metrics_registry():
+    """The registry to expose: this process's, or an aggregate of every worker's files."""
+    if MULTIPROCESS_DIR is None:
+        return REGISTRY
+    if runtime_collector is not None:
+        # Make the serving worker's own gauges current before aggregating
+        runtime_collector.publish()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
 
 @router.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
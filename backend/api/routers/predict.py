@@ -1,13 +1,53 @@
-from fastapi import APIRouter, HTTPException, Query
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from typing import Dict, Optional
 import logging
 
+import numpy as np
+import pyarrow as pa
+
 from ..models import (
     NutritionInput,
     PredictionResponse,
     BatchPredictionInput,
-    BatchPredictionResponse
+    BatchPredictionResponse,
+    ColumnarBatchInput,
+    ColumnarBatchResponse,
+    CatalogueScoreInput,
+    CatalogueScoreResponse,
+    MealPlanInput,
+    MealPlanResponse,
+    BatchRecommendationInput
+)
+from ..models.schemas import column_errors, field_bounds, valid_rows
+from ..services import binary_formats
+from ..services.binary_formats import (
+    ARROW_STREAM,
+    MEDIA_TYPES,
+    MSGPACK,
+    arrow_columns,
+    arrow_stream,
+    media_format,
+    missing_feature_errors,
+    negotiate,
+    result_batch
+)
+from ..services.catalogue import ENCODED_REGIONS
+from ..services.executor import QueueFullError
+from ..services.fast_json import FastJSONResponse
+from ..services.http_cache import EncodedBody
+from ..services.instrumentation import mark_handler_finished, mark_handler_started
+from ..services.meal_planner import MealPlanner
+from ..services.stream_scoring import (
+    iter_spool,
+    spool_body,
+    stream_arrow_predictions,
+    stream_format,
+    stream_predictions
 )
+from . import foods
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +67,67 @@ def set_model_loader(loader):
     model_loader = loader
 
 
+# Inference executor will be injected by main app on startup
+inference_executor = None
+
+
+def set_inference_executor(executor):
+    """Set the executor used to run inference off the event loop"""
+    global inference_executor
+    inference_executor = executor
+
+
+async def run_inference(fn, *args, **kwargs):
+    """Run a blocking model call on the inference executor.
+
+    Falls back to calling inline when no executor has been injected.
+    Raises 503 when the executor queue is full.
+    """
+    if inference_executor is None:
+        return fn(*args, **kwargs)
+    try:
+        return await inference_executor.run(fn, *args, **kwargs)
+    except QueueFullError as e:
+        logger.warning(f"Rejecting inference request: {e}")
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+# Optional micro-batcher for single predictions, injected by main app on startup
+micro_batcher = None
+
+
+def set_micro_batcher(batcher):
+    """Set the micro-batcher used to coalesce single predictions"""
+    global micro_batcher
+    micro_batcher = batcher
+
+
+async def score_batch(inputs, model_preference='auto'):
+    """Score a list of input dicts with one vectorized loader call."""
+    return await run_inference(model_loader.predict_batch, inputs, model_preference=model_preference)
+
+
+def prediction_response(result: Dict) -> Dict:
+    """
+    A loader result dict in PredictionResponse's shape (field order, missing
+    optional fields as null), for responses that skip response-model validation.
+    """
+    info = result.get('model_info')
+    return {
+        'success': result['success'],
+        'prediction': result.get('prediction'),
+        'model_info': None if info is None else {
+            'type': info['type'],
+            'size': info['size'],
+            'mode': info['mode'],
+            'test_r2': info.get('test_r2'),
+            'test_mae': info.get('test_mae'),
+        },
+        'status': result['status'],
+        'error': result.get('error'),
+    }
+
+
 @router.post(
     "/",
     response_model=PredictionResponse,
@@ -35,12 +136,13 @@ def set_model_loader(loader):
 )
 async def predict_caloric_needs(
     input_data: NutritionInput,
+    request: Request,
     model: Optional[str] = Query(
         'auto',
         description="Model to use: 'auto', 'huggingface', 'local_xgboost', or 'offline'"
     )
 ):
-  
+    mark_handler_started(request)
     if model_loader is None:
         raise HTTPException(status_code=500, detail="Model loader not initialized")
     
@@ -50,69 +152,542 @@ async def predict_caloric_needs(
         input_dict = input_data.model_dump()
         
         # Make prediction
-        result = model_loader.predict(input_dict, model_preference=model)
+        if micro_batcher is not None:
+            result = await micro_batcher.submit(input_dict, model_preference=model)
+        else:
+            result = await run_inference(model_loader.predict, input_dict, model_preference=model)
         
         if not result['success']:
             raise HTTPException(status_code=500, detail=result.get('error', 'Prediction failed'))
         
-        return result
+        mark_handler_finished(request)
+        return FastJSONResponse(prediction_response(result))
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Prediction error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _body_error(message: str) -> RequestValidationError:
+    return RequestValidationError([{'type': 'value_error', 'loc': ('body',), 'msg': message, 'input': None}])
+
+
+def _response_formats(*formats: str) -> tuple:
+    """``formats`` without MessagePack when msgpack is not installed."""
+    return tuple(fmt for fmt in formats if fmt != 'msgpack' or binary_formats.MSGPACK_AVAILABLE)
+
+
+def _parse_batch_input(body: bytes, fmt: str) -> BatchPredictionInput:
+    """Validate a JSON or MessagePack batch body, raising the usual 422 on errors."""
+    try:
+        if fmt == 'json':
+            return BatchPredictionInput.model_validate_json(body)
+        try:
+            data = binary_formats.unpack(body)
+        except Exception as e:
+            raise _body_error(f"Invalid MessagePack body: {e}")
+        return BatchPredictionInput.model_validate(data)
+    except ValidationError as e:
+        raise RequestValidationError([
+            {**error, 'loc': ('body', *error['loc'])} for error in e.errors(include_url=False)
+        ])
+
+
+def _read_arrow_body(body: bytes) -> pa.Table:
+    try:
+        return pa.ipc.open_stream(body).read_all()
+    except pa.ArrowException as e:
+        raise _body_error(f"Invalid Arrow IPC stream: {e}")
+
+
+def _encoded(payload: Dict, fmt: str) -> Response:
+    """Return ``payload`` as a MessagePack or JSON response (bypassing the route's response model)."""
+    if fmt == 'msgpack':
+        return Response(content=binary_formats.pack(payload), media_type=MSGPACK)
+    return FastJSONResponse(payload)
+
+
+def _batch_request_body() -> Dict:
+    """OpenAPI request body for /predict/batch: the JSON schema for JSON and MessagePack, plus Arrow."""
+    schema = BatchPredictionInput.model_json_schema(ref_template='#/components/schemas/{model}')
+    schema.pop('$defs', None)
+    return {'requestBody': {'required': True, 'content': {
+        'application/json': {'schema': schema},
+        MSGPACK: {'schema': schema},
+        ARROW_STREAM: {'schema': {'type': 'string', 'format': 'binary'}},
+    }}}
+
+
 @router.post(
     "/batch",
     response_model=BatchPredictionResponse,
     summary="Batch Predictions",
-    description="Make predictions for multiple inputs at once"
+    description="Make predictions for multiple inputs at once",
+    openapi_extra=_batch_request_body(),
+    responses={
+        200: {"content": {MSGPACK: {}, ARROW_STREAM: {}}},
+        415: {"description": "Unsupported body format"}
+    }
 )
-async def batch_predict(
-    batch_input: BatchPredictionInput
-):
+async def batch_predict(request: Request):
     """
     Make predictions for multiple inputs.
     
     **Benefits:**
-    - More efficient for multiple predictions
+    - Scores the whole batch in a single model call
     - Returns summary statistics
     - Continues on individual errors
+
+    **Formats** (`Content-Type` for the body, `Accept` for the response):
+    - `application/json` (default) and `application/msgpack` carry the same
+      structure.
+    - `application/vnd.apache.arrow.stream`: one column per NutritionInput
+      field (field or model column names). Set the schema metadata
+      `prefer_online` to `false` to use the offline model. The columns are
+      scored as a whole like `/predict/batch/columnar`; JSON and MessagePack
+      responses then have that endpoint's shape.
+    - Arrow responses have `caloric_needs`, `status` and `error` columns, one
+      row per input row. `unit`, plus `model` and `version` for Arrow input,
+      are in the schema metadata.
     """
+    fmt = media_format(request.headers.get('content-type'), default='json')
+    if fmt not in _response_formats('json', 'msgpack', 'arrow'):
+        raise HTTPException(status_code=415, detail="Send application/json, application/msgpack or " + ARROW_STREAM)
+    offered = _response_formats('json', 'msgpack', 'arrow')
+    response_fmt = negotiate(request.headers.get('accept'), offered) or offered[0]
+
+    body = await request.body()
+    if fmt == 'arrow':
+        return await _batch_predict_arrow(request, body, response_fmt)
+
+    batch_input = _parse_batch_input(body, fmt)
+    mark_handler_started(request)
     if model_loader is None:
         raise HTTPException(status_code=500, detail="Model loader not initialized")
     
-    results = []
-    successful = 0
-    failed = 0
-    
     model_pref = 'auto' if batch_input.prefer_online else 'offline'
     
-    for input_data in batch_input.inputs:
-        try:
-            input_dict = input_data.model_dump()
-            result = model_loader.predict(input_dict, model_preference=model_pref)
-            results.append(result)
-            
-            if result['success']:
-                successful += 1
-            else:
-                failed += 1
-        except Exception as e:
-            results.append({
-                'success': False,
-                'error': str(e),
-                'status': 'error'
-            })
-            failed += 1
+    try:
+        inputs = [input_data.model_dump() for input_data in batch_input.inputs]
+        results = await score_batch(inputs, model_preference=model_pref)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch prediction error: {e}")
+        results = [
+            {'success': False, 'error': str(e), 'status': 'error'}
+            for _ in batch_input.inputs
+        ]
     
-    return {
+    successful = sum(1 for result in results if result['success'])
+    failed = len(results) - successful
+    
+    mark_handler_finished(request)
+    if response_fmt == 'arrow':
+        return Response(content=arrow_stream([binary_formats.results_batch(results)]), media_type=ARROW_STREAM)
+    return _encoded({
         'success': True,
-        'predictions': results,
+        'predictions': [prediction_response(result) for result in results],
         'total': len(batch_input.inputs),
         'successful': successful,
         'failed': failed
+    }, response_fmt)
+
+
+async def _batch_predict_arrow(request: Request, body: bytes, response_fmt: str) -> Response:
+    """Score an Arrow IPC body column-wise; the columns are used without per-row objects."""
+    table = _read_arrow_body(body)
+    errors = missing_feature_errors(table.schema)
+    columns = arrow_columns(table)
+    if not errors:
+        errors = column_errors(columns)
+    if errors:
+        raise RequestValidationError(errors)
+    mark_handler_started(request)
+    if model_loader is None:
+        raise HTTPException(status_code=500, detail="Model loader not initialized")
+
+    metadata = table.schema.metadata or {}
+    prefer_online = metadata.get(b'prefer_online', b'true').decode().strip().lower() not in ('false', '0', 'no')
+    try:
+        result = await run_inference(
+            model_loader.predict_frame, columns, model_preference='auto' if prefer_online else 'offline'
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Arrow batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    mark_handler_finished(request)
+    if response_fmt == 'arrow':
+        content = arrow_stream(
+            [result_batch(result['predictions'], result['status'])],
+            metadata={'model': result['model'], 'version': result['version']}
+        )
+        return Response(content=content, media_type=ARROW_STREAM)
+    return _encoded({
+        'success': True,
+        'total': len(result['predictions']),
+        'model': result['model'],
+        'version': result['version'],
+        'status': result['status'],
+        'unit': 'kcal/day',
+        'caloric_needs': result['predictions']
+    }, response_fmt)
+
+
+@router.post(
+    "/batch/columnar",
+    response_model=ColumnarBatchResponse,
+    summary="Columnar Batch Predictions",
+    description="Score a batch sent as one array per input field"
+)
+async def batch_predict_columnar(
+    batch_input: ColumnarBatchInput,
+    request: Request
+):
+    """
+    Make predictions for many rows sent column by column.
+
+    Each NutritionInput field is an array with one value per row. Values are
+    range-checked with vectorized comparisons against the same bounds as
+    `/predict/` and go straight into the feature matrix, so large batches skip
+    per-row validation. Any invalid value fails the request with a 422 that
+    locates it as `[field, row]`.
+    """
+    columns, errors = batch_input.to_arrays()
+    if errors:
+        raise RequestValidationError(errors)
+    mark_handler_started(request)
+    if model_loader is None:
+        raise HTTPException(status_code=500, detail="Model loader not initialized")
+
+    model_pref = 'auto' if batch_input.prefer_online else 'offline'
+    try:
+        result = await run_inference(model_loader.predict_frame, columns, model_preference=model_pref)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Columnar batch prediction error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    mark_handler_finished(request)
+    return FastJSONResponse({
+        'success': True,
+        'total': len(result['predictions']),
+        'model': result['model'],
+        'version': result['version'],
+        'status': result['status'],
+        'unit': 'kcal/day',
+        'caloric_needs': result['predictions']
+    })
+
+
+# CatalogueScoreInput fields repeated as features for every food
+PROFILE_FIELDS = ('region_encoded', 'condition_encoded', 'age_group_encoded', 'season_encoded')
+
+
+def _score_catalogue(catalogue, portions: np.ndarray, profile: Dict[str, int], model_preference: str) -> Dict:
+    """
+    Score one serving of every catalogue food in a single model call.
+
+    Foods whose derived features fall outside NutritionInput's bounds are
+    not scored and get a NaN prediction.
+    """
+    columns = catalogue.serving_features(portions, profile)
+    valid = valid_rows(columns)
+    result = model_loader.predict_frame(
+        {name: values[valid] for name, values in columns.items()}, model_preference=model_preference
+    )
+    predictions = np.full(catalogue.size, np.nan)
+    predictions[valid] = result['predictions']
+    return {**result, 'predictions': predictions, 'portions': portions, 'costs': columns['estimated_cost_ugx']}
+
+
+@router.post(
+    "/catalogue",
+    response_model=CatalogueScoreResponse,
+    summary="Score the Food Catalogue",
+    description="Rank every catalogue food by its prediction for one demographic profile"
+)
+async def score_catalogue(score_input: CatalogueScoreInput, request: Request):
+    """
+    Score a serving of every food in `food_composition_clean.csv` for one
+    profile (region, condition, age group and season).
+
+    Per-serving features are derived from the per-100g columns and the
+    portion size (`portion_size_g`, or `category_portions_g` for a
+    category); the cost is the market price per kg times the portion. All
+    foods are scored in one vectorized model call and ranked by prediction,
+    highest first unless `ascending`. Foods with a derived value outside
+    `/predict/`'s input ranges are left out and counted in `skipped`.
+
+    Scores are cached per profile, portion sizes, model and dataset version,
+    so other filters and limits for the same profile skip the model. The
+    response carries an `ETag` and is compressed once per request shape.
+    """
+    mark_handler_started(request)
+    if model_loader is None:
+        raise HTTPException(status_code=500, detail="Model loader not initialized")
+    try:
+        catalogue = foods.food_catalogue.get()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="food composition dataset not found")
+
+    model_pref = 'auto' if score_input.prefer_online else 'offline'
+    profile = {name: getattr(score_input, name) for name in PROFILE_FIELDS}
+    category_portions = tuple(sorted(
+        (category.strip().lower(), grams) for category, grams in score_input.category_portions_g.items()
+    ))
+    # The loader generation changes whenever a model is loaded or swapped
+    score_key = (id(model_loader), model_loader.generation, model_pref,
+                 tuple(profile.values()), score_input.portion_size_g, category_portions)
+    response_key = ('catalogue_scores', score_key, score_input.category, score_input.local_only,
+                    score_input.available, score_input.limit, score_input.ascending)
+    encoded = catalogue.response_cache.get(response_key)
+    if encoded is not None:
+        mark_handler_finished(request)
+        return encoded.respond(request)
+
+    scored = catalogue.score_cache.get(score_key)
+    if scored is None:
+        portions = catalogue.portions(score_input.portion_size_g, dict(category_portions))
+        try:
+            scored = await run_inference(_score_catalogue, catalogue, portions, profile, model_pref)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Catalogue scoring error: {e}")
+            raise HTTPException(status_code=500, detail=str(e))
+        catalogue.score_cache.put(score_key, scored)
+
+    predictions = scored['predictions']
+    mask = catalogue.filter_mask(
+        category=score_input.category,
+        region=ENCODED_REGIONS[score_input.region_encoded] if score_input.local_only else None,
+        available=score_input.available
+    )
+    scored_rows = ~np.isnan(predictions)
+    if mask is None:
+        mask = np.ones(catalogue.size, dtype=bool)
+    matched = mask & scored_rows
+    positions = np.flatnonzero(matched)
+    order = np.argsort(predictions[positions] if score_input.ascending else -predictions[positions], kind='stable')
+    ranked = positions[order[:score_input.limit]]
+
+    ranked_foods = []
+    for rank, pos in enumerate(ranked.tolist(), start=1):
+        record = catalogue.records[pos]
+        ranked_foods.append({
+            'rank': rank,
+            'id': record['id'],
+            'name': record['name'],
+            'category': record['category'],
+            'region': record['region'],
+            'portion_size_g': scored['portions'][pos],
+            'estimated_cost_ugx': scored['costs'][pos],
+            'caloric_needs': predictions[pos],
+        })
+
+    mark_handler_finished(request)
+    encoded = catalogue.response_cache.put(response_key, EncodedBody({
+        'success': True,
+        'catalogue_version': catalogue.version,
+        'model': scored['model'],
+        'version': scored['version'],
+        'status': scored['status'],
+        'unit': 'kcal/day',
+        'total': len(positions),
+        'skipped': int((mask & ~scored_rows).sum()),
+        'foods': ranked_foods
+    }))
+    return encoded.respond(request)
+
+
+# Minimum-cost meal plans; matrices are built per catalogue version on first use
+meal_planner = MealPlanner()
+
+# Predicted energy targets are held to the range accepted for caloric_needs
+ENERGY_TARGET_BOUNDS = field_bounds(MealPlanInput)['caloric_needs']
+
+
+@router.post(
+    "/meal-plan",
+    response_model=MealPlanResponse,
+    summary="Minimum-Cost Meal Plan",
+    description="Solve for the cheapest day of regional foods meeting the energy and nutrient targets"
+)
+async def plan_meals(plan_input: MealPlanInput, request: Request):
+    """
+    Build a daily meal plan at minimum cost from the foods sold in the
+    profile's region and season, using regional market prices.
+
+    The energy target is `caloric_needs`, or predicted from `nutrition` with
+    the model; a prediction outside the range accepted for `caloric_needs`
+    is rejected with 422. Nutrient targets follow the condition (e.g. less sodium and
+    more potassium for hypertension, more iron for anemia). The plan is
+    solved as a sparse LP over the whole catalogue; with `portion_step_g`
+    the amounts are then rounded to whole portions by a MILP started from
+    the LP's foods. `success` is false with the solver's message when no
+    plan meets the targets.
+    """
+    mark_handler_started(request)
+    try:
+        catalogue = foods.food_catalogue.get()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="food composition dataset not found")
+
+    caloric_needs, prediction_model = plan_input.caloric_needs, None
+    if caloric_needs is None:
+        if model_loader is None:
+            raise HTTPException(status_code=500, detail="Model loader not initialized")
+        model_pref = 'auto' if plan_input.prefer_online else 'offline'
+        result = await run_inference(model_loader.predict, plan_input.nutrition.model_dump(), model_preference=model_pref)
+        if not result.get('success'):
+            raise HTTPException(status_code=500, detail=result.get('error', 'Prediction failed'))
+        caloric_needs = result['prediction']['caloric_needs']
+        prediction_model = result['prediction']['model']
+        low, high = ENERGY_TARGET_BOUNDS
+        if not low <= caloric_needs <= high:
+            raise HTTPException(
+                status_code=422,
+                detail=f"Predicted caloric needs of {caloric_needs:.0f} kcal/day from {prediction_model} are outside "
+                       f"the {low:g}-{high:g} kcal/day planning range; check the nutrition input or pass caloric_needs"
+            )
+
+    try:
+        plan = await run_inference(
+            meal_planner.plan,
+            catalogue,
+            region=plan_input.region_encoded,
+            season=plan_input.season_encoded,
+            condition=plan_input.condition_encoded,
+            caloric_needs=caloric_needs,
+            max_food_g=plan_input.max_food_g,
+            max_total_g=plan_input.max_total_g,
+            portion_step_g=plan_input.portion_step_g,
+            min_availability=plan_input.min_availability,
+            energy_tolerance=plan_input.energy_tolerance
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Meal planning error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    mark_handler_finished(request)
+    return FastJSONResponse({**plan, 'prediction_model': prediction_model})
+
+
+@router.post(
+    "/stream",
+    summary="Streaming Bulk Predictions",
+    description="Score an NDJSON, CSV, MessagePack or Arrow request body in chunks and stream the results back",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"application/x-ndjson": {}, MSGPACK: {}, ARROW_STREAM: {}}},
+        415: {"description": "Unsupported body format"}
+    }
+)
+async def stream_predict(
+    request: Request,
+    model: Optional[str] = Query(
+        'auto',
+        description="Model to use: 'auto', 'huggingface', 'local_xgboost', or 'offline'"
+    )
+):
+    """
+    Score arbitrarily large inputs with bounded memory.
+
+    Send `Content-Type: application/x-ndjson` (one NutritionInput object per
+    line), `text/csv` (header row of NutritionInput field names) or
+    `application/msgpack` (a sequence of NutritionInput maps). Each output
+    line is `{"line": n, ...prediction result}`; invalid rows get an error
+    line and do not stop the stream. The final line is a `summary`. Lines are
+    NDJSON, or MessagePack maps with `Accept: application/msgpack`.
+
+    An `application/vnd.apache.arrow.stream` body (one column per field) is
+    scored column-wise, batch by batch, and answered with an Arrow stream of
+    `caloric_needs`, `status` and `error` columns, one row per input row.
+    """
+    if model_loader is None:
+        raise HTTPException(status_code=500, detail="Model loader not initialized")
+
+    fmt = stream_format(request.headers.get('content-type'))
+    if fmt is None or fmt not in _response_formats(fmt):
+        raise HTTPException(
+            status_code=415,
+            detail=f"Send application/x-ndjson, text/csv, application/msgpack or {ARROW_STREAM}"
+        )
+
+    # The body is spooled (memory, then disk) before scoring starts
+    body = await spool_body(request.stream())
+
+    if fmt == 'arrow':
+        try:
+            reader = pa.ipc.open_stream(body)
+        except pa.ArrowException as e:
+            body.close()
+            raise _body_error(f"Invalid Arrow IPC stream: {e}")
+        errors = missing_feature_errors(reader.schema)
+        if errors:
+            body.close()
+            raise RequestValidationError(errors)
+
+        async def score_frame(columns):
+            return await run_inference(model_loader.predict_frame, columns, model_preference=model)
+
+        return StreamingResponse(
+            stream_arrow_predictions(reader, score_frame, source=body),
+            media_type=ARROW_STREAM
+        )
+
+    async def score(inputs):
+        return await score_batch(inputs, model_preference=model)
+
+    offered = _response_formats('ndjson', 'msgpack')
+    response_fmt = negotiate(request.headers.get('accept'), offered) or offered[0]
+    encode = binary_formats.pack if response_fmt == 'msgpack' else None
+    return StreamingResponse(
+        stream_predictions(iter_spool(body), fmt, score, encode=encode),
+        media_type=MEDIA_TYPES[response_fmt][0]
+    )
+
+
+EXAMPLE_INPUT = {
+    "example": {
+        "Energy_kcal_per_serving": 350,
+        "Protein_g_per_serving": 15,
+        "Fat_g_per_serving": 10,
+        "Carbohydrates_g_per_serving": 45,
+        "Fiber_g_per_serving": 5,
+        "Calcium_mg_per_serving": 200,
+        "Iron_mg_per_serving": 3,
+        "Zinc_mg_per_serving": 2,
+        "VitaminA_ug_per_serving": 500,
+        "VitaminC_mg_per_serving": 20,
+        "Potassium_mg_per_serving": 400,
+        "Magnesium_mg_per_serving": 50,
+        "region_encoded": 0,
+        "condition_encoded": 0,
+        "age_group_encoded": 1,
+        "season_encoded": 0,
+        "portion_size_g": 250,
+        "estimated_cost_ugx": 5000
+    },
+    "description": {
+        "region": "0 = Central Uganda",
+        "condition": "0 = Hypertension",
+        "age_group": "1 = 70-80 years",
+        "season": "0 = Dry"
     }
+}
+
+# Serialized and compressed once at import
+example_body = EncodedBody(EXAMPLE_INPUT, brotli_quality=11, gzip_level=9)
 
 
 @router.get(
@@ -120,38 +695,11 @@ async def batch_predict(
     summary="Get Example Input",
     description="Get an example input format for testing"
 )
-async def get_example_input():
+async def get_example_input(request: Request):
     """
     Returns an example input that can be used for testing the prediction endpoint.
     """
-    return {
-        "example": {
-            "Energy_kcal_per_serving": 350,
-            "Protein_g_per_serving": 15,
-            "Fat_g_per_serving": 10,
-            "Carbohydrates_g_per_serving": 45,
-            "Fiber_g_per_serving": 5,
-            "Calcium_mg_per_serving": 200,
-            "Iron_mg_per_serving": 3,
-            "Zinc_mg_per_serving": 2,
-            "VitaminA_ug_per_serving": 500,
-            "VitaminC_mg_per_serving": 20,
-            "Potassium_mg_per_serving": 400,
-            "Magnesium_mg_per_serving": 50,
-            "region_encoded": 0,
-            "condition_encoded": 0,
-            "age_group_encoded": 1,
-            "season_encoded": 0,
-            "portion_size_g": 250,
-            "estimated_cost_ugx": 5000
-        },
-        "description": {
-            "region": "0 = Central Uganda",
-            "condition": "0 = Hypertension",
-            "age_group": "1 = 70-80 years",
-            "season": "0 = Dry"
-        }
-    }
+    return example_body.respond(request)
 
 
 @router.get(
@@ -162,7 +710,8 @@ async def get_example_input():
 async def recommend(
     by_id: Optional[str] = Query(None, description="Lookup recommendations by item id from ensemble"),
     vector: Optional[str] = Query(None, description="Comma-separated vector to query embeddings"),
-    top_k: Optional[int] = Query(5, description="Number of top similar items to return")
+    top_k: Optional[int] = Query(5, description="Number of top similar items to return"),
+    measure_recall: bool = Query(False, description="Also run exact search and report measured recall@k")
 ):
     if model_loader is None:
         raise HTTPException(status_code=500, detail="Model loader not initialized")
@@ -178,12 +727,41 @@ async def recommend(
             raise HTTPException(status_code=400, detail=f"Invalid vector: {e}")
 
     try:
-        result = model_loader.recommend_foods(query_vector=qvec, top_k=top_k, by_id=by_id)
+        result = await run_inference(
+            model_loader.recommend_foods,
+            query_vector=qvec,
+            top_k=top_k,
+            by_id=by_id,
+            measure_recall=measure_recall
+        )
         if not result.get('success'):
             raise HTTPException(status_code=500, detail=result.get('error', 'Recommendation failed'))
-        return result
+        return FastJSONResponse(result)
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"Recommendation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/recommend/batch",
+    summary="Recommend similar foods for many queries",
+    description="Return top-k similar foods for a list of item ids or query vectors in one search."
+)
+async def recommend_batch(batch_input: BatchRecommendationInput):
+    if model_loader is None:
+        raise HTTPException(status_code=500, detail="Model loader not initialized")
+
+    if (batch_input.by_ids is None) == (batch_input.vectors is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of by_ids or vectors")
+
+    result = await run_inference(
+        model_loader.recommend_foods_batch,
+        query_vectors=batch_input.vectors,
+        by_ids=batch_input.by_ids,
+        top_k=batch_input.top_k
+    )
+    if not result.get('success'):
+        raise HTTPException(status_code=500, detail=result.get('error', 'Recommendation failed'))
+    return FastJSONResponse(result)
@@ -0,0 +1,25 @@
+"""Init file for services package"""
+from .executor import InferenceExecutor, QueueFullError
+from .batcher import MicroBatcher
+from .catalogue import FoodCatalogue
+from .http_cache import EncodedBody, ResponseCache
+from .meal_planner import MealPlanner
+from .model_watcher import ModelWatcher
+from .prediction_cache import PredictionCache
+from .instrumentation import PredictionMetricsMiddleware, RuntimeCollector, observe_predictions, prune_dead_workers
+
+__all__ = [
+    'InferenceExecutor',
+    'QueueFullError',
+    'MicroBatcher',
+    'FoodCatalogue',
+    'EncodedBody',
+    'ResponseCache',
+    'MealPlanner',
+    'ModelWatcher',
+    'PredictionCache',
+    'PredictionMetricsMiddleware',
+    'RuntimeCollector',
+    'observe_predictions',
+    'prune_dead_workers'
+]
@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from .metrics import prediction_batch_size, prediction_batch_wait
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-row predictions into one vectorized call.
+
+    Requests are grouped per model key and flushed after ``max_wait_ms`` or
+    as soon as ``max_batch_size`` rows are waiting, whichever comes first.
+    ``score_batch(inputs, model_preference)`` is awaited once per flush and
+    must return one result per input, in order; otherwise every caller in
+    the batch gets an error.
+
+    Configurable through ``PREDICT_BATCH_WINDOW_MS`` and ``PREDICT_BATCH_MAX_SIZE``.
+    """
+
+    def __init__(
+        self,
+        score_batch: Callable[[List[Dict], str], Awaitable[List[Dict]]],
+        max_wait_ms: Optional[float] = None,
+        max_batch_size: Optional[int] = None
+    ):
+        if max_wait_ms is None:
+            max_wait_ms = float(os.getenv('PREDICT_BATCH_WINDOW_MS', '5'))
+        if max_batch_size is None:
+            max_batch_size = int(os.getenv('PREDICT_BATCH_MAX_SIZE', '64'))
+        self.score_batch = score_batch
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.max_batch_size = max(1, int(max_batch_size))
+        self._pending: Dict[str, list] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks = set()
+
+    @property
+    def pending_rows(self) -> int:
+        """Number of inputs waiting for their batch to flush."""
+        return sum(len(queue) for queue in list(self._pending.values()))
+
+    async def submit(self, input_data: Dict, model_preference: str = 'auto') -> Dict:
+        """Queue one input and wait for its result from the next flushed batch."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        queue = self._pending.setdefault(model_preference, [])
+        queue.append((input_data, future, time.perf_counter()))
+
+        if len(queue) >= self.max_batch_size:
+            self._flush(model_preference)
+        elif len(queue) == 1:
+            self._timers[model_preference] = loop.call_later(
+                self.max_wait, self._flush, model_preference
+            )
+
+        return await future
+
+    def _flush(self, model_preference: str):
+        timer = self._timers.pop(model_preference, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self._pending.pop(model_preference, None)
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._run_batch(model_preference, batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, model_preference: str, batch: list):
+        started = time.perf_counter()
+        prediction_batch_size.observe(len(batch))
+        for _, _, enqueued_at in batch:
+            prediction_batch_wait.observe(started - enqueued_at)
+
+        try:
+            results = await self.score_batch([item[0] for item in batch], model_preference)
+            if len(results) != len(batch):
+                raise RuntimeError(f"score_batch returned {len(results)} results for {len(batch)} inputs")
+            for (_, future, _), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.error(f"Micro-batch of {len(batch)} failed for {model_preference}: {e}")
+            self._fail(batch, e)
+        finally:
+            # Never leave a request waiting, even when this task is cancelled
+            self._fail(batch, RuntimeError("Micro-batch ended without a result"))
+
+    @staticmethod
+    def _fail(batch: list, error: BaseException):
+        for _, future, _ in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def close(self):
+        """Flush anything still waiting and wait for in-flight batches."""
+        for model_preference in list(self._pending):
+            self._flush(model_preference)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
@@ -0,0 +1,229 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from ..models.loader import FEATURE_COLUMN_LOOKUP
+from ..models.schemas import NutritionInput
+
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+ARROW_STREAM = 'application/vnd.apache.arrow.stream'
+MSGPACK = 'application/msgpack'
+
+# Media types per format; the first one is sent back as the Content-Type
+MEDIA_TYPES = {
+    'json': ('application/json',),
+    'ndjson': ('application/x-ndjson', 'application/ndjson', 'application/jsonl', 'application/json-lines'),
+    'csv': ('text/csv', 'application/csv'),
+    'msgpack': (MSGPACK, 'application/x-msgpack', 'application/vnd.msgpack'),
+    'arrow': (ARROW_STREAM,),
+}
+
+# End-of-stream marker of the Arrow IPC streaming format
+ARROW_EOS = b'\xff\xff\xff\xff\x00\x00\x00\x00'
+
+# Columns of an Arrow prediction result, one row per input row
+RESULT_SCHEMA = pa.schema([
+    ('caloric_needs', pa.float64()),
+    ('status', pa.string()),
+    ('error', pa.string()),
+], metadata={'unit': 'kcal/day'})
+
+
+class UnsupportedFormatError(ValueError):
+    """A body or requested response format this server cannot handle."""
+
+
+def media_format(content_type: Optional[str], default: Optional[str] = None) -> Optional[str]:
+    """Return the format name for a Content-Type header, ``default`` when absent, None if unknown."""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if not media_type:
+        return default
+    for fmt, media_types in MEDIA_TYPES.items():
+        if media_type in media_types:
+            return fmt
+    if media_type.startswith('application/') and media_type.endswith('+json'):
+        return 'json'
+    return None
+
+
+def negotiate(accept: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    Pick the response format for an Accept header out of ``offered`` formats.
+
+    The client's highest q-value wins and ties go to the earlier offered
+    format, so a missing or ``*/*`` Accept gets ``offered[0]``. Returns None
+    when nothing offered is acceptable.
+    """
+    if not accept or not accept.strip():
+        return offered[0]
+    ranges = []
+    for part in accept.split(','):
+        media_range, *params = [piece.strip() for piece in part.split(';')]
+        if not media_range:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges.append((media_range.lower(), q))
+
+    best, best_q = None, 0.0
+    for fmt in offered:
+        quality = 0.0
+        specificity = -1
+        for media_type in MEDIA_TYPES[fmt]:
+            kind = media_type.split('/')[0]
+            for media_range, q in ranges:
+                if media_range == media_type:
+                    level = 2
+                elif media_range == f"{kind}/*":
+                    level = 1
+                elif media_range == '*/*':
+                    level = 0
+                else:
+                    continue
+                # The most specific matching range decides, as in RFC 9110
+                if level > specificity:
+                    specificity, quality = level, q
+        if quality > best_q:
+            best, best_q = fmt, quality
+    return best
+
+
+def _msgpack_default(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot serialize {type(value).__name__} to MessagePack")
+
+
+def require_msgpack():
+    if not MSGPACK_AVAILABLE:
+        raise UnsupportedFormatError("MessagePack support is not installed (pip install msgpack)")
+
+
+def pack(payload: Any) -> bytes:
+    """Encode ``payload`` as MessagePack; NumPy scalars and arrays become plain values."""
+    require_msgpack()
+    return msgpack.packb(payload, default=_msgpack_default, use_bin_type=True)
+
+
+def unpack(body: bytes) -> Any:
+    require_msgpack()
+    return msgpack.unpackb(body, raw=False)
+
+
+def msgpack_unpacker():
+    """A streaming MessagePack decoder: ``feed`` it bytes and iterate the complete objects."""
+    require_msgpack()
+    return msgpack.Unpacker(raw=False)
+
+
+def _float_array(column) -> np.ndarray:
+    """A float64 NumPy view of an Arrow column; copies only to cast, fill nulls or join chunks."""
+    if isinstance(column, pa.ChunkedArray):
+        column = column.combine_chunks()
+    if column.type != pa.float64():
+        column = column.cast(pa.float64())
+    if column.null_count:
+        # Missing values fail the range checks like any other NaN
+        column = pc.fill_null(column, np.nan)
+    return column.to_numpy(zero_copy_only=False)
+
+
+def missing_feature_errors(schema: pa.Schema, loc: Tuple = ('body',)) -> List[Dict]:
+    """Pydantic-style 'missing' errors for NutritionInput fields without a column in ``schema``."""
+    present = {FEATURE_COLUMN_LOOKUP.get(name.lower()) for name in schema.names}
+    return [
+        {'type': 'missing', 'loc': loc + (name,), 'msg': 'Field required', 'input': None}
+        for name in NutritionInput.model_fields
+        if name not in present
+    ]
+
+
+def arrow_columns(data) -> Dict[str, np.ndarray]:
+    """
+    Map the feature columns of an Arrow table or record batch to float64 arrays.
+
+    Columns may use NutritionInput field names or the model's column names
+    (any case); other columns are ignored. Single-chunk float64 columns
+    without nulls are zero-copy views of the Arrow buffers.
+    """
+    columns = {}
+    for name, column in zip(data.schema.names, data.columns):
+        field = FEATURE_COLUMN_LOOKUP.get(name.lower())
+        if field is not None:
+            columns[field] = _float_array(column)
+    return columns
+
+
+def result_batch(caloric_needs: np.ndarray, status, errors: Optional[np.ndarray] = None) -> pa.RecordBatch:
+    """
+    Build a RESULT_SCHEMA record batch.
+
+    ``caloric_needs`` is wrapped without copying; rows with an error (a
+    non-None entry in ``errors``) get a null prediction and status 'error'.
+    ``status`` is one string for every row or a sequence of them.
+    """
+    n_rows = len(caloric_needs)
+    if errors is None:
+        failed = None
+        error_array = pa.nulls(n_rows, pa.string())
+    else:
+        failed = np.asarray([error is not None for error in errors], dtype=bool)
+        error_array = pa.array(errors, type=pa.string())
+        if not failed.any():
+            failed = None
+    if isinstance(status, str) and failed is None:
+        status_array = pa.repeat(pa.scalar(status, pa.string()), n_rows)
+    elif isinstance(status, str):
+        status_array = pa.array(np.where(failed, 'error', status), type=pa.string())
+    else:
+        status_array = pa.array(status, type=pa.string())
+    prediction_array = pa.array(np.asarray(caloric_needs, dtype=np.float64), mask=failed)
+    return pa.record_batch([prediction_array, status_array, error_array], schema=RESULT_SCHEMA)
+
+
+def results_batch(results: Iterable[Dict]) -> pa.RecordBatch:
+    """Convert ``ModelLoader.predict_batch`` result dicts to a RESULT_SCHEMA record batch."""
+    results = list(results)
+    caloric_needs = np.array([
+        result['prediction']['caloric_needs'] if result.get('success') else np.nan
+        for result in results
+    ], dtype=np.float64)
+    errors = np.array([
+        None if result.get('success') else (result.get('error') or 'Prediction failed')
+        for result in results
+    ], dtype=object)
+    status = [result.get('status', 'error') for result in results]
+    return result_batch(caloric_needs, status, errors)
+
+
+def arrow_message(item) -> bytes:
+    """One encapsulated IPC message (a schema or a record batch) of an Arrow stream."""
+    return item.serialize().to_pybytes()
+
+
+def arrow_stream(batches: Sequence[pa.RecordBatch], metadata: Optional[Dict[str, Optional[str]]] = None) -> bytes:
+    """Serialize result batches as a complete Arrow IPC stream, adding ``metadata`` to the schema."""
+    schema = RESULT_SCHEMA
+    if metadata:
+        extra = {key: value for key, value in metadata.items() if value is not None}
+        schema = schema.with_metadata({**schema.metadata, **{k.encode(): str(v).encode() for k, v in extra.items()}})
+    return b''.join([arrow_message(schema), *(arrow_message(batch) for batch in batches), ARROW_EOS])
@@ -0,0 +1,393 @@
+import os
+import json
+import base64
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .http_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Locations checked for the dataset, in order:
+# 1) repository root
+# 2) frontend public data
+REPO_ROOT = Path(__file__).resolve().parents[3]
+DEFAULT_CANDIDATES = (
+    REPO_ROOT / 'food_composition_clean.csv',
+    REPO_ROOT / 'frontend' / 'public' / 'data' / 'food_composition_clean.csv',
+)
+
+# Output field -> (CSV column, decimals)
+NUTRIENT_COLUMNS = {
+    'energy': ('energy_kcal_per_100g', 1),
+    'protein': ('protein_g_per_100g', 2),
+    'fat': ('fat_g_per_100g', 2),
+    'carbs': ('carbohydrate_g_per_100g', 2),
+    'fiber': ('fiber_g_per_100g', 2),
+    'calcium': ('calcium_mg_per_100g', 1),
+    'iron': ('iron_mg_per_100g', 2),
+}
+
+# Per-serving model feature -> per-100g CSV column; missing values count as 0,
+# as they do in the frontend's food forms
+SERVING_COLUMNS = {
+    'Energy_kcal_per_serving': 'energy_kcal_per_100g',
+    'Protein_g_per_serving': 'protein_g_per_100g',
+    'Fat_g_per_serving': 'fat_g_per_100g',
+    'Carbohydrates_g_per_serving': 'carbohydrate_g_per_100g',
+    'Fiber_g_per_serving': 'fiber_g_per_100g',
+    'Calcium_mg_per_serving': 'calcium_mg_per_100g',
+    'Iron_mg_per_serving': 'iron_mg_per_100g',
+    'Zinc_mg_per_serving': 'zinc_mg_per_100g',
+    'VitaminA_ug_per_serving': 'vitamin_a_mcg_per_100g',
+    'VitaminC_mg_per_serving': 'vitamin_c_mg_per_100g',
+    'Potassium_mg_per_serving': 'potassium_mg_per_100g',
+    'Magnesium_mg_per_serving': 'magnesium_mg_per_100g',
+}
+
+# Catalogue region of each region_encoded value
+ENCODED_REGIONS = ('central', 'western', 'eastern', 'northern')
+
+# Nutrient -> per-100g CSV column kept for every market row, for meal planning
+MARKET_NUTRIENTS = {
+    'energy_kcal': 'energy_kcal_per_100g',
+    'protein_g': 'protein_g_per_100g',
+    'fat_g': 'fat_g_per_100g',
+    'carbs_g': 'carbohydrate_g_per_100g',
+    'fiber_g': 'fiber_g_per_100g',
+    'calcium_mg': 'calcium_mg_per_100g',
+    'iron_mg': 'iron_mg_per_100g',
+    'zinc_mg': 'zinc_mg_per_100g',
+    'vitamin_a_ug': 'vitamin_a_mcg_per_100g',
+    'vitamin_c_mg': 'vitamin_c_mg_per_100g',
+    'potassium_mg': 'potassium_mg_per_100g',
+    'sodium_mg': 'sodium_mg_per_100g',
+}
+
+
+# Fields accepted for range filters and sorting
+RANGE_FIELDS = (*NUTRIENT_COLUMNS, 'pricePerKg')
+SORT_FIELDS = ('name', *RANGE_FIELDS, 'availability_score')
+
+EMPTY_POSITIONS = np.empty(0, dtype=np.int64)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor is malformed or was issued for another query or catalogue version."""
+
+
+def query_fingerprint(
+    category: Optional[str] = None,
+    region: Optional[str] = None,
+    available: Optional[bool] = None,
+    ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+    sort: Optional[str] = None
+) -> str:
+    """
+    Short hash of a listing query's filters and sort, normalised as
+    :meth:`CatalogueData.filter_mask` applies them, so spellings that select
+    the same foods share cursors.
+    """
+    category = (category or '').strip().lower()
+    region = (region or '').strip().lower()
+    normalised = {
+        'category': '' if category == 'all' else category,
+        'region': '' if region in ('all', 'national', 'countrywide') else region,
+        'available': available,
+        'ranges': sorted(
+            (field, None if low is None else float(low), None if high is None else float(high))
+            for field, (low, high) in (ranges or {}).items()
+        ),
+        'sort': sort or '',
+    }
+    payload = json.dumps(normalised, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def encode_cursor(version: str, query: str, rank: int) -> str:
+    payload = json.dumps({'v': version, 'q': query, 'r': int(rank)}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str, version: str, query: str) -> int:
+    """Return the rank of the last item served by ``cursor``; ``query`` is the request's :func:`query_fingerprint`."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        cursor_version, cursor_query, rank = payload['v'], payload['q'], int(payload['r'])
+    except Exception:
+        raise InvalidCursorError("Malformed cursor")
+    if cursor_version != version:
+        raise InvalidCursorError("Cursor is from an older catalogue version; restart pagination")
+    if cursor_query != query:
+        raise InvalidCursorError("Cursor was issued for different filters or sort order")
+    return rank
+
+
+def _group_positions(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """Map each distinct value to the sorted row positions holding it."""
+    groups: Dict[str, list] = {}
+    for pos, value in enumerate(values):
+        groups.setdefault(value, []).append(pos)
+    return {key: np.asarray(positions, dtype=np.int64) for key, positions in groups.items()}
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    if column not in df.columns:
+        return np.zeros(len(df), dtype=np.float64)
+    return pd.to_numeric(df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+
+
+def _text(df: pd.DataFrame, column: str, default: str) -> pd.Series:
+    if column not in df.columns:
+        return pd.Series(default, index=df.index, dtype=object)
+    return df[column].where(df[column].map(lambda v: isinstance(v, str)), None)
+
+
+class CatalogueData:
+    """Immutable, deduplicated snapshot of the food composition dataset."""
+
+    def __init__(self, path: Path, mtime: float, df: pd.DataFrame):
+        self.path = path
+        self.mtime = mtime
+        self.version = f"{int(mtime * 1_000_000):x}"
+        # Serialized + compressed responses for this dataset version
+        self.response_cache = ResponseCache()
+        # Model scores of every food per profile, for this dataset version
+        self.score_cache = ResponseCache(max_entries=64)
+
+        names = _text(df, 'food_name_english', '')
+        if 'food_name' in df.columns:
+            names = names.fillna(_text(df, 'food_name', ''))
+        names = names.fillna('').astype(str).str.strip()
+
+        # Deduplicate by normalized name, keeping the first occurrence
+        keep = ~names.str.lower().duplicated().to_numpy()
+        row_index = df.index.to_numpy()[keep]
+
+        categories = _text(df, 'food_category', 'other').fillna('other').str.strip().str.lower()
+        regions = _text(df, 'region', 'all').fillna('all').str.strip().str.lower()
+        regions = regions.where(~regions.isin(['national', 'all', 'countrywide']), 'all')
+
+        self.columns: Dict[str, np.ndarray] = {
+            'id': np.array([f"food_{i}" for i in row_index], dtype=object),
+            'name': names.to_numpy(dtype=object)[keep],
+            'category': categories.to_numpy(dtype=object)[keep],
+            'region': regions.to_numpy(dtype=object)[keep],
+        }
+        for field, (column, decimals) in NUTRIENT_COLUMNS.items():
+            self.columns[field] = np.round(_numeric(df, column)[keep], decimals)
+        self.columns['pricePerKg'] = np.trunc(_numeric(df, 'avg_market_price_ugx_per_kg')[keep]).astype(np.int64)
+        self.columns['availability_score'] = _numeric(df, 'availability_score')[keep]
+        self.columns['available'] = self.columns['availability_score'] >= 0.5
+
+        # Unrounded per-100g values the per-serving model features derive from
+        self.per_100g = {field: _numeric(df, column)[keep] for field, column in SERVING_COLUMNS.items()}
+        self.price_per_kg = _numeric(df, 'avg_market_price_ugx_per_kg')[keep]
+
+        # Every row, duplicates included: each is one food's price and
+        # availability in a region and season
+        edible = _numeric(df, 'edible_portion_percent')
+        seasons = _text(df, 'seasonality', 'year-round').fillna('year-round').str.strip().str.lower()
+        self.market: Dict[str, np.ndarray] = {
+            'id': np.array([f"food_{i}" for i in df.index], dtype=object),
+            'name': names.to_numpy(dtype=object),
+            'category': categories.to_numpy(dtype=object),
+            'region': regions.to_numpy(dtype=object),
+            'season': seasons.to_numpy(dtype=object),
+            'preparation': _text(df, 'preparation_state', None).to_numpy(dtype=object),
+            'price_per_kg': _numeric(df, 'avg_market_price_ugx_per_kg'),
+            'availability_score': _numeric(df, 'availability_score'),
+            'edible_percent': np.where(edible > 0, edible, 100.0),
+            **{nutrient: _numeric(df, column) for nutrient, column in MARKET_NUTRIENTS.items()},
+        }
+
+        self.size = int(keep.sum())
+        self.records = self._build_records()
+        self._build_indexes()
+
+    def _build_indexes(self):
+        """Precompute lookup indexes and sort orders used by :meth:`query`."""
+        c = self.columns
+        self.category_index = _group_positions(c['category'])
+        self.region_index = _group_positions(c['region'])
+        self.available_positions = np.flatnonzero(c['available'])
+
+        sort_keys = {field: c[field] for field in SORT_FIELDS if field != 'name'}
+        sort_keys['name'] = np.array([name.lower() for name in c['name']], dtype=object)
+        self.sort_orders = {
+            field: np.argsort(values, kind='stable') for field, values in sort_keys.items()
+        }
+        self.sorted_values = {
+            field: c[field][self.sort_orders[field]] for field in RANGE_FIELDS
+        }
+
+    def _build_records(self) -> List[Dict]:
+        """Materialize the compact JSON shape used by the frontend, once."""
+        c = self.columns
+        fields = ['id', 'name', 'category', 'region', *NUTRIENT_COLUMNS, 'pricePerKg', 'available']
+        values = [c[f].tolist() for f in fields]
+        return [dict(zip(fields, row)) for row in zip(*values)]
+
+    def filter_mask(
+        self,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+        available: Optional[bool] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None
+    ) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the foods matching the filters, from the precomputed
+        indexes; None when nothing is filtered. Filters behave as in :meth:`query`.
+        """
+        mask = None
+
+        def restrict(positions: np.ndarray, invert: bool = False):
+            nonlocal mask
+            selected = np.zeros(self.size, dtype=bool)
+            selected[positions] = True
+            if invert:
+                selected = ~selected
+            mask = selected if mask is None else mask & selected
+
+        if category and category.strip().lower() != 'all':
+            restrict(self.category_index.get(category.strip().lower(), EMPTY_POSITIONS))
+
+        if region and region.strip().lower() not in ('all', 'national', 'countrywide'):
+            restrict(np.concatenate([
+                self.region_index.get(region.strip().lower(), EMPTY_POSITIONS),
+                self.region_index.get('all', EMPTY_POSITIONS),
+            ]))
+
+        if available is not None:
+            restrict(self.available_positions, invert=not available)
+
+        for field, (low, high) in (ranges or {}).items():
+            if field not in self.sorted_values:
+                raise ValueError(f"Unsupported range field: {field}")
+            values = self.sorted_values[field]
+            start = 0 if low is None else np.searchsorted(values, low, side='left')
+            stop = len(values) if high is None else np.searchsorted(values, high, side='right')
+            restrict(self.sort_orders[field][start:stop])
+
+        return mask
+
+    def portions(self, default_g: float, by_category: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """Portion size in grams of every food: ``default_g`` unless its category is in ``by_category``."""
+        portions = np.full(self.size, float(default_g))
+        for category, grams in (by_category or {}).items():
+            portions[self.category_index.get(category.strip().lower(), EMPTY_POSITIONS)] = grams
+        return portions
+
+    def serving_features(self, portions_g: np.ndarray, profile: Dict[str, float]) -> Dict[str, np.ndarray]:
+        """
+        Model feature columns for one serving of every food.
+
+        Nutrients scale from per 100 g and the cost from the price per kg to
+        ``portions_g``; ``profile`` holds the encoded demographic features,
+        repeated for every food.
+        """
+        scale = portions_g / 100.0
+        columns = {field: values * scale for field, values in self.per_100g.items()}
+        for field, value in profile.items():
+            columns[field] = np.full(self.size, float(value))
+        columns['portion_size_g'] = portions_g
+        columns['estimated_cost_ugx'] = self.price_per_kg * portions_g / 1000.0
+        return columns
+
+    def query(
+        self,
+        category: Optional[str] = None,
+        region: Optional[str] = None,
+        available: Optional[bool] = None,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        sort: Optional[str] = None,
+        after: Optional[int] = None,
+        limit: int = 500
+    ) -> Tuple[List[Dict], int, Optional[int]]:
+        """
+        Filter, sort and page the catalogue using the precomputed indexes.
+
+        ``region`` also matches nationwide foods, as the frontend does. ``sort``
+        is a field from ``SORT_FIELDS``, prefixed with ``-`` for descending.
+        ``after`` is the rank of the last item from the previous page.
+
+        Returns ``(records, total_matches, last_rank)``; ``last_rank`` is None
+        when there are no further pages.
+        """
+        mask = self.filter_mask(category=category, region=region, available=available, ranges=ranges)
+
+        if sort:
+            field = sort.lstrip('-')
+            if field not in self.sort_orders:
+                raise ValueError(f"Unsupported sort field: {field}")
+            order = self.sort_orders[field]
+            if sort.startswith('-'):
+                order = order[::-1]
+        else:
+            order = np.arange(self.size)
+
+        ranks = np.arange(self.size) if mask is None else np.flatnonzero(mask[order])
+        start = 0 if after is None else int(np.searchsorted(ranks, after, side='right'))
+        page = ranks[start:start + max(0, int(limit))]
+
+        records = [self.records[pos] for pos in order[page]]
+        has_more = start + len(page) < len(ranks)
+        last_rank = int(page[-1]) if has_more and len(page) else None
+        return records, int(len(ranks)), last_rank
+
+
+class FoodCatalogue:
+    """
+    In-memory food catalogue backed by ``food_composition_clean.csv``.
+
+    The CSV is parsed once into a columnar, deduplicated snapshot and only
+    reloaded when the file's mtime changes, so requests are served from memory.
+    """
+
+    def __init__(self, candidates: Optional[Sequence[os.PathLike]] = None):
+        self.candidates = [Path(p) for p in (candidates or DEFAULT_CANDIDATES)]
+        self._data: Optional[CatalogueData] = None
+        self._lock = threading.Lock()
+
+    def _resolve_path(self) -> Optional[Path]:
+        for p in self.candidates:
+            if p.exists():
+                return p
+        return None
+
+    def _current_mtime(self, data: CatalogueData) -> Optional[float]:
+        try:
+            return data.path.stat().st_mtime
+        except OSError:
+            return None
+
+    def get(self) -> CatalogueData:
+        """Return the current snapshot, reloading if the dataset changed on disk.
+
+        Raises FileNotFoundError if no candidate file exists.
+        """
+        data = self._data
+        if data is not None and self._current_mtime(data) == data.mtime:
+            return data
+
+        with self._lock:
+            data = self._data
+            if data is not None and self._current_mtime(data) == data.mtime:
+                return data
+
+            path = self._resolve_path()
+            if path is None:
+                raise FileNotFoundError("food composition dataset not found")
+
+            mtime = path.stat().st_mtime
+            data = CatalogueData(path, mtime, pd.read_csv(path))
+            self._data = data
+            logger.info(f"Loaded food catalogue from {path} ({data.size} foods)")
+            return data
@@ -0,0 +1,82 @@
+import os
+import asyncio
+import logging
+import threading
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the inference executor cannot accept more work."""
+
+
+class InferenceExecutor:
+    """
+    Bounded thread pool that keeps CPU-bound inference off the asyncio event loop.
+
+    XGBoost and NumPy release the GIL while scoring, so threads give real
+    parallelism without pickling the loaded models into worker processes.
+    At most ``max_workers`` calls run at once and up to ``max_queue`` more may
+    wait; anything beyond that is rejected with :class:`QueueFullError`.
+
+    Configurable through ``INFERENCE_MAX_WORKERS`` and ``INFERENCE_MAX_QUEUE``.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None):
+        if max_workers is None:
+            max_workers = int(os.getenv('INFERENCE_MAX_WORKERS', '2'))
+        if max_queue is None:
+            max_queue = int(os.getenv('INFERENCE_MAX_QUEUE', '32'))
+        self.max_workers = max(1, int(max_workers))
+        self.max_queue = max(0, int(max_queue))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix='inference'
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of calls currently running or waiting for a worker, awaited or not."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of calls waiting for a free worker."""
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, fn, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` on the pool and await its result.
+
+        The slot is released when the pool's future completes, not when the
+        awaiting task ends: a cancelled request whose call is already running
+        keeps counting until the worker thread is actually free.
+        """
+        with self._lock:
+            if self._in_flight >= self.max_workers + self.max_queue:
+                raise QueueFullError(
+                    f"Inference queue full ({self.max_queue} waiting, {self.max_workers} running)"
+                )
+            self._in_flight += 1
+
+        try:
+            future = self._executor.submit(partial(fn, *args, **kwargs))
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._in_flight -= 1
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work and release the worker threads."""
+        logger.info("Shutting down inference executor")
+        self._executor.shutdown(wait=wait)
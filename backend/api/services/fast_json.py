@@ -0,0 +1,59 @@
+import json
+import math
+from typing import Any
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+
+def _plain(value: Any) -> Any:
+    """``value`` with NumPy values as Python ones and NaN/inf as None, as orjson writes them."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key.item() if isinstance(key, np.generic) else key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, (np.ndarray, np.generic)):
+        return _plain(value.tolist())
+    return value
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize ``content`` to compact UTF-8 JSON.
+
+    Uses orjson when installed (NumPy values and non-string keys included),
+    otherwise the standard library with the same output. NaN and infinity
+    are written as null either way, as pydantic does.
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(content, option=_ORJSON_OPTIONS)
+    return json.dumps(
+        _plain(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(',', ':')
+    ).encode('utf-8')
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with :func:`dumps`.
+
+    Return it from a handler with plain data (dicts, lists, NumPy values):
+    FastAPI then skips ``jsonable_encoder`` and response-model validation,
+    so the payload must already have the documented shape.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
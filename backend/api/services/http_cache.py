@@ -0,0 +1,183 @@
+import os
+import gzip
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from fastapi import Request, Response
+
+from .fast_json import dumps
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    brotli = None
+    BROTLI_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}."""
+    accepted = {}
+    for part in accept_encoding.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class EncodedBody:
+    """
+    A JSON payload serialized once, with a content-hash ETag and lazily built
+    gzip / brotli variants that are kept for the life of the object.
+
+    Compression defaults to ``RESPONSE_BROTLI_QUALITY`` (5) and
+    ``RESPONSE_GZIP_LEVEL`` (6), cheap enough to run per cache miss; bodies
+    built once for the life of the process can afford 11 and 9.
+    """
+
+    def __init__(
+        self,
+        payload: Any,
+        headers: Optional[Dict[str, str]] = None,
+        brotli_quality: Optional[int] = None,
+        gzip_level: Optional[int] = None
+    ):
+        self.body = dumps(payload)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self.headers = dict(headers or {})
+        if brotli_quality is None:
+            brotli_quality = int(os.getenv('RESPONSE_BROTLI_QUALITY', '5'))
+        if gzip_level is None:
+            gzip_level = int(os.getenv('RESPONSE_GZIP_LEVEL', '6'))
+        self.brotli_quality = brotli_quality
+        self.gzip_level = gzip_level
+        self._variants: Dict[str, bytes] = {}
+        self._lock = threading.Lock()
+
+    def variant(self, encoding: str) -> bytes:
+        """Return the body encoded with ``encoding`` ('br', 'gzip' or 'identity')."""
+        if encoding == 'identity':
+            return self.body
+        cached = self._variants.get(encoding)
+        if cached is not None:
+            return cached
+        with self._lock:
+            cached = self._variants.get(encoding)
+            if cached is None:
+                if encoding == 'br':
+                    cached = brotli.compress(self.body, quality=self.brotli_quality)
+                else:
+                    cached = gzip.compress(self.body, compresslevel=self.gzip_level, mtime=0)
+                self._variants[encoding] = cached
+        return cached
+
+    def negotiate(self, accept_encoding: str) -> str:
+        accepted = _accepted_encodings(accept_encoding or '')
+        wildcard = accepted.get('*', 0.0)
+        for encoding in (('br', 'gzip') if BROTLI_AVAILABLE else ('gzip',)):
+            if accepted.get(encoding, wildcard) > 0:
+                return encoding
+        return 'identity'
+
+    def respond(self, request: Request, cache_control: str = 'no-cache') -> Response:
+        """Build a 304 or a (possibly precompressed) 200 for ``request``."""
+        headers = {
+            **self.headers,
+            'ETag': self.etag,
+            'Cache-Control': cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+
+        if_none_match = request.headers.get('if-none-match')
+        if if_none_match and _etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+
+        encoding = self.negotiate(request.headers.get('accept-encoding', ''))
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return Response(content=self.variant(encoding), media_type='application/json', headers=headers)
+
+
+class StaticBody:
+    """
+    An :class:`EncodedBody` for a payload that only changes with ``version()``.
+
+    ``build()`` is serialized and compressed (at the highest settings) on
+    first use and again only after the version changes, e.g. after a model
+    load or reload; every other request reuses the bytes.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Any],
+        version: Callable[[], Hashable] = lambda: None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.build = build
+        self.version = version
+        self.headers = headers
+        self._entry = None
+
+    def get(self) -> EncodedBody:
+        version = self.version()
+        entry = self._entry
+        if entry is None or entry[0] != version:
+            # Concurrent rebuilds produce identical bodies; the last one wins
+            entry = self._entry = (version, EncodedBody(self.build(), self.headers, brotli_quality=11, gzip_level=9))
+        return entry[1]
+
+    def respond(self, request: Request, cache_control: str = 'no-cache') -> Response:
+        return self.get().respond(request, cache_control)
+
+
+class ResponseCache:
+    """Small thread-safe LRU keyed by request parameters, usually of :class:`EncodedBody` objects."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, EncodedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[EncodedBody]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, entry: EncodedBody) -> EncodedBody:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,200 @@
+import os
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import psutil
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+from .metrics import (
+    RUNTIME_GAUGES,
+    runtime_gauges,
+    prediction_counter,
+    prediction_duration,
+    endpoint_duration,
+    request_phase_duration,
+    model_phase_duration,
+    model_batch_rows
+)
+
+logger = logging.getLogger(__name__)
+
+# Request paths timed by PredictionMetricsMiddleware, and their endpoint label
+TIMED_ENDPOINTS = {
+    '/predict/': 'predict',
+    '/predict/batch': 'batch',
+    '/predict/batch/columnar': 'batch_columnar',
+    '/predict/catalogue': 'catalogue',
+    '/predict/meal-plan': 'meal_plan',
+    '/predict/stream': 'stream',
+}
+
+# Labelled children are looked up once; labels() takes a lock on every call
+_children: Dict[Tuple, object] = {}
+
+
+def _child(metric, *labels):
+    key = (metric, labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+def observe_predictions(model_key: str, status: str, rows: int, phase_seconds: Optional[Dict[str, float]]):
+    """``ModelLoader.metrics_observer``: count rows by outcome and time the model call."""
+    _child(prediction_counter, model_key, status).inc(rows)
+    if phase_seconds:
+        _child(model_batch_rows, model_key).observe(rows)
+        for phase, seconds in phase_seconds.items():
+            _child(model_phase_duration, model_key, phase).observe(seconds)
+
+
+def observe_request_phase(endpoint: str, phase: str, seconds: float):
+    _child(request_phase_duration, endpoint, phase).observe(seconds)
+
+
+def mark_handler_started(request):
+    """Record that FastAPI finished parsing and validating the request body."""
+    request.state.handler_started = time.perf_counter()
+
+
+def mark_handler_finished(request):
+    """Record that the handler returned and response serialization begins."""
+    request.state.handler_finished = time.perf_counter()
+
+
+class PredictionMetricsMiddleware:
+    """
+    Times prediction requests: validation, serialization and the whole request.
+
+    Validation is the time from arrival to ``mark_handler_started`` (body read,
+    JSON parsing and pydantic validation); serialization is the time from
+    ``mark_handler_finished`` to the response start. Other paths pass straight
+    through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        endpoint = TIMED_ENDPOINTS.get(scope.get('path')) if scope['type'] == 'http' else None
+        if endpoint is None:
+            await self.app(scope, receive, send)
+            return
+
+        received_at = time.perf_counter()
+        state = scope.setdefault('state', {})
+
+        async def timed_send(message):
+            if message['type'] == 'http.response.start':
+                now = time.perf_counter()
+                started = state.get('handler_started')
+                finished = state.get('handler_finished')
+                if started is not None:
+                    observe_request_phase(endpoint, 'validation', started - received_at)
+                if finished is not None:
+                    observe_request_phase(endpoint, 'serialization', now - finished)
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                elapsed = time.perf_counter() - received_at
+                prediction_duration.observe(elapsed)
+                _child(endpoint_duration, endpoint).observe(elapsed)
+            await send(message)
+
+        await self.app(scope, receive, timed_send)
+
+
+class RuntimeCollector:
+    """
+    Exposes loader, executor and micro-batcher state as gauges at scrape time.
+
+    Nothing is updated on the request path: model accuracy, load durations and
+    queue depths are read from the live objects whenever ``/metrics`` is hit.
+    In multiprocess mode the collector cannot see other workers, so instead
+    each worker ``publish``es its values to file-backed gauges every
+    ``interval_s`` (default ``METRICS_PUBLISH_INTERVAL_S``) once ``start``ed.
+    """
+
+    def __init__(self, model_loader, inference_executor=None, micro_batcher=None, interval_s: Optional[float] = None):
+        if interval_s is None:
+            interval_s = float(os.getenv('METRICS_PUBLISH_INTERVAL_S', '5'))
+        self.model_loader = model_loader
+        self.inference_executor = inference_executor
+        self.micro_batcher = micro_batcher
+        self.interval = max(0.1, float(interval_s))
+        self._task: Optional[asyncio.Task] = None
+
+    def _values(self) -> Iterator[Tuple[str, Tuple[str, ...], float]]:
+        """Yield ``(gauge name, label values, value)`` for every runtime gauge sample."""
+        for key, info in list(self.model_loader.models.items()):
+            if info.get('available') and isinstance(info.get('test_r2'), (int, float)):
+                yield 'model_accuracy', (key,), info['test_r2']
+        for name, seconds in list(self.model_loader.load_seconds.items()):
+            yield 'model_load_seconds', (name, self.model_loader.load_state.get(name, 'unknown')), seconds
+        if self.inference_executor is not None:
+            yield 'inference_in_flight', (), self.inference_executor.in_flight
+            yield 'inference_queue_depth', (), self.inference_executor.queue_depth
+        if self.micro_batcher is not None:
+            yield 'prediction_batch_pending', (), self.micro_batcher.pending_rows
+
+    def describe(self):
+        return []
+
+    def collect(self):
+        families = {
+            name: GaugeMetricFamily(name, doc, labels=list(labels))
+            for name, (doc, labels, _) in RUNTIME_GAUGES.items()
+        }
+        for name, labels, value in self._values():
+            families[name].add_metric(list(labels), value)
+        return [family for family in families.values() if family.samples]
+
+    def publish(self):
+        """Copy the current values into the file-backed multiprocess gauges."""
+        for name, labels, value in self._values():
+            gauge = runtime_gauges[name]
+            (gauge.labels(*labels) if labels else gauge).set(value)
+
+    async def _run(self):
+        while True:
+            try:
+                self.publish()
+            except Exception as e:
+                logger.error(f"Publishing runtime metrics failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def prune_dead_workers(directory: str) -> List[int]:
+    """
+    Drop the live-gauge files of worker processes that no longer exist.
+
+    uvicorn's supervisor has no exit hook to call ``mark_process_dead`` from,
+    so every worker does this on startup instead; a crashed worker's gauges
+    then disappear as soon as its replacement starts. Counter and histogram
+    files are kept so totals never go backwards.
+    """
+    pids = set()
+    for path in Path(directory).glob('gauge_live*_*.db'):
+        try:
+            pids.add(int(path.stem.rsplit('_', 1)[1]))
+        except ValueError:
+            continue
+    dead = sorted(pid for pid in pids if not psutil.pid_exists(pid))
+    for pid in dead:
+        multiprocess.mark_process_dead(pid, directory)
+    return dead
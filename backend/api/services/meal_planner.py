@@ -0,0 +1,290 @@
+import os
+import time
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from scipy.optimize import Bounds, LinearConstraint, OptimizeResult, milp
+
+from .catalogue import ENCODED_REGIONS, MARKET_NUTRIENTS, CatalogueData
+from .http_cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Market seasonality values on sale in each season_encoded season; the
+# harvests follow the rains and fall in the dry months
+SEASON_AVAILABILITY = (
+    ('year-round', 'dry season', 'harvest season'),  # 0: Dry
+    ('year-round', 'rainy season'),                  # 1: Wet
+)
+
+# Daily targets for older adults: nutrient -> (min, max), None when unbounded
+BASE_TARGETS = {
+    'fiber_g': (25, None),
+    'calcium_mg': (1000, None),
+    'iron_mg': (8, None),
+    'zinc_mg': (8, None),
+    'vitamin_a_ug': (700, None),
+    'vitamin_c_mg': (75, None),
+    'potassium_mg': (3000, None),
+    'sodium_mg': (None, 2300),
+}
+
+# Macronutrient -> (min, max) share of the daily energy target
+BASE_ENERGY_SHARES = {
+    'protein_g': (0.15, None),
+    'fat_g': (None, 0.35),
+    'carbs_g': (None, None),
+}
+KCAL_PER_GRAM = {'protein_g': 4.0, 'fat_g': 9.0, 'carbs_g': 4.0}
+
+# condition_encoded -> overrides of BASE_TARGETS / BASE_ENERGY_SHARES
+CONDITION_TARGETS = {
+    0: {'sodium_mg': (None, 1500), 'potassium_mg': (3500, None)},  # Hypertension
+    1: {'protein_g': (0.20, None)},                                 # Undernutrition
+    2: {'iron_mg': (18, None), 'vitamin_c_mg': (100, None)},        # Anemia
+    3: {'protein_g': (0.20, None), 'calcium_mg': (1200, None)},     # Frailty
+    4: {'fiber_g': (30, None)},                                     # Digestive issues
+    5: {'vitamin_c_mg': (90, None)},                                # Arthritis
+    6: {'calcium_mg': (1200, None)},                                # Osteoporosis
+    7: {'carbs_g': (None, 0.50), 'fiber_g': (30, None)},            # Diabetes
+}
+
+# Constraint rows: one per nutrient, then the total weight of the plan
+PLAN_ROWS = (*MARKET_NUTRIENTS, 'total_g')
+
+MILP_STATUS = {0: 'optimal', 1: 'limit_reached', 2: 'infeasible', 3: 'unbounded', 4: 'error'}
+
+# Relative optimality gap accepted from integer solves; whole portions
+# typically cost a few percent over the LP, and proving a tighter gap
+# dominates the solve time
+INTEGER_GAP = 0.02
+
+# Cheapest sources of each required nutrient added to the LP's foods for integer solves
+SOURCES_PER_NUTRIENT = 2
+
+# Integer solves keep each amount within this many portions of the LP's amount
+PORTION_RADIUS = 2
+
+
+def nutrient_targets(condition: int, caloric_needs: float, energy_tolerance: float = 0.05) -> Dict[str, Tuple]:
+    """
+    Daily ``{nutrient: (min, max)}`` for a condition and energy target.
+
+    Energy must land within ``energy_tolerance`` of ``caloric_needs``;
+    macronutrient shares become grams at that target.
+    """
+    overrides = CONDITION_TARGETS.get(condition, {})
+    targets = {'energy_kcal': (caloric_needs * (1 - energy_tolerance), caloric_needs * (1 + energy_tolerance))}
+    for nutrient, shares in BASE_ENERGY_SHARES.items():
+        shares = overrides.get(nutrient, shares)
+        targets[nutrient] = tuple(
+            None if share is None else share * caloric_needs / KCAL_PER_GRAM[nutrient] for share in shares
+        )
+    for nutrient, bounds in BASE_TARGETS.items():
+        targets[nutrient] = overrides.get(nutrient, bounds)
+    return targets
+
+
+def integer_candidates(A, cost: np.ndarray, lower: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    Columns to search for an integer plan: the foods of the LP optimum ``x``
+    plus the ``SOURCES_PER_NUTRIENT`` cheapest sources of each nutrient with
+    a minimum in ``lower``. Only the stored entries of ``A`` are read.
+    """
+    candidates = [np.flatnonzero(x > 1e-9)]
+    price = np.maximum(cost, 1e-9)
+    rows = sparse.csr_matrix(A)
+    for i in np.flatnonzero(lower > 0):
+        foods = rows.indices[rows.indptr[i]:rows.indptr[i + 1]]
+        density = rows.data[rows.indptr[i]:rows.indptr[i + 1]] / price[foods]
+        if len(foods) > SOURCES_PER_NUTRIENT:
+            foods = foods[np.argpartition(-density, SOURCES_PER_NUTRIENT)[:SOURCES_PER_NUTRIENT]]
+        candidates.append(foods)
+    return np.unique(np.concatenate(candidates))
+
+
+class PlanningMatrix:
+    """
+    Foods on sale in one region and season, as an LP over 100 g of each.
+
+    ``A`` is a sparse ``len(PLAN_ROWS) x foods`` matrix of nutrients per
+    100 g edible portion (the last row is the weight, 100 g); ``cost`` is the
+    price of 100 g edible, from the market price per kg and the edible share.
+    """
+
+    def __init__(self, data: CatalogueData, region: str, season: int):
+        market = data.market
+        in_region = (market['region'] == region) | (market['region'] == 'all')
+        in_season = np.isin(market['season'], SEASON_AVAILABILITY[season])
+        self.positions = np.flatnonzero(in_region & in_season)
+
+        dense = np.vstack([market[nutrient][self.positions] for nutrient in MARKET_NUTRIENTS] +
+                          [np.full(len(self.positions), 100.0)])
+        # Column-major: each solve slices out the available foods
+        self.A = sparse.csc_matrix(dense)
+        self.cost = market['price_per_kg'][self.positions] / 10 * 100 / market['edible_percent'][self.positions]
+        self.availability = market['availability_score'][self.positions]
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class MealPlanner:
+    """
+    Minimum-cost daily meal plans over the food catalogue, solved with HiGHS.
+
+    Constraint matrices for every region and season are built once per
+    catalogue version, so a solve only slices columns and assembles bound
+    vectors. Plans are cached per request (``max_cached_plans``) for that
+    version. Integer solves are bounded by ``time_limit_s`` (default
+    ``MEAL_PLAN_TIME_LIMIT_S``).
+    """
+
+    def __init__(self, max_cached_plans: int = 256, time_limit_s: Optional[float] = None):
+        if time_limit_s is None:
+            time_limit_s = float(os.getenv('MEAL_PLAN_TIME_LIMIT_S', '0.25'))
+        self.max_cached_plans = max_cached_plans
+        self.time_limit_s = time_limit_s
+        self._version: Optional[str] = None
+        self._matrices: Dict[Tuple[int, int], PlanningMatrix] = {}
+        self.plan_cache = ResponseCache(max_entries=max_cached_plans)
+        self._lock = threading.Lock()
+
+    def matrices(self, data: CatalogueData) -> Dict[Tuple[int, int], PlanningMatrix]:
+        """``{(region_encoded, season_encoded): PlanningMatrix}`` for ``data``, rebuilt when its version changes."""
+        if self._version == data.version:
+            return self._matrices
+        with self._lock:
+            if self._version != data.version:
+                started = time.perf_counter()
+                self._matrices = {
+                    (r, s): PlanningMatrix(data, region, s)
+                    for r, region in enumerate(ENCODED_REGIONS)
+                    for s in range(len(SEASON_AVAILABILITY))
+                }
+                self.plan_cache = ResponseCache(max_entries=self.max_cached_plans)
+                self._version = data.version
+                logger.info(f"Built meal planning matrices for catalogue {data.version} "
+                            f"in {(time.perf_counter() - started) * 1000:.1f} ms")
+            return self._matrices
+
+    def _solve_integer(self, A, cost, lower, upper, columns, step_g: float, max_food_g: float, near=None):
+        """
+        MILP over ``columns`` with amounts in whole ``step_g`` portions, each
+        within ``PORTION_RADIUS`` portions of ``near`` (per 100 g) when given.
+        """
+        scale = step_g / 100.0
+        low, high = 0, np.floor(max_food_g / step_g)
+        if near is not None:
+            portions = near[columns] / scale
+            low = np.maximum(np.floor(portions) - PORTION_RADIUS, 0)
+            high = np.minimum(np.ceil(portions) + PORTION_RADIUS, high)
+        return milp(
+            cost[columns] * scale,
+            constraints=LinearConstraint(A[:, columns] * scale, lower, upper),
+            bounds=Bounds(low, high),
+            integrality=np.ones(len(columns)),
+            options={'mip_rel_gap': INTEGER_GAP, 'time_limit': self.time_limit_s}
+        )
+
+    def plan(
+        self,
+        data: CatalogueData,
+        region: int,
+        season: int,
+        condition: int,
+        caloric_needs: float,
+        max_food_g: float = 500,
+        max_total_g: float = 2500,
+        portion_step_g: Optional[float] = None,
+        min_availability: float = 0.5,
+        energy_tolerance: float = 0.05
+    ) -> Dict:
+        """
+        Solve for the cheapest day of food meeting the condition's targets.
+
+        Each food is limited to ``max_food_g`` and the day to ``max_total_g``;
+        foods with an availability score below ``min_availability`` are left
+        out. The LP optimum is always solved and reported as
+        ``lower_bound_ugx``. With ``portion_step_g`` amounts are then made
+        whole multiples of it by a MILP over the LP's foods and the cheapest
+        sources of each required nutrient, with amounts kept near the LP's,
+        falling back to every food when those cannot meet the targets.
+        """
+        caloric_needs = float(round(caloric_needs))
+        key = (data.version, region, season, condition, caloric_needs, max_food_g, max_total_g,
+               portion_step_g, min_availability, energy_tolerance)
+        matrices = self.matrices(data)
+        cached = self.plan_cache.get(key)
+        if cached is not None:
+            return cached
+
+        matrix = matrices[(region, season)]
+        columns = np.flatnonzero(matrix.availability >= min_availability)
+        A, cost = matrix.A[:, columns], matrix.cost[columns]
+        targets = nutrient_targets(condition, caloric_needs, energy_tolerance)
+        lower = np.array([targets.get(row, (None, None))[0] or 0.0 for row in PLAN_ROWS])
+        upper = np.array([
+            np.inf if targets.get(row, (None, None))[1] is None else targets[row][1] for row in PLAN_ROWS
+        ])
+        upper[-1] = max_total_g
+
+        started = time.perf_counter()
+        if len(columns):
+            # Presolve costs more than it saves on a dozen constraint rows
+            result = milp(cost, constraints=LinearConstraint(A, lower, upper),
+                          bounds=Bounds(0, max_food_g / 100.0), options={'presolve': False})
+        else:
+            result = OptimizeResult(x=None, fun=None, status=2,
+                                    message="No foods on sale for this region, season and availability")
+        lower_bound = None if result.x is None else float(result.fun)
+        chosen_columns, unit = np.arange(len(columns)), 100.0
+        if portion_step_g and result.x is not None:
+            lp_x = result.x
+            candidates = integer_candidates(A, cost, lower, lp_x)
+            result = self._solve_integer(A, cost, lower, upper, candidates, portion_step_g, max_food_g, near=lp_x)
+            if result.x is None:
+                candidates = np.arange(len(columns))
+                result = self._solve_integer(A, cost, lower, upper, candidates, portion_step_g, max_food_g)
+            chosen_columns, unit = candidates, portion_step_g
+        solve_ms = (time.perf_counter() - started) * 1000
+
+        plan = {
+            'success': result.x is not None,
+            'status': MILP_STATUS.get(result.status, 'error'),
+            'error': None if result.x is not None else result.message,
+            'caloric_needs': caloric_needs,
+            'catalogue_version': data.version,
+            'candidates': len(columns),
+            'solve_ms': round(solve_ms, 3),
+            'cost_ugx': None,
+            'lower_bound_ugx': None if lower_bound is None else round(lower_bound, 2),
+            'foods': [],
+            'nutrients': {},
+            'targets': {nutrient: {'min': low, 'max': high} for nutrient, (low, high) in targets.items()},
+        }
+        if result.x is not None:
+            market = data.market
+            grams = np.zeros(len(columns))
+            grams[chosen_columns] = result.x * unit
+            picked = np.flatnonzero(grams >= 0.5)
+            picked = picked[np.argsort(-grams[picked], kind='stable')]
+            totals = A @ (grams / 100.0)
+            plan['cost_ugx'] = round(float(cost @ (grams / 100.0)), 2)
+            plan['nutrients'] = {row: round(float(total), 2) for row, total in zip(PLAN_ROWS, totals)}
+            plan['foods'] = [
+                {
+                    'id': market['id'][pos],
+                    'name': market['name'][pos],
+                    'category': market['category'][pos],
+                    'region': market['region'][pos],
+                    'preparation': market['preparation'][pos],
+                    'grams': round(float(grams[j]), 1),
+                    'cost_ugx': round(float(grams[j] / 100.0 * cost[j]), 2),
+                }
+                for j, pos in zip(picked.tolist(), matrix.positions[columns[picked]].tolist())
+            ]
+        return self.plan_cache.put(key, plan)
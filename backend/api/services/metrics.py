@@ -0,0 +1,75 @@
+"""Prometheus metrics recorded by the services and exposed by routers.metrics"""
+import os
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Set (before prometheus_client is imported) when several workers serve the app:
+# every worker then writes its metrics to files here and /metrics aggregates them
+MULTIPROCESS_DIR = os.getenv('PROMETHEUS_MULTIPROC_DIR') or None
+
+# Per-row outcome: success (scored by the model), cached, fallback (heuristic) or error
+prediction_counter = Counter('predictions_total', 'Total number of predictions', ['model', 'status'])
+# Unlabelled with the default buckets, as it has always been exported; existing
+# dashboards and alerts query it. The per-endpoint breakdown is a separate series
+prediction_duration = Histogram('prediction_duration_seconds', 'Time spent processing prediction')
+endpoint_duration = Histogram(
+    'prediction_request_duration_seconds',
+    'Time from request arrival to the end of the response, per prediction endpoint',
+    ['endpoint'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+# validation and serialization are per request; feature_prep and inference per model call
+request_phase_duration = Histogram(
+    'request_phase_seconds',
+    'Time spent validating input and serializing output',
+    ['endpoint', 'phase'],
+    buckets=(0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+)
+model_phase_duration = Histogram(
+    'model_phase_seconds',
+    'Time spent building feature matrices and running the model',
+    ['model', 'phase'],
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.25, 1)
+)
+model_batch_rows = Histogram(
+    'model_batch_rows',
+    'Rows passed to the model per call (after cache hits)',
+    ['model'],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 1000, 5000, 20000)
+)
+# Gauges read from the live loader, executor and batcher at scrape time by
+# services.instrumentation.RuntimeCollector: name -> (help, labels, multiprocess mode)
+RUNTIME_GAUGES = {
+    'model_accuracy': ('Test R² of the loaded model', ('model',), 'livemax'),
+    'model_load_seconds': ('Duration of the last load of each model loader', ('loader', 'state'), 'liveall'),
+    'inference_in_flight': ('Inference calls running or waiting for a worker', (), 'livesum'),
+    'inference_queue_depth': ('Inference calls waiting for a free worker', (), 'livesum'),
+    'prediction_batch_pending': ('Rows waiting in the micro-batch window', (), 'livesum'),
+}
+# Scrape-time collectors only see the worker serving /metrics, so in
+# multiprocess mode each worker copies them into these file-backed gauges
+runtime_gauges = {
+    name: Gauge(name, doc, labels, registry=None, multiprocess_mode=mode)
+    for name, (doc, labels, mode) in RUNTIME_GAUGES.items()
+} if MULTIPROCESS_DIR else {}
+prediction_batch_size = Histogram(
+    'prediction_batch_size',
+    'Rows per micro-batched model call',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+prediction_batch_wait = Histogram(
+    'prediction_batch_wait_seconds',
+    'Time a request waited in the micro-batch window',
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+)
+prediction_cache_hits = Counter(
+    'prediction_cache_hits_total',
+    'Predictions served from the result cache',
+    ['tier']
+)
+prediction_cache_misses = Counter('prediction_cache_misses_total', 'Result cache lookups that ran the model')
+prediction_cache_entries = Gauge(
+    'prediction_cache_entries',
+    'Results held in the in-memory prediction cache',
+    multiprocess_mode='livesum'
+)
@@ -0,0 +1,83 @@
+import os
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from ..models.artifact_cache import artifact_tag
+
+logger = logging.getLogger(__name__)
+
+
+class ModelWatcher:
+    """
+    Polls the local model directory and hot-reloads models whose artifact changed.
+
+    Every ``interval_s`` the newest artifact for each reloadable model is
+    fingerprinted as ``name@artifact_tag`` (the form of a loaded entry's
+    ``version``); a change triggers ``model_loader.reload_model`` on a worker
+    thread, so loading and validation never run on the event loop. The
+    fingerprints start from the versions of the loaded models, so an artifact
+    replaced before the first poll is reloaded too. A failed reload keeps the
+    live model and is retried only once the artifact changes again.
+
+    The interval defaults to ``MODEL_WATCH_INTERVAL_S``.
+    """
+
+    def __init__(self, model_loader, interval_s: Optional[float] = None):
+        if interval_s is None:
+            interval_s = float(os.getenv('MODEL_WATCH_INTERVAL_S', '10'))
+        self.model_loader = model_loader
+        self.interval = max(0.1, float(interval_s))
+        self._seen: Dict[str, str] = {
+            key: entry['version'] for key, entry in list(model_loader.models.items()) if entry.get('version')
+        }
+        self._task: Optional[asyncio.Task] = None
+
+    def _loaded_version(self, key: str) -> Optional[str]:
+        return self.model_loader.models.get(key, {}).get('version')
+
+    def _fingerprints(self) -> Dict[str, str]:
+        fingerprints = {}
+        for key, path in self.model_loader.watched_artifacts().items():
+            try:
+                fingerprints[key] = f"{path.name}@{artifact_tag(path)}"
+            except OSError:
+                continue
+        return fingerprints
+
+    async def check(self):
+        """Reload every model whose artifact changed since the previous check."""
+        loop = asyncio.get_running_loop()
+        current = await loop.run_in_executor(None, self._fingerprints)
+        for key, fingerprint in current.items():
+            # Models loaded after the watcher started are compared with what they loaded
+            previous = self._seen.get(key) or self._loaded_version(key)
+            self._seen[key] = fingerprint
+            if previous is None or previous == fingerprint:
+                continue
+            filename = fingerprint.rsplit('@', 1)[0]
+            logger.info(f"Detected new artifact for {key}: {filename}")
+            try:
+                await loop.run_in_executor(None, self.model_loader.reload_model, key, filename)
+            except Exception as e:
+                logger.error(f"Hot reload of {key} failed; keeping the live model: {e}")
+
+    async def _run(self):
+        while True:
+            try:
+                await self.check()
+            except Exception as e:
+                logger.error(f"Model watcher check failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
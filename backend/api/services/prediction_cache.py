@@ -0,0 +1,178 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from .metrics import prediction_cache_hits, prediction_cache_misses, prediction_cache_entries
+
+logger = logging.getLogger(__name__)
+
+# Prune expired and excess rows from the shared store every this many writes
+SQLITE_PRUNE_EVERY = 256
+
+
+class PredictionCache:
+    """
+    LRU/TTL cache of prediction results, consulted by ``ModelLoader.predict_batch``.
+
+    Keys hash the model key, the model version and the validated input row as
+    the model sees it (float64 values in feature-plan order), so field order,
+    ``350`` vs ``350.0`` and unused fields never cause a miss, and a reloaded
+    model can never be served a stale result.
+
+    An optional SQLite file (``sqlite_path``) is shared by every worker on the
+    host: in-memory misses fall through to it and results are written to both.
+
+    Only batches of at most ``max_batch`` rows use the cache: bulk scoring
+    rarely repeats a row, and hashing, locking and storing thousands of them
+    would cost more than it saves and flush the LRU of the single-row traffic
+    it is for.
+
+    Configured through ``PREDICTION_CACHE_MAX_ENTRIES``, ``PREDICTION_CACHE_TTL_S``,
+    ``PREDICTION_CACHE_MAX_BATCH``, ``PREDICTION_CACHE_SQLITE`` and
+    ``PREDICTION_CACHE_SQLITE_MAX_ENTRIES``.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_s: Optional[float] = None,
+        sqlite_path: Optional[str] = None,
+        sqlite_max_entries: Optional[int] = None,
+        max_batch: Optional[int] = None
+    ):
+        if max_entries is None:
+            max_entries = int(os.getenv('PREDICTION_CACHE_MAX_ENTRIES', '4096'))
+        if ttl_s is None:
+            ttl_s = float(os.getenv('PREDICTION_CACHE_TTL_S', '3600'))
+        if sqlite_path is None:
+            sqlite_path = os.getenv('PREDICTION_CACHE_SQLITE') or None
+        if sqlite_max_entries is None:
+            sqlite_max_entries = int(os.getenv('PREDICTION_CACHE_SQLITE_MAX_ENTRIES', '100000'))
+        self.max_entries = max(1, int(max_entries))
+        self.ttl = float(ttl_s)
+        self.sqlite_path = sqlite_path
+        self.sqlite_max_entries = max(1, int(sqlite_max_entries))
+        if max_batch is None:
+            # The micro-batcher's largest flush, so coalesced single requests stay cached
+            max_batch = int(os.getenv('PREDICTION_CACHE_MAX_BATCH', '64'))
+        self.max_batch = max(1, int(max_batch))
+
+        # key -> (expires_at, model_key, result)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._writes = 0
+        if self.sqlite_path:
+            with self._connection() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS predictions ("
+                    "key TEXT PRIMARY KEY, model TEXT NOT NULL, result TEXT NOT NULL, expires_at REAL NOT NULL)"
+                )
+                conn.execute("CREATE INDEX IF NOT EXISTS predictions_expiry ON predictions (expires_at)")
+
+    @staticmethod
+    def key(model_key: str, version: Optional[str], row: np.ndarray) -> str:
+        digest = hashlib.blake2b(f"{model_key}|{version}|".encode(), digest_size=16)
+        digest.update(np.ascontiguousarray(row, dtype=np.float64).tobytes())
+        return digest.hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections cannot be shared across the executor's threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.sqlite_path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Dict]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    prediction_cache_hits.labels(tier='memory').inc()
+                    return entry[2]
+                del self._entries[key]
+
+        if self.sqlite_path:
+            try:
+                row = self._connection().execute(
+                    "SELECT model, result, expires_at FROM predictions WHERE key = ? AND expires_at > ?",
+                    (key, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                logger.warning(f"Shared prediction cache read failed: {e}")
+                row = None
+            if row is not None:
+                result = json.loads(row[1])
+                self._remember(key, row[0], result, row[2])
+                prediction_cache_hits.labels(tier='sqlite').inc()
+                return result
+
+        prediction_cache_misses.inc()
+        return None
+
+    def _remember(self, key: str, model_key: str, result: Dict, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, model_key, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            prediction_cache_entries.set(len(self._entries))
+
+    def set(self, key: str, model_key: str, result: Dict):
+        expires_at = time.time() + self.ttl
+        self._remember(key, model_key, result, expires_at)
+        if not self.sqlite_path:
+            return
+        try:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO predictions (key, model, result, expires_at) VALUES (?, ?, ?, ?)",
+                (key, model_key, json.dumps(result), expires_at)
+            )
+            self._writes += 1
+            if self._writes % SQLITE_PRUNE_EVERY == 0:
+                self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Shared prediction cache write failed: {e}")
+
+    def _prune(self, conn: sqlite3.Connection):
+        conn.execute("DELETE FROM predictions WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM predictions WHERE key IN ("
+            "SELECT key FROM predictions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.sqlite_max_entries,)
+        )
+
+    def invalidate(self, model_key: Optional[str] = None):
+        """Drop cached results for ``model_key`` (or everything), here and in the shared store."""
+        with self._lock:
+            if model_key is None:
+                self._entries.clear()
+            else:
+                for key in [k for k, entry in self._entries.items() if entry[1] == model_key]:
+                    del self._entries[key]
+            prediction_cache_entries.set(len(self._entries))
+        if self.sqlite_path:
+            try:
+                if model_key is None:
+                    self._connection().execute("DELETE FROM predictions")
+                else:
+                    self._connection().execute("DELETE FROM predictions WHERE model = ?", (model_key,))
+            except sqlite3.Error as e:
+                logger.warning(f"Shared prediction cache invalidation failed: {e}")
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,289 @@
+import os
+import csv
+import json
+import time
+import logging
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pyarrow as pa
+from pydantic import ValidationError
+
+from ..models import NutritionInput
+from ..models.schemas import row_errors
+from .binary_formats import (
+    ARROW_EOS,
+    MEDIA_TYPES,
+    RESULT_SCHEMA,
+    arrow_columns,
+    arrow_message,
+    media_format,
+    msgpack_unpacker,
+    result_batch
+)
+from .fast_json import dumps
+from .instrumentation import observe_request_phase
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPES = MEDIA_TYPES['ndjson']
+CSV_MEDIA_TYPES = MEDIA_TYPES['csv']
+STREAM_FORMATS = ('ndjson', 'csv', 'msgpack', 'arrow')
+
+# Request bodies are held in memory up to this size, then on disk
+SPOOL_MAX_BYTES = 1 << 20
+READ_BLOCK_BYTES = 1 << 16
+
+# (line number, input dict or None, error or None)
+Record = Tuple[int, Optional[Dict], Optional[str]]
+
+
+async def spool_body(chunks: AsyncIterator[bytes]) -> SpooledTemporaryFile:
+    """
+    Copy a request body into a temporary file that spills to disk past ``SPOOL_MAX_BYTES``.
+
+    Common clients send the whole body before reading any of the response, so
+    results cannot be streamed back while the upload is still arriving without
+    buffering them; spooling the input keeps memory bounded instead.
+    """
+    spool = SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    try:
+        async for chunk in chunks:
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def iter_spool(spool: SpooledTemporaryFile) -> AsyncIterator[bytes]:
+    """Read a spooled body back in blocks, closing (and deleting) it when done."""
+    try:
+        while True:
+            block = spool.read(READ_BLOCK_BYTES)
+            if not block:
+                break
+            yield block
+    finally:
+        spool.close()
+
+
+def stream_format(content_type: Optional[str]) -> Optional[str]:
+    """Return 'ndjson', 'csv', 'msgpack' or 'arrow' for a request Content-Type, or None if unsupported."""
+    fmt = media_format(content_type)
+    return fmt if fmt in STREAM_FORMATS else None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered text lines, holding at most one partial line."""
+    pending = b''
+    line_no = 0
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (pending + chunk).split(b'\n')
+        pending = lines.pop()
+        for raw in lines:
+            line_no += 1
+            yield line_no, raw.decode('utf-8', errors='replace').rstrip('\r')
+    if pending:
+        yield line_no + 1, pending.decode('utf-8', errors='replace').rstrip('\r')
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[Record]:
+    """
+    Parse NDJSON objects or CSV rows (header line first) into input dicts.
+
+    Blank lines are skipped. CSV fields must not contain embedded newlines.
+    Malformed lines become error records instead of ending the stream.
+    For 'msgpack' the body is a sequence of maps, numbered from 1 like lines.
+    """
+    if fmt == 'msgpack':
+        async for record in _iter_msgpack(chunks):
+            yield record
+        return
+
+    header = None
+    async for line_no, line in iter_lines(chunks):
+        if not line.strip():
+            continue
+        if fmt == 'ndjson':
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_no, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            if len(values) != len(header):
+                yield line_no, None, f"Expected {len(header)} columns, got {len(values)}"
+                continue
+            yield line_no, dict(zip(header, values)), None
+
+
+async def _iter_msgpack(chunks: AsyncIterator[bytes]) -> AsyncIterator[Record]:
+    unpacker = msgpack_unpacker()
+    index = 0
+    async for chunk in chunks:
+        unpacker.feed(chunk)
+        while True:
+            try:
+                record = next(unpacker)
+            except StopIteration:
+                break
+            except Exception as e:
+                # The decoder cannot resynchronize after corrupt data
+                yield index + 1, None, f"Invalid MessagePack: {e}"
+                return
+            index += 1
+            if not isinstance(record, dict):
+                yield index, None, "Expected a MessagePack map"
+                continue
+            yield index, record, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    return '; '.join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}" for item in error.errors()
+    )
+
+
+def _dump(line: Dict) -> bytes:
+    return dumps(line) + b'\n'
+
+
+async def stream_predictions(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    score_batch: Callable[[List[Dict]], Awaitable[List[Dict]]],
+    chunk_rows: Optional[int] = None,
+    encode: Optional[Callable[[Dict], bytes]] = None
+) -> AsyncIterator[bytes]:
+    """
+    Validate and score a streamed request body, yielding encoded result lines.
+
+    Rows are validated against NutritionInput and scored ``chunk_rows`` at a
+    time (default ``PREDICT_STREAM_CHUNK_ROWS``) with one ``score_batch`` call,
+    so memory is bounded by the chunk size, not the body size. Each output
+    line carries the input ``line`` number plus the usual prediction result;
+    the last line is ``{"summary": {"total", "successful", "failed"}}``.
+    Lines are NDJSON unless another ``encode`` (e.g. MessagePack) is given.
+    """
+    if chunk_rows is None:
+        chunk_rows = int(os.getenv('PREDICT_STREAM_CHUNK_ROWS', '1000'))
+    chunk_rows = max(1, int(chunk_rows))
+    encode = encode or _dump
+    total = successful = 0
+
+    async def score_chunk(chunk: List[Record]) -> bytes:
+        nonlocal total, successful
+        valid = [(line_no, record) for line_no, record, error in chunk if error is None]
+        try:
+            results = iter(await score_batch([record for _, record in valid]) if valid else [])
+        except Exception as e:
+            # Status and headers are already sent; report the failure per row
+            logger.error(f"Stream chunk of {len(valid)} rows failed: {e}")
+            detail = getattr(e, 'detail', None) or str(e)
+            results = iter([{'success': False, 'error': detail, 'status': 'error'}] * len(valid))
+
+        serialize_started = time.perf_counter()
+        out = []
+        for line_no, _, error in chunk:
+            result = {'success': False, 'error': error, 'status': 'error'} if error is not None else next(results)
+            total += 1
+            successful += bool(result.get('success'))
+            out.append(encode({'line': line_no, **result}))
+        observe_request_phase('stream', 'serialization', time.perf_counter() - serialize_started)
+        return b''.join(out)
+
+    chunk: List[Record] = []
+    validation_seconds = 0.0
+    async for line_no, record, error in iter_records(chunks, fmt):
+        if error is None:
+            validate_started = time.perf_counter()
+            try:
+                record = NutritionInput.model_validate(record).model_dump()
+            except ValidationError as e:
+                record, error = None, _validation_message(e)
+            validation_seconds += time.perf_counter() - validate_started
+        chunk.append((line_no, record, error))
+        if len(chunk) >= chunk_rows:
+            observe_request_phase('stream', 'validation', validation_seconds)
+            validation_seconds = 0.0
+            yield await score_chunk(chunk)
+            chunk = []
+    if chunk:
+        observe_request_phase('stream', 'validation', validation_seconds)
+        yield await score_chunk(chunk)
+
+    yield encode({'summary': {'total': total, 'successful': successful, 'failed': total - successful}})
+
+
+async def stream_arrow_predictions(
+    reader: pa.RecordBatchStreamReader,
+    score_frame: Callable[[Dict[str, np.ndarray]], Awaitable[Dict]],
+    chunk_rows: Optional[int] = None,
+    source=None
+) -> AsyncIterator[bytes]:
+    """
+    Score an Arrow IPC stream batch by batch, yielding an Arrow IPC stream of results.
+
+    Input batches are sliced to at most ``chunk_rows`` rows (default
+    ``PREDICT_STREAM_CHUNK_ROWS``) and scored with one ``score_frame`` call on
+    their feature columns, without building per-row objects. Output batches
+    follow RESULT_SCHEMA with one row per input row, in order; rows outside
+    NutritionInput's bounds get an error instead of a prediction. The reader's
+    schema must already have been checked for missing features; ``source``
+    (the spooled body it reads) is closed when the stream ends.
+    """
+    if chunk_rows is None:
+        chunk_rows = int(os.getenv('PREDICT_STREAM_CHUNK_ROWS', '1000'))
+    chunk_rows = max(1, int(chunk_rows))
+
+    try:
+        yield arrow_message(RESULT_SCHEMA)
+        for batch in reader:
+            for offset in range(0, batch.num_rows, chunk_rows):
+                chunk = batch.slice(offset, chunk_rows)
+                n_rows = chunk.num_rows
+
+                validate_started = time.perf_counter()
+                columns = arrow_columns(chunk)
+                errors = row_errors(columns, n_rows)
+                valid = np.fromiter((error is None for error in errors), dtype=bool, count=n_rows)
+                observe_request_phase('stream', 'validation', time.perf_counter() - validate_started)
+
+                caloric_needs = np.full(n_rows, np.nan)
+                status = 'error'
+                if valid.any():
+                    scored = columns if valid.all() else {name: values[valid] for name, values in columns.items()}
+                    try:
+                        result = await score_frame(scored)
+                        if valid.all():
+                            caloric_needs = result['predictions']
+                        else:
+                            caloric_needs[valid] = result['predictions']
+                        status = result['status']
+                    except Exception as e:
+                        # Status and headers are already sent; report the failure per row
+                        logger.error(f"Arrow stream chunk of {int(valid.sum())} rows failed: {e}")
+                        detail = getattr(e, 'detail', None) or str(e)
+                        errors[valid] = detail
+
+                serialize_started = time.perf_counter()
+                message = arrow_message(result_batch(caloric_needs, status, errors))
+                observe_request_phase('stream', 'serialization', time.perf_counter() - serialize_started)
+                yield message
+        yield ARROW_EOS
+    finally:
+        if source is not None:
+            source.close()
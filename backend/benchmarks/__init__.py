@@ -0,0 +1,4 @@
+"""Offline latency benchmarks with a stored baseline (``python -m backend.benchmarks``)."""
+from .suite import GROUPS, compare, measure, run_suite
+
+__all__ = ['GROUPS', 'compare', 'measure', 'run_suite']
@@ -0,0 +1,68 @@
+"""
+Run the benchmark suite and check it against the stored baseline.
+
+    python -m backend.benchmarks --update-baseline   # record this host's baseline first
+    python -m backend.benchmarks                     # full run, fail on regression
+    python -m backend.benchmarks --quick --group api --output report.json
+
+Exits 1 when a benchmark's p50 or p95 latency is more than ``--tolerance``
+(default ``BENCH_TOLERANCE`` or 0.5, i.e. 50%) above the baseline.
+Baselines are machine specific: record them on the host that runs the check.
+None is checked in (``baseline.json`` is git-ignored); without one the run
+only reports.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+from .suite import GROUPS, compare, run_suite
+
+DEFAULT_BASELINE = Path(__file__).parent / 'baseline.json'
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m backend.benchmarks', description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--quick', action='store_true', help='Small sizes and few iterations (smoke test)')
+    parser.add_argument('--group', action='append', choices=GROUPS, help='Only run this group (repeatable)')
+    parser.add_argument('--output', type=Path, help='Write the JSON report here')
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE, help='Baseline report to compare against')
+    parser.add_argument('--update-baseline', action='store_true', help='Save this run as the baseline instead of checking')
+    parser.add_argument('--tolerance', type=float, default=float(os.getenv('BENCH_TOLERANCE', '0.5')),
+                        help='Allowed slowdown before failing (0.5 = 50%%)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    # Per-request INFO logs from the app would dominate the timings
+    logging.getLogger('backend.api').setLevel(logging.WARNING)
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+
+    report = run_suite(quick=args.quick, groups=args.group)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + '\n')
+
+    if args.update_baseline:
+        if args.quick:
+            parser.error('refusing to record a --quick run as the baseline')
+        args.baseline.write_text(json.dumps(report, indent=2) + '\n')
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one", file=sys.stderr)
+        return 0
+
+    regressions = compare(report, json.loads(args.baseline.read_text()), tolerance=args.tolerance)
+    for r in regressions:
+        print(f"REGRESSION {r['name']} {r['metric']}: {r['current']:.3f} ms vs baseline {r['baseline']:.3f} ms "
+              f"({r['ratio']:.2f}x)", file=sys.stderr)
+    if regressions:
+        return 1
+    print(f"{len(report['results'])} benchmarks within {args.tolerance:.0%} of the baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,365 @@
+"""
+Latency benchmarks for the ModelLoader and the API.
+
+Everything runs offline against synthetic fixtures written to a temporary
+directory: a dummy model with the real feature columns, random embeddings
+and a generated food catalogue. HTTP benchmarks go through the FastAPI app
+in-process over an httpx ASGI transport, so routing, validation, the metrics
+middleware and serialization are included but no sockets are opened.
+"""
+import gc
+import time
+import asyncio
+import logging
+import platform
+import tempfile
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import psutil
+
+logger = logging.getLogger(__name__)
+
+FEATURES = [
+    "Energy_kcal_per_serving", "Protein_g_per_serving", "Fat_g_per_serving",
+    "Carbohydrates_g_per_serving", "Fiber_g_per_serving", "Calcium_mg_per_serving",
+    "Iron_mg_per_serving", "Zinc_mg_per_serving", "VitaminA_ug_per_serving",
+    "VitaminC_mg_per_serving", "Potassium_mg_per_serving", "Magnesium_mg_per_serving",
+    "region_encoded", "condition_encoded", "age_group_encoded", "season_encoded",
+    "portion_size_g", "estimated_cost_ugx",
+]
+
+# Sizes and iteration counts: full runs for the baseline, quick runs for smoke tests
+FULL = {
+    'iterations': 300,
+    'batch_rows': 256,
+    'large_batch_rows': 5_000,
+    'api_batch_rows': 100,
+    'embedding_sizes': (1_000, 10_000, 100_000),
+    'catalogue_sizes': (500, 5_000, 50_000),
+}
+QUICK = {
+    'iterations': 20,
+    'batch_rows': 32,
+    'large_batch_rows': 500,
+    'api_batch_rows': 10,
+    'embedding_sizes': (1_000,),
+    'catalogue_sizes': (500,),
+}
+
+EMBEDDING_DIM = 64
+
+FOODS_HEADER = (
+    "food_id,food_name_english,food_category,energy_kcal_per_100g,protein_g_per_100g,"
+    "fat_g_per_100g,carbohydrate_g_per_100g,fiber_g_per_100g,calcium_mg_per_100g,"
+    "iron_mg_per_100g,avg_market_price_ugx_per_kg,availability_score,region,zinc_mg_per_100g,"
+    "vitamin_a_mcg_per_100g,vitamin_c_mg_per_100g,potassium_mg_per_100g,sodium_mg_per_100g,seasonality\n"
+)
+
+
+class DummyModel:
+    """Constant-output stand-in with the real feature columns (same shape as the tests' models)."""
+
+    def __init__(self, value: float = 1800.0):
+        self.value = value
+        self.feature_names_in_ = np.array(FEATURES)
+        self.n_features_in_ = len(FEATURES)
+
+    def predict(self, X):
+        return np.full(len(X), self.value)
+
+
+def sample_input(i: int = 0) -> Dict:
+    row = {name: 1.0 for name in FEATURES}
+    row['Energy_kcal_per_serving'] = 200.0 + i % 300
+    return row
+
+
+def measure(name: str, fn: Callable[[], object], rows: int = 1, iterations: int = 300,
+            warmup: Optional[int] = None) -> Dict:
+    """
+    Time ``iterations`` calls of ``fn`` and summarize them.
+
+    Latencies are per call in milliseconds; ``rows_per_second`` counts ``rows``
+    per call. ``peak_alloc_mb`` is the Python-heap high-water mark of one extra
+    call traced with tracemalloc (NumPy buffers included), kept out of the
+    timed loop because tracing slows allocation down.
+    """
+    for _ in range(warmup if warmup is not None else max(3, iterations // 10)):
+        fn()
+    gc.collect()
+    samples = np.empty(iterations)
+    for i in range(iterations):
+        started = time.perf_counter()
+        fn()
+        samples[i] = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        'name': name,
+        'rows': rows,
+        'iterations': iterations,
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'mean_ms': round(float(samples.mean() * 1000), 4),
+        'rows_per_second': round(rows * iterations / float(samples.sum()), 1),
+        'peak_alloc_mb': round(peak / 2**20, 3),
+    }
+
+
+@contextmanager
+def _offline_loader(model_dir: Path):
+    """A ModelLoader over ``model_dir`` with the Hugging Face loader disabled."""
+    import pickle
+    import backend.api.models.loader as loader_mod
+    from backend.api.services import observe_predictions
+
+    with open(model_dir / "xgboost_nutrition_model_20251103.pkl", "wb") as f:
+        pickle.dump(DummyModel(), f)
+
+    hf_available = loader_mod.HF_AVAILABLE
+    loader_mod.HF_AVAILABLE = False
+    try:
+        loader = loader_mod.ModelLoader(local_model_dir=model_dir)
+        # As in production: metrics on, no result cache (every call runs the model)
+        loader.metrics_observer = observe_predictions
+        yield loader
+    finally:
+        loader_mod.HF_AVAILABLE = hf_available
+
+
+def _write_catalogue(path: Path, size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    # Separate stream for the micronutrients, so the other columns stay as they were
+    micro_rng = np.random.default_rng(seed + 1)
+    categories = ('Staples', 'Proteins', 'Vegetables', 'Fruits', 'Dairy')
+    regions = ('Central', 'Western', 'Eastern', 'Northern', 'National')
+    seasons = ('Year-round', 'Dry season', 'Rainy season', 'Harvest season')
+    lines = [FOODS_HEADER]
+    for i in range(size):
+        values = rng.uniform(0, 100, 7)
+        micro = micro_rng.uniform(0, 100, 5)
+        lines.append(
+            f"UG{i},Food {i},{categories[i % 5]},{values[0] * 5:.1f},{values[1] / 3:.2f},{values[2] / 4:.2f},"
+            f"{values[3] / 2:.2f},{values[4] / 8:.2f},{values[5] * 2:.1f},{values[6] / 10:.2f},"
+            f"{1000 + i % 9000},{(i % 10) / 10:.1f},{regions[i % 5]},{micro[0] / 20:.2f},{micro[1] * 6:.1f},"
+            f"{micro[2] * 0.8:.1f},{micro[3] * 8:.1f},{micro[4]:.1f},{seasons[i // 10 % 4]}\n"
+        )
+    path.write_text("".join(lines))
+
+
+def loader_benchmarks(loader, config: Dict) -> Iterator[Dict]:
+    row = sample_input()
+    yield measure('loader.predict[single]', lambda: loader.predict(row), iterations=config['iterations'] * 3)
+
+    batch = [sample_input(i) for i in range(config['batch_rows'])]
+    yield measure(
+        f"loader.predict_batch[{config['batch_rows']}]",
+        lambda: loader.predict_batch(batch),
+        rows=len(batch), iterations=config['iterations']
+    )
+
+    # Bulk scoring with the result cache on: rows are never repeated within
+    # the run, so this should cost what an uncached batch of the same size does
+    from backend.api.services import PredictionCache
+    rows = config['large_batch_rows']
+    batches = [
+        [{**sample_input(i), 'estimated_cost_ugx': float(i)} for i in range(b * rows, (b + 1) * rows)]
+        for b in range(4)
+    ]
+    counter = iter(range(10 ** 9))
+    loader.prediction_cache = PredictionCache(max_entries=4096, ttl_s=3600, sqlite_path='')
+    try:
+        yield measure(
+            f"loader.predict_batch_cached[{rows}]",
+            lambda: loader.predict_batch(batches[next(counter) % len(batches)]),
+            rows=rows, iterations=max(10, config['iterations'] // 10)
+        )
+    finally:
+        loader.prediction_cache = None
+
+
+def recommend_benchmarks(loader, work_dir: Path, config: Dict) -> Iterator[Dict]:
+    rng = np.random.default_rng(0)
+    for size in config['embedding_sizes']:
+        path = work_dir / f"embeddings_{size}.npy"
+        np.save(path, rng.normal(size=(size, EMBEDDING_DIM)).astype(np.float32))
+        loader.models['ensemble'] = loader._ensemble_entry(path)
+        queries = rng.normal(size=(64, EMBEDDING_DIM))
+        counter = iter(range(10 ** 9))
+        yield measure(
+            f"loader.recommend_foods[{size // 1000}k]",
+            lambda: loader.recommend_foods(query_vector=queries[next(counter) % len(queries)], top_k=10),
+            iterations=config['iterations']
+        )
+    loader.models.pop('ensemble', None)
+
+
+def api_benchmarks(loader, work_dir: Path, config: Dict) -> Iterator[Dict]:
+    import httpx
+    from backend.api.main import app
+    from backend.api.routers import foods, predict
+    from backend.api.services import FoodCatalogue, MealPlanner
+
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+    previous_loader, previous_catalogue = predict.model_loader, foods.food_catalogue
+    previous_planner = predict.meal_planner
+    predict.set_model_loader(loader)
+
+    def request(method: str, url: str, **kwargs):
+        def call():
+            response = loop.run_until_complete(client.request(method, url, **kwargs))
+            if response.status_code != 200:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}: {response.text[:200]}")
+        return call
+
+    try:
+        yield measure('api.predict[single]', request('POST', '/predict/', json=sample_input()),
+                      iterations=config['iterations'])
+        body = {'inputs': [sample_input(i) for i in range(config['api_batch_rows'])]}
+        yield measure(f"api.predict_batch[{config['api_batch_rows']}]", request('POST', '/predict/batch', json=body),
+                      rows=config['api_batch_rows'], iterations=config['iterations'])
+        columns = {name: [row[name] for row in body['inputs']] for name in FEATURES}
+        yield measure(f"api.predict_batch_columnar[{config['api_batch_rows']}]",
+                      request('POST', '/predict/batch/columnar', json=columns),
+                      rows=config['api_batch_rows'], iterations=config['iterations'])
+
+        for size in config['catalogue_sizes']:
+            path = work_dir / f"foods_{size}.csv"
+            _write_catalogue(path, size)
+            foods.food_catalogue = FoodCatalogue(candidates=[path])
+            foods.food_catalogue.get()
+            predict.meal_planner = MealPlanner()
+            # Vary the filter so most requests miss the encoded-response cache
+            thresholds = iter(range(10 ** 9))
+
+            def filtered():
+                request('GET', '/foods/local', params={
+                    'category': 'proteins', 'min_energy': next(thresholds) % 400, 'sort': '-protein', 'limit': 50
+                })()
+
+            yield measure(f"api.foods_local[{size}]", filtered, iterations=config['iterations'])
+
+            # A new portion size per request: every sweep runs the model
+            portions = iter(range(10 ** 9))
+
+            def sweep():
+                request('POST', '/predict/catalogue', json={
+                    'region_encoded': 0, 'condition_encoded': 1, 'age_group_encoded': 1, 'season_encoded': 0,
+                    'portion_size_g': 100 + next(portions) % 300, 'limit': 50
+                })()
+
+            yield measure(f"api.predict_catalogue[{size}]", sweep, rows=size, iterations=config['iterations'])
+
+            # A new energy target per request: every plan is solved
+            targets = iter(range(10 ** 9))
+
+            def meal_plan():
+                request('POST', '/predict/meal-plan', json={
+                    'region_encoded': 0, 'condition_encoded': 2, 'season_encoded': 1,
+                    'caloric_needs': 1500 + next(targets) % 1000
+                })()
+
+            yield measure(f"api.meal_plan[{size}]", meal_plan, iterations=config['iterations'])
+
+            # The same plans in whole 50 g portions: an LP, then a MILP near its foods
+            def meal_plan_portions():
+                request('POST', '/predict/meal-plan', json={
+                    'region_encoded': 0, 'condition_encoded': 2, 'season_encoded': 1,
+                    'caloric_needs': 1500 + next(targets) % 1000, 'portion_step_g': 50
+                })()
+
+            yield measure(f"api.meal_plan_portions[{size}]", meal_plan_portions, iterations=config['iterations'])
+    finally:
+        predict.set_model_loader(previous_loader)
+        foods.food_catalogue = previous_catalogue
+        predict.meal_planner = previous_planner
+        loop.run_until_complete(client.aclose())
+        loop.close()
+
+
+GROUPS = ('loader', 'recommend', 'api')
+
+
+def run_suite(quick: bool = False, groups: Optional[Sequence[str]] = None) -> Dict:
+    """
+    Run the benchmarks and return a report: environment details plus one
+    result per benchmark under ``results`` (keyed by name).
+
+    ``groups`` limits the run to some of ``GROUPS``; ``quick`` uses small
+    sizes and few iterations (for smoke tests, not for baselines).
+    """
+    config = QUICK if quick else FULL
+    groups = set(groups or GROUPS)
+    unknown = groups - set(GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown benchmark groups: {sorted(unknown)}")
+
+    results: List[Dict] = []
+    with tempfile.TemporaryDirectory(prefix='mzee-bench-') as tmp:
+        work_dir = Path(tmp)
+        (work_dir / 'models').mkdir()
+        with _offline_loader(work_dir / 'models') as loader:
+            runners = {
+                'loader': lambda: loader_benchmarks(loader, config),
+                'recommend': lambda: recommend_benchmarks(loader, work_dir, config),
+                'api': lambda: api_benchmarks(loader, work_dir, config),
+            }
+            for group in GROUPS:
+                if group not in groups:
+                    continue
+                for result in runners[group]():
+                    logger.info(
+                        f"{result['name']}: p50 {result['p50_ms']:.3f} ms, p95 {result['p95_ms']:.3f} ms, "
+                        f"{result['rows_per_second']:,.0f} rows/s"
+                    )
+                    results.append(result)
+
+    return {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'quick': quick,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': psutil.cpu_count(),
+        'peak_rss_mb': round(psutil.Process().memory_info().rss / 2**20, 1),
+        'results': {result['name']: result for result in results},
+    }
+
+
+def compare(report: Dict, baseline: Dict, tolerance: float = 0.5,
+            metrics: Sequence[str] = ('p50_ms', 'p95_ms')) -> List[Dict]:
+    """
+    Return the regressions of ``report`` against ``baseline``.
+
+    A benchmark regresses when a latency metric exceeds the baseline by more
+    than ``tolerance`` (0.5 = 50% slower). Benchmarks missing from either
+    side are skipped.
+    """
+    regressions = []
+    for name, result in report['results'].items():
+        reference = baseline.get('results', {}).get(name)
+        if reference is None:
+            continue
+        for metric in metrics:
+            if reference.get(metric) and result[metric] > reference[metric] * (1 + tolerance):
+                regressions.append({
+                    'name': name,
+                    'metric': metric,
+                    'baseline': reference[metric],
+                    'current': result[metric],
+                    'ratio': round(result[metric] / reference[metric], 2),
+                })
+    return regressions
@@ -0,0 +1,30 @@
+"""
+gunicorn settings for running the API as a pool of uvicorn workers.
+
+    PROMETHEUS_MULTIPROC_DIR=/tmp/prometheus-metrics gunicorn -c docker/gunicorn.conf.py api.main:app
+
+Workers share ``PROMETHEUS_MULTIPROC_DIR`` so ``/metrics`` reports the whole
+pool; it is emptied when the master starts and each exiting worker's live
+gauges are removed.
+"""
+import os
+import shutil
+
+from prometheus_client import multiprocess
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+
+def on_starting(server):
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    directory = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        multiprocess.mark_process_dead(worker.pid, directory)
@@ -0,0 +1,323 @@
+"""
+Offline batch scoring for survey files.
+
+Reads Parquet or CSV in fixed-size chunks with pyarrow, scores each chunk
+with the same ModelLoader the API uses (one loader per worker process) and
+writes a Parquet dataset: one ``part-NNNNN.parquet`` per chunk holding the
+input columns plus ``prediction``, ``error``, ``model_key`` and
+``model_version``. Rows with an empty or out-of-range feature (the API's
+NutritionInput bounds) are not scored: their ``prediction`` is null and
+``error`` names the first failing field. An input without a column the
+model needs is rejected before anything is written.
+
+The model is resolved once (``--model auto`` picks it from the models
+loaded in the parent) and every worker scores with that same model.
+
+Parts are written atomically and recorded against a manifest of the input
+file, so an interrupted run picks up where it stopped when re-run with the
+same arguments.
+
+Usage::
+
+    python -m backend.score survey.parquet scored/ --workers 4
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import numpy as np
+import psutil
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from .api.models.loader import FEATURE_COLUMN_LOOKUP, ModelLoader
+from .api.models.schemas import row_errors
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    threadpool_limits = None
+    THREADPOOLCTL_AVAILABLE = False
+
+logger = logging.getLogger("backend.score")
+
+MANIFEST_NAME = '_scoring.json'
+PART_TEMPLATE = 'part-{:05d}.parquet'
+
+# Loader of the current worker process, created by _init_worker
+_worker_loader: Optional[ModelLoader] = None
+
+
+def iter_chunks(path: Path, chunk_rows: int) -> Iterator[pa.Table]:
+    """
+    Yield tables of exactly ``chunk_rows`` rows (the last may be shorter).
+
+    Boundaries depend only on the file and ``chunk_rows``, never on how
+    pyarrow happens to split row groups or CSV blocks, so part N of a resumed
+    run always covers the same rows.
+    """
+    if path.suffix.lower() in ('.parquet', '.pq'):
+        batches = pq.ParquetFile(path).iter_batches(batch_size=chunk_rows)
+    else:
+        batches = pa_csv.open_csv(path)
+
+    pending = []
+    pending_rows = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_rows:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, chunk_rows)
+            rest = table.slice(chunk_rows)
+            pending = rest.to_batches()
+            pending_rows = rest.num_rows
+    if pending_rows:
+        yield pa.Table.from_batches(pending)
+
+
+def input_columns(path: Path) -> list:
+    """Column names of a Parquet or CSV input, read from its schema (or the first CSV block)."""
+    if path.suffix.lower() in ('.parquet', '.pq'):
+        return pq.ParquetFile(path).schema_arrow.names
+    return pa_csv.open_csv(path).schema.names
+
+
+def resolve_model(loader: ModelLoader, model_preference: str) -> str:
+    """The concrete model key ``model_preference`` scores with; SystemExit when none is available."""
+    model_key, error = loader._resolve_model_key(model_preference)
+    if error is not None:
+        raise SystemExit(error)
+    if model_key is None:
+        raise SystemExit("No trained model available")
+    return model_key
+
+
+def _init_worker(model_dir: Optional[str], threads: int):
+    global _worker_loader
+    # Keep each worker's model to its share of the CPU budget. The native
+    # thread pools already exist once numpy and the model libraries are
+    # imported, so OMP_NUM_THREADS would come too late here.
+    if THREADPOOLCTL_AVAILABLE:
+        threadpool_limits(limits=threads)
+    # Workers only score the model pinned by run(), which loads on first use
+    _worker_loader = ModelLoader(local_model_dir=model_dir, lazy=True)
+
+
+def _score_part(index: int, table: pa.Table, part_path: str, model_key: str) -> Dict:
+    """Score one chunk and write its part file; runs in a worker process."""
+    columns = {
+        FEATURE_COLUMN_LOOKUP[name.lower()]: table.column(name).cast(pa.float64()).to_numpy(zero_copy_only=False)
+        for name in table.column_names
+        if name.lower() in FEATURE_COLUMN_LOOKUP
+    }
+    n = table.num_rows
+    # Nulls arrive as NaN and fail the bounds like out-of-range values
+    errors = row_errors(columns, n)
+    valid = np.fromiter((error is None for error in errors), dtype=bool, count=n)
+    scored = columns if valid.all() else {name: values[valid] for name, values in columns.items()}
+    result = _worker_loader.predict_frame(scored, model_key)
+
+    predictions = np.full(n, np.nan)
+    predictions[valid] = result['predictions']
+    table = table.append_column('prediction', pa.array(predictions, type=pa.float64(), mask=~valid))
+    table = table.append_column('error', pa.array(errors, type=pa.string()))
+    table = table.append_column('model_key', pa.array([result['model']] * n, type=pa.string()).dictionary_encode())
+    table = table.append_column('model_version', pa.array([result['version']] * n, type=pa.string()).dictionary_encode())
+
+    tmp_path = f"{part_path}.{os.getpid()}.tmp"
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, part_path)
+    return {
+        'index': index,
+        'rows': n,
+        'invalid_rows': int(n - valid.sum()),
+        'model': result['model'],
+        'version': result['version'],
+        'worker_rss': psutil.Process().memory_info().rss,
+    }
+
+
+def _fingerprint(path: Path) -> Dict:
+    stat = path.stat()
+    return {'path': str(path.resolve()), 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def prepare_output(output: Path, manifest: Dict, overwrite: bool) -> set:
+    """Create ``output`` and return the chunk indexes already scored by a matching earlier run."""
+    manifest_path = output / MANIFEST_NAME
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+        same_run = all(previous.get(key) == manifest[key] for key in ('input', 'chunk_rows', 'model'))
+        if same_run and not overwrite:
+            done = {
+                int(part.stem.split('-')[1])
+                for part in output.glob('part-*.parquet')
+            }
+            return done
+        if not same_run and not overwrite:
+            raise SystemExit(
+                f"{output} holds results for a different input or settings; pass --overwrite to replace them"
+            )
+        shutil.rmtree(output)
+    elif output.exists() and any(output.iterdir()):
+        raise SystemExit(f"{output} exists and is not a scoring output directory")
+
+    output.mkdir(parents=True, exist_ok=True)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return set()
+
+
+def _tree_rss(process: psutil.Process) -> int:
+    """Resident memory of ``process`` and all of its children."""
+    total = process.memory_info().rss
+    for child in process.children(recursive=True):
+        try:
+            total += child.memory_info().rss
+        except psutil.Error:
+            pass
+    return total
+
+
+def run(
+    input_path: Path,
+    output: Path,
+    model_preference: str = 'auto',
+    workers: int = 1,
+    chunk_rows: int = 50000,
+    model_dir: Optional[str] = None,
+    overwrite: bool = False
+) -> Dict:
+    """Score ``input_path`` into the ``output`` dataset directory and return run statistics."""
+    global _worker_loader
+    loader = ModelLoader(local_model_dir=model_dir)
+    model_key = resolve_model(loader, model_preference)
+    fields = {FEATURE_COLUMN_LOOKUP.get(name.lower()) for name in input_columns(input_path)}
+    missing = [field for field in loader.models[model_key]['feature_plan'] if field not in fields]
+    if missing:
+        raise SystemExit(f"{input_path} is missing feature columns needed by {model_key}: {missing}")
+    logger.info(f"Scoring with {model_key} ({loader.models[model_key].get('version')})")
+
+    manifest = {
+        'input': _fingerprint(input_path),
+        'chunk_rows': chunk_rows,
+        'model': model_preference,
+    }
+    done = prepare_output(output, manifest, overwrite)
+    if done:
+        logger.info(f"Resuming: {len(done)} chunks already scored")
+
+    me = psutil.Process()
+    peak_rss = _tree_rss(me)
+    worker_peak = 0
+    rows = skipped_rows = invalid_rows = 0
+    models = set()
+    started = time.perf_counter()
+
+    def record(stats: Dict):
+        nonlocal rows, invalid_rows, worker_peak, peak_rss
+        rows += stats['rows']
+        invalid_rows += stats['invalid_rows']
+        worker_peak = max(worker_peak, stats['worker_rss'])
+        peak_rss = max(peak_rss, _tree_rss(me))
+        models.add((stats['model'], stats['version']))
+        elapsed = time.perf_counter() - started
+        logger.info(f"part {stats['index']:05d}: {stats['rows']} rows ({rows / elapsed:,.0f} rows/s)")
+
+    chunks = iter_chunks(input_path, chunk_rows)
+    if workers <= 1:
+        _worker_loader = loader
+        for index, table in enumerate(chunks):
+            if index in done:
+                skipped_rows += table.num_rows
+                continue
+            record(_score_part(index, table, str(output / PART_TEMPLATE.format(index)), model_key))
+    else:
+        # The workers load their own copy of the model
+        del loader
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model_dir, 1)) as pool:
+            in_flight = set()
+            for index, table in enumerate(chunks):
+                if index in done:
+                    skipped_rows += table.num_rows
+                    continue
+                # Bound the chunks held in memory to two per worker
+                if len(in_flight) >= 2 * workers:
+                    finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        record(future.result())
+                in_flight.add(pool.submit(
+                    _score_part, index, table, str(output / PART_TEMPLATE.format(index)), model_key
+                ))
+                peak_rss = max(peak_rss, _tree_rss(me))
+            for future in wait(in_flight).done:
+                record(future.result())
+
+    elapsed = time.perf_counter() - started
+    stats = {
+        'rows': rows,
+        'skipped_rows': skipped_rows,
+        'invalid_rows': invalid_rows,
+        'seconds': round(elapsed, 3),
+        'rows_per_second': round(rows / elapsed, 1) if elapsed > 0 else None,
+        'peak_rss_mb': round(peak_rss / 2**20, 1),
+        'worker_peak_rss_mb': round(worker_peak / 2**20, 1),
+        'models': sorted(f"{key}@{version}" for key, version in models),
+    }
+    manifest.update(complete=True, rows=rows + skipped_rows)
+    with open(output / MANIFEST_NAME, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m backend.score',
+        description='Score a Parquet or CSV file of NutritionInput rows into a Parquet dataset.'
+    )
+    parser.add_argument('input', type=Path, help='Input .parquet or .csv file')
+    parser.add_argument('output', type=Path, help='Output directory (Parquet dataset of part files)')
+    parser.add_argument('--model', default='auto',
+                        help="Model to use: 'auto', 'huggingface', 'local_xgboost' or 'offline' (default: auto)")
+    parser.add_argument('--workers', type=int, default=int(os.getenv('SCORE_WORKERS', min(4, os.cpu_count() or 1))),
+                        help='Worker processes (default: SCORE_WORKERS or min(4, CPUs))')
+    parser.add_argument('--chunk-rows', type=int, default=50000, help='Rows per chunk and part file')
+    parser.add_argument('--model-dir', default=None, help='Model directory (default: backend/models)')
+    parser.add_argument('--overwrite', action='store_true', help='Discard existing results instead of resuming')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if args.chunk_rows < 1:
+        parser.error('--chunk-rows must be positive')
+
+    stats = run(
+        args.input, args.output,
+        model_preference=args.model,
+        workers=args.workers,
+        chunk_rows=args.chunk_rows,
+        model_dir=args.model_dir,
+        overwrite=args.overwrite
+    )
+    print(
+        f"Scored {stats['rows']:,} rows ({stats['skipped_rows']:,} resumed, {stats['invalid_rows']:,} invalid) "
+        f"in {stats['seconds']:.1f}s: "
+        f"{stats['rows_per_second'] or 0:,.0f} rows/s, peak RSS {stats['peak_rss_mb']:.0f} MB "
+        f"(largest worker {stats['worker_peak_rss_mb']:.0f} MB), models {', '.join(stats['models']) or '-'}",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import pickle
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+FEATURES = [
+    "Energy_kcal_per_serving", "Protein_g_per_serving", "Fat_g_per_serving",
+    "Carbohydrates_g_per_serving", "Fiber_g_per_serving", "Calcium_mg_per_serving",
+    "Iron_mg_per_serving", "Zinc_mg_per_serving", "VitaminA_ug_per_serving",
+    "VitaminC_mg_per_serving", "Potassium_mg_per_serving", "Magnesium_mg_per_serving",
+    "region_encoded", "condition_encoded", "age_group_encoded", "season_encoded",
+    "portion_size_g", "estimated_cost_ugx",
+]
+
+MODEL_FILE = "xgboost_nutrition_model_20251103.pkl"
+
+
+class FakeModel:
+    """
+    Picklable stand-in for a trained model predicting ``base + sum(weight * row[i])``
+    over ``weights = {feature index: weight}``. ``calls`` records the row count
+    of every ``predict`` call.
+    """
+
+    def __init__(self, base=1000.0, weights=None, cols=FEATURES):
+        self.base = base
+        self.weights = {0: 1.0} if weights is None else weights
+        self.feature_names_in_ = cols
+        self.calls = []
+
+    def predict(self, X):
+        X = np.asarray(X, dtype=float)
+        self.calls.append(len(X))
+        out = np.full(len(X), float(self.base))
+        for i, weight in self.weights.items():
+            out += weight * X[:, i]
+        return out
+
+
+def sample(energy=1, **values):
+    """A valid NutritionInput row: every feature 1 except those given."""
+    row = {k: 1 for k in FEATURES}
+    row["Energy_kcal_per_serving"] = energy
+    row.update(values)
+    return row
+
+
+def write_model(directory, model, name=MODEL_FILE):
+    with open(directory / name, "wb") as f:
+        pickle.dump(model, f)
+
+
+@pytest.fixture
+def model(request):
+    """
+    The FakeModel saved for the loader; defaults to ``1000 + energy``.
+    Parametrize indirectly with FakeModel keyword arguments, or override the
+    fixture in a test module, to serve another one.
+    """
+    return FakeModel(**getattr(request, "param", {}))
+
+
+@pytest.fixture
+def model_dir(tmp_path, monkeypatch, model):
+    """A local model directory holding ``model``, with the Hugging Face paths disabled."""
+    import backend.api.models.loader as loader_mod
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+    monkeypatch.delenv("HF_ARTIFACT_SOURCE_DIR", raising=False)
+
+    d = tmp_path / "models"
+    d.mkdir()
+    write_model(d, model)
+    return d
+
+
+@pytest.fixture
+def loader(model_dir):
+    from backend.api.models.loader import ModelLoader
+    return ModelLoader(local_model_dir=model_dir)
+
+
+@pytest.fixture
+def client(loader):
+    from backend.api.main import app
+    from backend.api.routers import predict
+    predict.set_model_loader(loader)
+    return TestClient(app)
+
+
+@pytest.fixture
+def small_stream_chunks(monkeypatch):
+    """Score streams two rows at a time, so a few input rows span several chunks."""
+    monkeypatch.setenv("PREDICT_STREAM_CHUNK_ROWS", "2")
@@ -135,3 +135,38 @@ def test_predict_missing_fields_returns_422(tmp_models_dir, monkeypatch):
     # Provide incomplete payload (missing many required fields)
     r = client.post('/predict/', json={'Energy_kcal_per_serving': 100})
     assert r.status_code == 422
+
+
+def test_lazy_loader_reports_states_and_loads_on_first_use(tmp_models_dir, monkeypatch):
+    import backend.api.models.loader as loader_mod
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+
+    loader = loader_mod.ModelLoader(local_model_dir=tmp_models_dir, lazy=True)
+    loader.start(load_on_first_use=True)
+    assert loader.load_state == {'local_xgboost': 'pending', 'offline': 'pending'}
+    assert loader.ready is False
+
+    from backend.api.main import app
+    from backend.api.routers import health as health_router
+    from backend.api.routers import predict as predict_router
+
+    health_router.set_model_loader(loader)
+    predict_router.set_model_loader(loader)
+    client = TestClient(app)
+
+    j = client.get('/health/').json()
+    assert j['ready'] is False
+    assert j['model_states']['local_xgboost'] == 'pending'
+
+    # First prediction loads the local models it needs
+    with open(tmp_models_dir / "xgboost_feature_names_20251103.pkl", "rb") as f:
+        inputs = make_sample_input(pickle.load(f))
+    r = client.post('/predict/', json=inputs)
+    assert r.status_code == 200
+    assert r.json()['status'] == 'local'
+
+    # Only the model that served the request was loaded
+    j = client.get('/health/').json()
+    assert j['ready'] is False
+    assert j['model_states'] == {'local_xgboost': 'ready', 'offline': 'pending'}
+    assert 'local_xgboost' in loader.load_seconds
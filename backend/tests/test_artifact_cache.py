@@ -0,0 +1,120 @@
+import json
+import os
+import pickle
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+
+class DummyModel:
+    def __init__(self, v):
+        self._v = v
+
+    def predict(self, X):
+        return [self._v] * len(X)
+
+
+REPO_ID = 'Shakiran/MzeeChakulaNutritionEnsembleModel'
+
+
+@pytest.fixture
+def hub_dir(tmp_path):
+    """A local directory standing in for the Hugging Face hub."""
+    repo = tmp_path / "hub" / REPO_ID
+    (repo / "data").mkdir(parents=True)
+    emb = np.eye(4)
+    with open(repo / "data" / "food_embeddings.json", "w") as f:
+        json.dump({f"food_{i}": vec.tolist() for i, vec in enumerate(emb)}, f)
+    with open(repo / "food_metadata.json", "w") as f:
+        json.dump({"food_0": {"name": "Matooke"}}, f)
+    with open(repo / "xgboost_nutrition_model.pkl", "wb") as f:
+        pickle.dump(DummyModel(1800.0), f)
+    (repo / "README.md").write_text("ensemble")
+    return tmp_path / "hub"
+
+
+def test_cache_resolves_roles_from_manifest(tmp_path, hub_dir):
+    from backend.api.models.artifact_cache import ArtifactCache
+
+    cache = ArtifactCache(tmp_path / "cache", source_dir=hub_dir)
+    roles = cache.resolve(REPO_ID)
+    assert set(roles) == {'embeddings', 'metadata', 'model'}
+
+    manifest = cache.read_manifest(REPO_ID)
+    assert manifest['roles']['embeddings'] == 'data/food_embeddings.json'
+    assert manifest['revision'].startswith('local-')
+    assert len(manifest['files']) == 4
+    for rel, entry in manifest['files'].items():
+        assert cache.blob_path(entry['sha256'], Path(rel).suffix).exists()
+
+    # With the source gone, the manifest alone resolves the same blobs
+    shutil.rmtree(hub_dir)
+    assert cache.resolve(REPO_ID) == roles
+
+    # A failed refresh keeps serving the cached revision
+    assert cache.resolve(REPO_ID, refresh=True) == roles
+
+
+def test_refresh_picks_up_new_revision(tmp_path, hub_dir):
+    from backend.api.models.artifact_cache import ArtifactCache
+
+    cache = ArtifactCache(tmp_path / "cache", source_dir=hub_dir)
+    cache.resolve(REPO_ID)
+    old = cache.read_manifest(REPO_ID)['revision']
+
+    (hub_dir / REPO_ID / "food_metadata.json").write_text('{"food_1": {"name": "Beans"}}')
+    assert cache.resolve(REPO_ID) and cache.read_manifest(REPO_ID)['revision'] == old
+
+    roles = cache.resolve(REPO_ID, refresh=True)
+    assert cache.read_manifest(REPO_ID)['revision'] != old
+    assert json.loads(roles['metadata'].read_text()) == {"food_1": {"name": "Beans"}}
+
+
+def test_loader_starts_offline_from_cache(tmp_path, hub_dir, monkeypatch):
+    import backend.api.models.artifact_cache as artifact_cache
+    import backend.api.models.loader as loader_mod
+
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+    monkeypatch.setenv("HF_ARTIFACT_SOURCE_DIR", str(hub_dir))
+
+    loader = loader_mod.ModelLoader(local_model_dir=models_dir)
+    assert loader.models['ensemble']['available'] is True
+    assert loader.models['ensemble']['metadata'] == {"food_0": {"name": "Matooke"}}
+    assert loader.models['huggingface']['available'] is True
+
+    # Restart without the source: no fetch and no snapshot walk
+    shutil.rmtree(hub_dir)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("snapshot fetched or walked again")
+
+    monkeypatch.setattr(loader_mod.ArtifactCache, "fetch", fail)
+    monkeypatch.setattr(Path, "rglob", fail)
+    # Versions come from the manifest's hashes, not from hashing the blobs again
+    monkeypatch.setattr(artifact_cache, "file_sha256", fail)
+    loader = loader_mod.ModelLoader(local_model_dir=models_dir)
+    assert loader.models['ensemble']['available'] is True
+    res = loader.recommend_foods(by_id='food_0', top_k=2)
+    assert len(res['items']) == 2
+    assert loader.models['huggingface']['available'] is True
+
+    manifest = loader.artifact_cache.read_manifest(REPO_ID)
+    sha = manifest['files'][manifest['roles']['model']]['sha256']
+    assert loader.models['huggingface']['version'].endswith('@' + sha[:12])
+
+
+def test_local_artifacts_are_tagged_by_size_and_mtime(tmp_path):
+    from backend.api.models.artifact_cache import artifact_tag
+
+    path = tmp_path / "xgboost_nutrition_model.pkl"
+    path.write_bytes(b"model")
+    tag = artifact_tag(path)
+    assert artifact_tag(path) == tag
+
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert artifact_tag(path) != tag
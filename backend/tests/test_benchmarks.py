@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def quick_report():
+    from backend.benchmarks import run_suite
+    return run_suite(quick=True)
+
+
+def test_quick_suite_reports_every_benchmark(quick_report):
+    results = quick_report['results']
+    assert set(results) == {
+        'loader.predict[single]', 'loader.predict_batch[32]', 'loader.predict_batch_cached[500]',
+        'loader.recommend_foods[1k]',
+        'api.predict[single]', 'api.predict_batch[10]', 'api.predict_batch_columnar[10]',
+        'api.foods_local[500]', 'api.predict_catalogue[500]', 'api.meal_plan[500]', 'api.meal_plan_portions[500]',
+    }
+    for result in results.values():
+        assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['rows_per_second'] > 0
+        assert result['peak_alloc_mb'] >= 0
+    assert results['api.predict_batch[10]']['rows'] == 10
+    assert quick_report['peak_rss_mb'] > 0
+
+
+def test_compare_flags_only_real_slowdowns(quick_report):
+    from backend.benchmarks import compare
+
+    name = 'loader.predict[single]'
+    current = quick_report['results'][name]
+    baseline = {'results': {
+        name: {**current, 'p50_ms': current['p50_ms'] / 3},
+        'api.removed[1]': {'p50_ms': 1.0, 'p95_ms': 1.0},
+    }}
+    regressions = compare(quick_report, baseline, tolerance=0.5, metrics=('p50_ms',))
+    assert [(r['name'], r['metric']) for r in regressions] == [(name, 'p50_ms')]
+    assert regressions[0]['ratio'] == pytest.approx(3, rel=0.01)
+
+    assert compare(quick_report, quick_report, tolerance=0.0) == []
+
+
+def test_cli_fails_on_regression(tmp_path, capsys):
+    from backend.benchmarks.__main__ import main
+
+    report_path = tmp_path / 'report.json'
+    baseline_path = tmp_path / 'baseline.json'
+    baseline_path.write_text(json.dumps({'results': {'loader.predict[single]': {'p50_ms': 1e-6, 'p95_ms': 1e-6}}}))
+
+    code = main(['--quick', '--group', 'loader', '--baseline', str(baseline_path), '--output', str(report_path)])
+    assert code == 1
+    assert 'REGRESSION loader.predict[single]' in capsys.readouterr().err
+    assert set(json.loads(report_path.read_text())['results']) == {
+        'loader.predict[single]', 'loader.predict_batch[32]', 'loader.predict_batch_cached[500]'
+    }
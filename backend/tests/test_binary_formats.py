@@ -0,0 +1,124 @@
+import json
+
+import msgpack
+import pyarrow as pa
+import pytest
+from conftest import FEATURES, sample
+
+ARROW = 'application/vnd.apache.arrow.stream'
+
+pytestmark = pytest.mark.usefixtures("small_stream_chunks")
+
+
+def arrow_body(*energy_batches, metadata=None):
+    schema = pa.schema([(name, pa.float64()) for name in FEATURES], metadata=metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for energies in energy_batches:
+            columns = {name: [1.0] * len(energies) for name in FEATURES}
+            columns["Energy_kcal_per_serving"] = energies
+            writer.write_batch(pa.record_batch([pa.array(columns[name], pa.float64()) for name in FEATURES],
+                                               schema=schema))
+    return sink.getvalue().to_pybytes()
+
+
+def test_batch_msgpack_round_trip_matches_json(client):
+    body = {'inputs': [sample(100), sample(200)]}
+    expected = client.post('/predict/batch', json=body).json()
+
+    r = client.post('/predict/batch', content=msgpack.packb(body),
+                    headers={'Content-Type': 'application/msgpack', 'Accept': 'application/msgpack'})
+    assert r.status_code == 200
+    assert r.headers['content-type'] == 'application/msgpack'
+    result = msgpack.unpackb(r.content)
+    assert result['total'] == 2
+    assert [p['prediction']['caloric_needs'] for p in result['predictions']] == \
+        [p['prediction']['caloric_needs'] for p in expected['predictions']] == [1100.0, 1200.0]
+
+    # Validation errors keep FastAPI's shape and locations
+    body['inputs'][1]['Energy_kcal_per_serving'] = 5000
+    for kwargs in ({'json': body}, {'content': msgpack.packb(body), 'headers': {'Content-Type': 'application/msgpack'}}):
+        r = client.post('/predict/batch', **kwargs)
+        assert r.status_code == 422
+        assert r.json()['detail'][0]['loc'] == ['body', 'inputs', 1, 'Energy_kcal_per_serving']
+
+    r = client.post('/predict/batch', content=b'\xc1', headers={'Content-Type': 'application/msgpack'})
+    assert r.status_code == 422
+    r = client.post('/predict/batch', content=b'x', headers={'Content-Type': 'text/plain'})
+    assert r.status_code == 415
+
+
+def test_batch_arrow_round_trip(client):
+    r = client.post('/predict/batch', content=arrow_body([100.0, 250.0], [0.0]),
+                    headers={'Content-Type': ARROW, 'Accept': ARROW})
+    assert r.status_code == 200
+    assert r.headers['content-type'] == ARROW
+    table = pa.ipc.open_stream(r.content).read_all()
+    assert table.column_names == ['caloric_needs', 'status', 'error']
+    assert table.column('caloric_needs').to_pylist() == [1100.0, 1250.0, 1000.0]
+    assert table.schema.metadata[b'model'] == b'local_xgboost'
+
+    # Arrow in, JSON out: the columnar endpoint's shape
+    r = client.post('/predict/batch', content=arrow_body([100.0]), headers={'Content-Type': ARROW})
+    assert r.json()['caloric_needs'] == [1100.0]
+    assert r.json()['model'] == 'local_xgboost'
+
+    # Row input, Arrow output
+    r = client.post('/predict/batch', json={'inputs': [sample(100)]}, headers={'Accept': ARROW})
+    assert pa.ipc.open_stream(r.content).read_all().to_pylist() == [
+        {'caloric_needs': 1100.0, 'status': 'local', 'error': None}
+    ]
+
+    r = client.post('/predict/batch', content=arrow_body([100.0, 3001.0]), headers={'Content-Type': ARROW})
+    assert r.status_code == 422
+    assert r.json()['detail'][0]['loc'] == ['body', 'Energy_kcal_per_serving', 1]
+
+
+def test_stream_arrow_scores_batches_and_flags_bad_rows(client):
+    r = client.post('/predict/stream', content=arrow_body([100.0, 200.0, 300.0], [-1.0, 400.0]),
+                    headers={'Content-Type': ARROW})
+    assert r.status_code == 200
+    assert r.headers['content-type'] == ARROW
+    reader = pa.ipc.open_stream(r.content)
+    batches = list(reader)
+    # PREDICT_STREAM_CHUNK_ROWS=2 slices the first input batch
+    assert [batch.num_rows for batch in batches] == [2, 1, 2]
+    rows = pa.Table.from_batches(batches).to_pylist()
+    assert [row['caloric_needs'] for row in rows] == [1100.0, 1200.0, 1300.0, None, 1400.0]
+    assert rows[3]['status'] == 'error'
+    assert rows[3]['error'].startswith('Energy_kcal_per_serving')
+
+    schema = pa.schema([('Energy_kcal_per_serving', pa.float64())])
+    sink = pa.BufferOutputStream()
+    pa.ipc.new_stream(sink, schema).close()
+    r = client.post('/predict/stream', content=sink.getvalue().to_pybytes(), headers={'Content-Type': ARROW})
+    assert r.status_code == 422
+    assert r.json()['detail'][0]['type'] == 'missing'
+
+
+def test_stream_msgpack_in_and_out(client):
+    body = b''.join(msgpack.packb(row) for row in (sample(100), {'Energy_kcal_per_serving': 5}, sample(300)))
+    r = client.post('/predict/stream', content=body, headers={'Content-Type': 'application/msgpack'})
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert [line.get('line') for line in lines[:3]] == [1, 2, 3]
+    assert lines[-1] == {'summary': {'total': 3, 'successful': 2, 'failed': 1}}
+
+    r = client.post('/predict/stream', content=body,
+                    headers={'Content-Type': 'application/msgpack', 'Accept': 'application/msgpack'})
+    assert r.headers['content-type'] == 'application/msgpack'
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(r.content)
+    lines = list(unpacker)
+    assert lines[0]['prediction']['caloric_needs'] == 1100.0
+    assert lines[-1]['summary']['failed'] == 1
+
+
+def test_negotiate_prefers_client_quality_then_server_order():
+    from backend.api.services.binary_formats import negotiate
+
+    offered = ('json', 'msgpack', 'arrow')
+    assert negotiate(None, offered) == 'json'
+    assert negotiate('*/*', offered) == 'json'
+    assert negotiate('application/json;q=0.5, application/msgpack', offered) == 'msgpack'
+    assert negotiate('application/*, application/json;q=0', offered) == 'msgpack'
+    assert negotiate('text/html', offered) is None
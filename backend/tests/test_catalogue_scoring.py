@@ -0,0 +1,103 @@
+import pytest
+from conftest import FEATURES, FakeModel
+
+CSV_HEADER = (
+    "food_id,food_name_english,food_category,energy_kcal_per_100g,protein_g_per_100g,"
+    "fat_g_per_100g,carbohydrate_g_per_100g,fiber_g_per_100g,calcium_mg_per_100g,"
+    "iron_mg_per_100g,zinc_mg_per_100g,vitamin_a_mcg_per_100g,vitamin_c_mg_per_100g,"
+    "potassium_mg_per_100g,avg_market_price_ugx_per_kg,availability_score,region\n"
+)
+
+
+@pytest.fixture
+def model():
+    # energy + 1000 * region, so the profile shows up in the score
+    return FakeModel(0.0, weights={0: 1.0, 12: 1000.0})
+
+
+PROFILE = {'region_encoded': 1, 'condition_encoded': 2, 'age_group_encoded': 0, 'season_encoded': 1}
+
+
+@pytest.fixture
+def foods_csv(tmp_path):
+    path = tmp_path / "food_composition_clean.csv"
+    path.write_text(CSV_HEADER + "".join([
+        "UG1,Matooke,Staples,89,1.2,0.3,23.4,2.6,5,0.6,0.1,1,12,350,1500,0.9,Central\n",
+        "UG2,Posho,Staples,360,9.4,3.9,74,7.3,7,2.7,2.2,11,0,287,2200,0.5,Western\n",
+        "UG3,Dodo,Vegetables,23,2.9,0.6,10,1.6,215,2.3,0.9,146,43,611,1200,0.3,National\n",
+        # 250 g of this would exceed the 200 g fat bound
+        "UG4,Ghee,Fats,876,0.3,99.5,0,0,4,0,0,840,0,5,20000,0.8,Western\n",
+    ]))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def food_catalogue(foods_csv, monkeypatch):
+    from backend.api.routers import foods
+    from backend.api.services import FoodCatalogue
+    monkeypatch.setattr(foods, "food_catalogue", FoodCatalogue(candidates=[foods_csv]))
+
+
+def test_serving_features_scale_per_100g_columns(foods_csv):
+    from backend.api.services import FoodCatalogue
+
+    catalogue = FoodCatalogue(candidates=[foods_csv]).get()
+    portions = catalogue.portions(200, {'Vegetables': 50})
+    assert portions.tolist() == [200, 200, 50, 200]
+
+    columns = catalogue.serving_features(portions, PROFILE)
+    assert set(columns) == set(FEATURES)
+    assert columns['Energy_kcal_per_serving'].tolist() == [178, 720, 11.5, 1752]
+    assert columns['VitaminA_ug_per_serving'][2] == 73
+    assert columns['estimated_cost_ugx'].tolist() == [300, 440, 60, 4000]
+    # No magnesium column in the dataset
+    assert columns['Magnesium_mg_per_serving'].tolist() == [0, 0, 0, 0]
+    assert columns['region_encoded'].tolist() == [1, 1, 1, 1]
+
+
+def test_catalogue_is_scored_in_one_call_and_ranked(client, loader):
+    model = loader.models['local_xgboost']['model']
+    r = client.post('/predict/catalogue', json=PROFILE)
+    assert r.status_code == 200
+    body = r.json()
+    assert len(model.calls) == 1
+    assert body['model'] == 'local_xgboost'
+    assert body['total'] == 3
+    assert body['skipped'] == 1
+    assert [food['name'] for food in body['foods']] == ['Posho', 'Matooke', 'Dodo']
+    assert body['foods'][0] == {
+        'rank': 1, 'id': 'food_1', 'name': 'Posho', 'category': 'staples', 'region': 'western',
+        'portion_size_g': 250.0, 'estimated_cost_ugx': 550.0, 'caloric_needs': 1900.0,
+    }
+
+    # Same profile, other filters: ranked from the cached scores
+    r = client.post('/predict/catalogue', json={**PROFILE, 'local_only': True, 'ascending': True, 'limit': 1})
+    assert [food['name'] for food in r.json()['foods']] == ['Dodo']
+    assert r.json()['total'] == 2
+    assert len(model.calls) == 1
+
+    # Smaller fat portions bring the ghee into range
+    r = client.post('/predict/catalogue', json={**PROFILE, 'category_portions_g': {'fats': 10}, 'category': 'fats'})
+    assert r.json()['foods'][0]['caloric_needs'] == pytest.approx(1087.6)
+    assert r.json()['skipped'] == 0
+    assert len(model.calls) == 2
+
+    r = client.post('/predict/catalogue', json={**PROFILE, 'region_encoded': 0, 'limit': 1})
+    assert r.json()['foods'][0]['caloric_needs'] == 900.0
+    assert len(model.calls) == 3
+
+
+def test_catalogue_scores_follow_model_reloads(client, loader):
+    first = client.post('/predict/catalogue', json=PROFILE)
+    assert client.post('/predict/catalogue', json=PROFILE,
+                       headers={'If-None-Match': first.headers['etag']}).status_code == 304
+
+    loader.reload_model('local_xgboost')
+    model = loader.models['local_xgboost']['model']
+    calls = len(model.calls)  # the reload validates the new model once
+    r = client.post('/predict/catalogue', json=PROFILE)
+    assert r.status_code == 200
+    assert len(model.calls) == calls + 1
+
+    r = client.post('/predict/catalogue', json={**PROFILE, 'season_encoded': 2})
+    assert r.status_code == 422
@@ -0,0 +1,57 @@
+from conftest import FEATURES
+
+
+def columns(energies):
+    cols = {k: [1] * len(energies) for k in FEATURES}
+    cols["Energy_kcal_per_serving"] = list(energies)
+    return cols
+
+
+def test_columnar_batch_matches_row_batch(client):
+    cols = columns([100, 250.5, 0])
+    r = client.post('/predict/batch/columnar', json=cols)
+    assert r.status_code == 200
+    body = r.json()
+    assert body['total'] == 3
+    assert body['model'] == 'local_xgboost'
+    assert body['version'].startswith('xgboost_nutrition_model_20251103.pkl@')
+    assert body['caloric_needs'] == [1100.0, 1250.5, 1000.0]
+
+    rows = [{k: cols[k][i] for k in FEATURES} for i in range(3)]
+    r = client.post('/predict/batch', json={'inputs': rows})
+    assert [p['prediction']['caloric_needs'] for p in r.json()['predictions']] == body['caloric_needs']
+
+
+def test_columnar_batch_applies_field_bounds(client):
+    cols = columns([100, 3001, -1])
+    cols['region_encoded'] = [0, 4, 3]
+    r = client.post('/predict/batch/columnar', json=cols)
+    assert r.status_code == 422
+    errors = {(tuple(e['loc']), e['type']) for e in r.json()['detail']}
+    assert errors == {
+        (('body', 'Energy_kcal_per_serving', 2), 'greater_than_equal'),
+        (('body', 'Energy_kcal_per_serving', 1), 'less_than_equal'),
+        (('body', 'region_encoded', 1), 'less_than_equal'),
+    }
+
+    # The same bounds NutritionInput declares
+    from backend.api.models.schemas import field_bounds
+    assert field_bounds()['Energy_kcal_per_serving'] == (0, 3000)
+
+
+def test_columnar_batch_rejects_ragged_and_missing_columns(client):
+    cols = columns([100, 200])
+    cols['Fat_g_per_serving'] = [1]
+    r = client.post('/predict/batch/columnar', json=cols)
+    assert r.status_code == 422
+    assert r.json()['detail'][0]['loc'] == ['body', 'Fat_g_per_serving']
+
+    del cols['Fat_g_per_serving']
+    r = client.post('/predict/batch/columnar', json=cols)
+    assert r.status_code == 422
+    assert r.json()['detail'][0]['type'] == 'missing'
+
+    # Encoded fields stay integers, as in NutritionInput
+    cols = columns([100])
+    cols['season_encoded'] = [0.5]
+    assert client.post('/predict/batch/columnar', json=cols).status_code == 422
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+
+def training_data(n=600, n_features=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = 3 * X[:, 0] - 2 * X[:, 1] ** 2 + X[:, 2] * X[:, 3]
+    X[::13, 2] = np.nan
+    return X, np.nan_to_num(y)
+
+
+def test_xgboost_matches_original():
+    xgb = pytest.importorskip("xgboost")
+    from backend.api.models.compiled_trees import compile_and_verify
+
+    X, y = training_data()
+    model = xgb.XGBRegressor(n_estimators=40, max_depth=5, learning_rate=0.2).fit(X, y)
+    compiled = compile_and_verify(model, X.shape[1])
+    assert compiled is not None and compiled.n_trees == 40
+
+    expected = model.predict(X)
+    assert np.allclose(compiled.predict(X), expected, rtol=1e-5, atol=1e-4)
+    assert np.allclose(compiled.predict(X[:1]), expected[:1], rtol=1e-5, atol=1e-4)
+
+
+def test_histgradient_matches_original():
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from backend.api.models.compiled_trees import compile_and_verify
+
+    X, y = training_data()
+    model = HistGradientBoostingRegressor(max_iter=30).fit(X, y)
+    compiled = compile_and_verify(model, X.shape[1], samples=X[:20])
+    assert compiled is not None
+
+    assert np.allclose(compiled.predict(X), model.predict(X), rtol=1e-9, atol=1e-9)
+    # Rows exactly on a threshold follow scikit-learn's `<=` rule
+    on_split = X[:5].copy()
+    on_split[:, compiled.feature[0]] = compiled.threshold[0]
+    assert np.allclose(compiled.predict(on_split), model.predict(on_split))
+
+
+def test_unsupported_or_disabled_models_fall_back(monkeypatch):
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    from backend.api.models.compiled_trees import compile_and_verify
+
+    class DummyModel:
+        def predict(self, X):
+            return np.zeros(len(X))
+
+    assert compile_and_verify(DummyModel(), 4) is None
+
+    X, y = training_data()
+    model = HistGradientBoostingRegressor(max_iter=5).fit(X, y)
+    monkeypatch.setenv("COMPILED_INFERENCE", "false")
+    assert compile_and_verify(model, X.shape[1]) is None
+
+
+def test_loader_uses_compiled_path_for_small_batches(tmp_path, monkeypatch):
+    import pickle
+    from sklearn.ensemble import HistGradientBoostingRegressor
+    import backend.api.models.loader as loader_mod
+    from backend.api.models import NutritionInput
+
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+    monkeypatch.setenv("COMPILED_INFERENCE_MAX_BATCH", "4")
+    fields = list(NutritionInput.model_fields)
+    rng = np.random.default_rng(1)
+    X = rng.uniform(0, 100, size=(300, len(fields)))
+    model = HistGradientBoostingRegressor(max_iter=20).fit(X, X[:, 0] * 4 + 1000)
+
+    d = tmp_path / "models"
+    d.mkdir()
+    with open(d / "baseline_nutrition_model_v2_20251103.pkl", "wb") as f:
+        pickle.dump(model, f)
+
+    loader = loader_mod.ModelLoader(local_model_dir=d)
+    entry = loader.models['offline']
+    assert entry['compiled'] is not None
+    assert loader.model_versions()['offline']['compiled'] is True
+
+    calls = []
+    original_predict = model.predict
+    entry['model'].predict = lambda X: calls.append(len(X)) or original_predict(X)
+
+    rows = [dict(zip(fields, row)) for row in X[:6]]
+    single = loader.predict(rows[0])
+    assert calls == []
+    assert single['prediction']['caloric_needs'] == pytest.approx(original_predict(X[:1])[0])
+
+    batch = loader.predict_batch(rows)
+    assert calls == [6]
+    assert [r['prediction']['caloric_needs'] for r in batch] == pytest.approx(list(original_predict(X[:6])))
@@ -0,0 +1,88 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+
+def normalized(n=50, dim=8, seed=0):
+    emb = np.random.default_rng(seed).normal(size=(n, dim))
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype,tol", [("float32", 1e-6), ("float16", 1e-3), ("int8", 1e-2)])
+def test_store_roundtrip_is_memory_mapped(tmp_path, dtype, tol):
+    from backend.api.models.embedding_store import EmbeddingStore
+
+    source = tmp_path / "embeddings.json"
+    source.write_text("{}")
+    emb = normalized()
+    ids = [f"food_{i}" for i in range(len(emb))]
+
+    store = EmbeddingStore(tmp_path / "cache", dtype=dtype)
+    assert store.load(source) is None
+
+    loaded, loaded_ids, scale = store.save(source, emb, ids)
+    assert isinstance(loaded, np.memmap)
+    assert loaded.dtype == np.dtype(dtype)
+    assert loaded_ids == ids
+    assert np.allclose(np.asarray(loaded, dtype=float) / scale, emb, atol=tol)
+
+    # A changed source invalidates the store
+    source.write_text('{"changed": []}')
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert store.load(source) is None
+
+
+def test_loader_converts_snapshot_embeddings_once(tmp_path, monkeypatch):
+    import backend.api.models.loader as loader_mod
+
+    repo = tmp_path / "snapshot"
+    repo.mkdir()
+    emb = normalized(n=20)
+    with open(repo / "food_embeddings.json", "w") as f:
+        json.dump({f"food_{i}": vec.tolist() for i, vec in enumerate(emb)}, f)
+
+    models_dir = tmp_path / "models"
+    models_dir.mkdir()
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", True)
+    monkeypatch.setattr(loader_mod, "snapshot_download", lambda repo_id: str(repo), raising=False)
+    monkeypatch.setenv("EMBEDDING_STORE_DTYPE", "int8")
+
+    loader = loader_mod.ModelLoader(local_model_dir=models_dir)
+    ensemble = loader.models['ensemble']
+    assert isinstance(ensemble['embeddings'], np.memmap)
+    assert ensemble['embeddings'].dtype == np.int8
+
+    res = loader.recommend_foods(query_vector=emb[3], top_k=1)
+    assert res['items'][0]['id'] == 'food_3'
+    assert res['items'][0]['score'] == pytest.approx(1.0, abs=0.02)
+
+    # Second start maps the store without parsing the JSON again
+    def fail(*args, **kwargs):
+        raise AssertionError("embeddings JSON parsed again")
+
+    monkeypatch.setattr(loader_mod.ModelLoader, "_read_embeddings", staticmethod(fail))
+    loader = loader_mod.ModelLoader(local_model_dir=models_dir)
+    assert loader.models['ensemble']['available'] is True
+    by_id = loader.recommend_foods(by_id='food_3', top_k=3)
+    assert 'food_3' not in [item['id'] for item in by_id['items']]
+
+
+def test_saving_without_ids_drops_an_earlier_ids_file(tmp_path, monkeypatch):
+    from backend.api.models.embedding_store import EmbeddingStore
+
+    source = tmp_path / "embeddings.npy"
+    source.write_text("")
+    store = EmbeddingStore(tmp_path / "cache")
+    store.save(source, normalized(n=5), [f"food_{i}" for i in range(5)])
+
+    loaded, ids, _ = store.save(source, normalized(n=3), None)
+    assert len(loaded) == 3 and ids is None
+    assert store.load(source)[1] is None
+
+    # A store that cannot be read back is an error, not None
+    monkeypatch.setattr(store, "load", lambda source: None)
+    with pytest.raises(OSError):
+        store.save(source, normalized(n=3), None)
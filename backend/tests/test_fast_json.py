@@ -0,0 +1,90 @@
+import json
+
+import numpy as np
+import pytest
+from conftest import sample
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def loader(model_dir):
+    from backend.api.models.loader import ModelLoader
+    return ModelLoader(local_model_dir=model_dir, lazy=True)
+
+
+@pytest.fixture
+def client(loader, monkeypatch):
+    import backend.api.main as main
+    from backend.api.routers import health, predict
+    monkeypatch.setattr(main, "model_loader", loader)
+    health.set_model_loader(loader)
+    predict.set_model_loader(loader)
+    return TestClient(main.app)
+
+
+def test_prediction_responses_match_the_response_models(loader):
+    from backend.api.models import PredictionResponse
+    from backend.api.routers.predict import prediction_response
+    from backend.api.services.fast_json import dumps
+
+    loader.load_all()
+    snapshot = loader._prediction_result('huggingface', 1850.0, {
+        'type': 'XGBoostRegressor (HF-snapshot)', 'size': '12 KB', 'accuracy': 'unknown',
+        'test_r2': None, 'test_mae': None,
+    })
+    heuristic = loader._heuristic_prediction(sample())
+    failed = {'success': False, 'error': 'boom', 'status': 'error'}
+    for result in (loader.predict(sample()), snapshot, heuristic, failed):
+        expected = PredictionResponse.model_validate(result).model_dump_json()
+        assert dumps(prediction_response(result)) == expected.encode()
+    assert json.loads(dumps(prediction_response(heuristic)))['model_info']['test_r2'] is None
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    from backend.api.services import fast_json
+
+    payload = {'a': np.float64(1.5), 'b': np.arange(3), 'c': {0: 'Dry'}, 'd': 'Mzée'}
+    fast = fast_json.dumps(payload)
+    monkeypatch.setattr(fast_json, "ORJSON_AVAILABLE", False)
+    assert json.loads(fast_json.dumps(payload)) == json.loads(fast) == {
+        'a': 1.5, 'b': [0, 1, 2], 'c': {'0': 'Dry'}, 'd': 'Mzée'
+    }
+
+
+@pytest.mark.parametrize('orjson_available', [True, False])
+def test_non_finite_values_are_null_on_both_paths(monkeypatch, orjson_available):
+    from backend.api.services import fast_json
+
+    if orjson_available and not fast_json.ORJSON_AVAILABLE:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(fast_json, "ORJSON_AVAILABLE", orjson_available)
+    payload = {'a': float('nan'), 'b': np.array([np.inf, 2.0]), 'c': [np.float32('-inf')]}
+    assert fast_json.dumps(payload) == b'{"a":null,"b":[null,2.0],"c":[null]}'
+
+
+def test_static_responses_are_serialized_once(client):
+    r = client.get('/health/encoding')
+    assert r.status_code == 200
+    assert r.json()['regions']['0'] == "Central Uganda (Buganda)"
+    assert client.get('/health/encoding', headers={'If-None-Match': r.headers['etag']}).status_code == 304
+
+    from backend.api.routers.predict import example_body
+    r = client.get('/predict/example')
+    assert r.content == example_body.body
+    assert r.json()['example']['portion_size_g'] == 250
+
+
+def test_model_dependent_responses_follow_model_loads(client, loader):
+    first = client.get('/api/info')
+    assert first.json()['models']['local_xgboost']['state'] == 'pending'
+    assert client.get('/api/info').headers['etag'] == first.headers['etag']
+    assert client.get('/health/metrics').json()['models']['local_xgboost'] == {'available': False}
+
+    generation = loader.generation
+    loader.load_all()
+    assert loader.generation > generation
+
+    info = client.get('/api/info')
+    assert info.headers['etag'] != first.headers['etag']
+    assert info.json()['models']['local_xgboost']['state'] == 'ready'
+    assert client.get('/health/metrics').json()['models']['local_xgboost']['available'] is True
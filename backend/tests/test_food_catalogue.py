@@ -0,0 +1,150 @@
+import os
+
+import pytest
+
+CSV_HEADER = (
+    "food_id,food_name_english,food_category,energy_kcal_per_100g,protein_g_per_100g,"
+    "fat_g_per_100g,carbohydrate_g_per_100g,fiber_g_per_100g,calcium_mg_per_100g,"
+    "iron_mg_per_100g,avg_market_price_ugx_per_kg,availability_score,region\n"
+)
+
+
+def write_csv(path, rows):
+    path.write_text(CSV_HEADER + "".join(rows))
+
+
+@pytest.fixture
+def foods_csv(tmp_path):
+    path = tmp_path / "food_composition_clean.csv"
+    write_csv(path, [
+        "UG1,Matooke,Staples,89.1,1.2,0.3,23.4,2.6,5.0,0.6,1500.7,0.9,Central\n",
+        "UG2, matooke ,Staples,90.0,1.0,0.2,20.0,2.0,5.0,0.5,1400,0.8,Western\n",
+        "UG3,Dodo (amaranth),Vegetables,17.8,2.88,0.57,10.04,1.63,24.0,0.86,1209,0.28,National\n",
+    ])
+    return path
+
+
+def test_catalogue_dedups_and_maps_columns(foods_csv):
+    from backend.api.services import FoodCatalogue
+
+    catalogue = FoodCatalogue(candidates=[foods_csv]).get()
+    assert catalogue.size == 2
+    first, second = catalogue.records
+    assert first == {
+        'id': 'food_0', 'name': 'Matooke', 'category': 'staples', 'region': 'central',
+        'energy': 89.1, 'protein': 1.2, 'fat': 0.3, 'carbs': 23.4, 'fiber': 2.6,
+        'calcium': 5.0, 'iron': 0.6, 'pricePerKg': 1500, 'available': True,
+    }
+    assert second['id'] == 'food_2'
+    assert second['region'] == 'all'
+    assert second['available'] is False
+
+
+def test_catalogue_reloads_only_when_mtime_changes(foods_csv):
+    from backend.api.services import FoodCatalogue
+
+    catalogue = FoodCatalogue(candidates=[foods_csv])
+    first = catalogue.get()
+    assert catalogue.get() is first
+
+    write_csv(foods_csv, ["UG9,Posho,Staples,91,3.5,0.8,22,1.5,29,1.2,2257,0.54,Central\n"])
+    stat = foods_csv.stat()
+    os.utime(foods_csv, (stat.st_atime, stat.st_mtime + 10))
+
+    reloaded = catalogue.get()
+    assert reloaded is not first
+    assert [r['name'] for r in reloaded.records] == ['Posho']
+
+
+def test_local_foods_endpoint_serves_from_catalogue(foods_csv, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.api.main import app
+    from backend.api.routers import foods
+    from backend.api.services import FoodCatalogue
+
+    monkeypatch.setattr(foods, "food_catalogue", FoodCatalogue(candidates=[foods_csv]))
+    client = TestClient(app)
+
+    r = client.get('/foods/local', params={'limit': 1})
+    assert r.status_code == 200
+    assert [f['name'] for f in r.json()] == ['Matooke']
+
+    monkeypatch.setattr(foods, "food_catalogue", FoodCatalogue(candidates=[foods_csv.parent / "missing.csv"]))
+    r = client.get('/foods/local')
+    assert r.json()['error'] == "food composition dataset not found"
+
+
+def test_local_foods_filters_sorts_and_pages(foods_csv, monkeypatch):
+    from fastapi.testclient import TestClient
+    from backend.api.main import app
+    from backend.api.routers import foods
+    from backend.api.services import FoodCatalogue
+
+    write_csv(foods_csv, [
+        "UG1,Beans,Proteins,100,21.0,1,40,15,100,5.0,4000,0.9,Central\n",
+        "UG2,Groundnuts,Proteins,560,25.0,48,16,8,60,2.0,7000,0.7,National\n",
+        "UG3,Fish,Proteins,120,18.0,3,0,0,200,1.0,9000,0.4,Northern\n",
+        "UG4,Matooke,Staples,89,1.2,0.3,23,2.6,5,0.6,1500,0.9,Central\n",
+        "UG5,Eggs,Proteins,150,12.0,10,1,0,50,1.8,8000,0.8,Central\n",
+    ])
+    monkeypatch.setattr(foods, "food_catalogue", FoodCatalogue(candidates=[foods_csv]))
+    client = TestClient(app)
+
+    params = {'category': 'proteins', 'region': 'central', 'min_protein': 12, 'sort': '-protein', 'limit': 2}
+    r = client.get('/foods/local', params=params)
+    assert r.status_code == 200
+    assert [f['name'] for f in r.json()] == ['Groundnuts', 'Beans']
+    assert r.headers['X-Total-Count'] == '3'
+
+    cursor = r.headers['X-Next-Cursor']
+    r = client.get('/foods/local', params={**params, 'cursor': cursor})
+    assert [f['name'] for f in r.json()] == ['Eggs']
+    assert 'X-Next-Cursor' not in r.headers
+
+    # The cursor only resumes the same filters and sort, however they are spelled
+    same = {**params, 'category': ' Proteins', 'min_protein': 12.0, 'cursor': cursor}
+    assert [f['name'] for f in client.get('/foods/local', params=same).json()] == ['Eggs']
+    for changed in ({'min_protein': 13}, {'region': 'western'}, {'sort': 'protein'}, {'available': True}):
+        r = client.get('/foods/local', params={**params, **changed, 'cursor': cursor})
+        assert r.status_code == 400
+        assert 'different filters' in r.json()['detail']
+
+    r = client.get('/foods/local', params={'available': True, 'max_price': 7000, 'sort': 'pricePerKg'})
+    assert [f['name'] for f in r.json()] == ['Matooke', 'Beans', 'Groundnuts']
+
+    assert client.get('/foods/local', params={'sort': 'colour'}).status_code == 400
+    assert client.get('/foods/local', params={'cursor': 'not-a-cursor'}).status_code == 400
+
+
+def test_local_foods_etag_and_precompressed_bodies(foods_csv, monkeypatch):
+    import gzip
+    from fastapi.testclient import TestClient
+    from backend.api.main import app
+    from backend.api.routers import foods
+    from backend.api.services import FoodCatalogue
+
+    catalogue = FoodCatalogue(candidates=[foods_csv])
+    monkeypatch.setattr(foods, "food_catalogue", catalogue)
+    client = TestClient(app)
+
+    r = client.get('/foods/local', headers={'Accept-Encoding': 'gzip'})
+    assert r.status_code == 200
+    assert r.headers['Content-Encoding'] == 'gzip'
+    etag = r.headers['ETag']
+
+    r = client.get('/foods/local', headers={'If-None-Match': etag})
+    assert r.status_code == 304
+    assert r.content == b''
+
+    # The compressed variant is built once and reused
+    encoded = next(iter(catalogue.get().response_cache._entries.values()))
+    assert encoded.variant('gzip') is encoded.variant('gzip')
+    assert gzip.decompress(encoded.variant('gzip')) == encoded.body
+
+    # A new dataset version gets a new ETag
+    write_csv(foods_csv, ["UG9,Posho,Staples,91,3.5,0.8,22,1.5,29,1.2,2257,0.54,Central\n"])
+    stat = foods_csv.stat()
+    os.utime(foods_csv, (stat.st_atime, stat.st_mtime + 10))
+    r = client.get('/foods/local', headers={'If-None-Match': etag})
+    assert r.status_code == 200
+    assert r.headers['ETag'] != etag
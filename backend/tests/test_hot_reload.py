@@ -0,0 +1,106 @@
+import asyncio
+import os
+
+import pytest
+from conftest import FakeModel, sample, write_model
+
+
+@pytest.fixture
+def model():
+    return FakeModel(300.0, weights={})
+
+
+def test_reload_swaps_and_rolls_back(loader):
+    old_version = loader.models['local_xgboost']['version']
+    write_model(loader.local_model_dir, FakeModel(500.0, weights={}), "xgboost_nutrition_model_20251120.pkl")
+
+    res = loader.reload_model('local_xgboost')
+    assert res['previous_version'] == old_version
+    assert res['version'].startswith("xgboost_nutrition_model_20251120.pkl@")
+    assert res['validation']['example_prediction'] == 500.0
+    assert loader.predict(sample())['prediction']['caloric_needs'] == 500.0
+    assert loader.model_versions()['local_xgboost']['previous_versions'] == [old_version]
+
+    res = loader.rollback_model('local_xgboost')
+    assert res['version'] == old_version
+    assert loader.predict(sample())['prediction']['caloric_needs'] == 300.0
+    with pytest.raises(LookupError):
+        loader.rollback_model('local_xgboost')
+
+
+def test_failed_validation_keeps_live_model(loader):
+    write_model(loader.local_model_dir, FakeModel(float('nan'), weights={}), "xgboost_nutrition_model_20251120.pkl")
+    live = loader.models['local_xgboost']
+
+    with pytest.raises(ValueError):
+        loader.reload_model('local_xgboost')
+    assert loader.models['local_xgboost'] is live
+    assert not loader.previous_versions.get('local_xgboost')
+
+    with pytest.raises(FileNotFoundError):
+        loader.reload_model('local_xgboost', filename='../xgboost_nutrition_model_20251103.pkl')
+    with pytest.raises(KeyError):
+        loader.reload_model('unknown')
+
+
+def test_admin_reload_endpoint(loader, client, monkeypatch):
+    from backend.api.routers import admin as admin_router
+
+    admin_router.set_model_loader(loader)
+
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+    assert client.post('/admin/models/local_xgboost/reload').status_code == 403
+
+    monkeypatch.setenv("ADMIN_TOKEN", "s3cret")
+    assert client.post('/admin/models/local_xgboost/reload', headers={'X-Admin-Token': 'nope'}).status_code == 401
+
+    headers = {'X-Admin-Token': 's3cret'}
+    write_model(loader.local_model_dir, FakeModel(420.0, weights={}), "xgboost_nutrition_model_v2.pkl")
+    r = client.post('/admin/models/local_xgboost/reload', headers=headers,
+                    json={'filename': 'xgboost_nutrition_model_v2.pkl'})
+    assert r.status_code == 200
+    assert r.json()['validation']['example_prediction'] == 420.0
+    assert client.post('/predict/', json=sample()).json()['prediction']['caloric_needs'] == 420.0
+
+    r = client.post('/admin/models/local_xgboost/reload', headers=headers, json={'filename': 'missing.pkl'})
+    assert r.status_code == 404
+
+    r = client.post('/admin/models/local_xgboost/rollback', headers=headers)
+    assert r.status_code == 200
+    assert client.post('/predict/', json=sample()).json()['prediction']['caloric_needs'] == 300.0
+    assert client.post('/admin/models/local_xgboost/rollback', headers=headers).status_code == 409
+
+
+def test_watcher_reloads_changed_artifact(loader):
+    from backend.api.services import ModelWatcher
+
+    watcher = ModelWatcher(loader, interval_s=1)
+    asyncio.run(watcher.check())
+    assert loader.predict(sample())['prediction']['caloric_needs'] == 300.0
+
+    path = loader.local_model_dir / "xgboost_nutrition_model_20251103.pkl"
+    write_model(loader.local_model_dir, FakeModel(650.0, weights={}), path.name)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    asyncio.run(watcher.check())
+    assert loader.predict(sample())['prediction']['caloric_needs'] == 650.0
+
+
+def test_watcher_reloads_an_artifact_replaced_before_its_first_check(loader):
+    from backend.api.services import ModelWatcher
+
+    watcher = ModelWatcher(loader, interval_s=1)
+    path = loader.local_model_dir / "xgboost_nutrition_model_20251103.pkl"
+    write_model(loader.local_model_dir, FakeModel(650.0, weights={}), path.name)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    asyncio.run(watcher.check())
+    assert loader.predict(sample())['prediction']['caloric_needs'] == 650.0
+
+    # Unchanged since the reload: nothing to do
+    version = loader.models['local_xgboost']['version']
+    asyncio.run(watcher.check())
+    assert loader.models['local_xgboost']['version'] == version
+    assert len(loader.previous_versions['local_xgboost']) == 1
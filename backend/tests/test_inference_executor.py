@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+import pytest
+from conftest import sample
+
+
+def test_executor_rejects_when_queue_full():
+    from backend.api.services import InferenceExecutor, QueueFullError
+
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(gate.wait, 5))
+        waiting = asyncio.ensure_future(executor.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        assert executor.in_flight == 2
+        assert executor.queue_depth == 1
+
+        with pytest.raises(QueueFullError):
+            await executor.run(gate.wait, 5)
+
+        gate.set()
+        await asyncio.gather(running, waiting)
+        assert executor.in_flight == 0
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_cancelled_call_holds_its_slot_until_the_worker_finishes():
+    from backend.api.services import InferenceExecutor, QueueFullError
+
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    gate = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(gate.wait, 5))
+        await asyncio.sleep(0.05)
+        running.cancel()
+        await asyncio.sleep(0.05)
+        # The request is gone but its call still occupies the only worker
+        assert executor.in_flight == 1
+        with pytest.raises(QueueFullError):
+            await executor.run(gate.wait, 5)
+
+        gate.set()
+        for _ in range(100):
+            if executor.in_flight == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert executor.in_flight == 0
+        assert await executor.run(sum, [1, 2]) == 3
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+
+
+def test_predict_runs_on_executor_and_returns_503_when_full(client):
+    from backend.api.routers import predict as predict_router
+    from backend.api.services import InferenceExecutor, QueueFullError
+
+    payload = sample(300)
+
+    executor = InferenceExecutor(max_workers=1, max_queue=0)
+    predict_router.set_inference_executor(executor)
+    try:
+        r = client.post('/predict/', json=payload)
+        assert r.status_code == 200
+        assert r.json()['prediction']['caloric_needs'] == pytest.approx(1300.0)
+
+        class FullExecutor:
+            async def run(self, fn, *args, **kwargs):
+                raise QueueFullError("Inference queue full")
+
+        predict_router.set_inference_executor(FullExecutor())
+        r = client.post('/predict/', json=payload)
+        assert r.status_code == 503
+        r = client.post('/predict/batch', json={'inputs': [payload]})
+        assert r.status_code == 503
+    finally:
+        predict_router.set_inference_executor(None)
+        executor.shutdown()
@@ -115,9 +115,62 @@ def test_predict_endpoint_and_recommend(tmp_models_dir, monkeypatch):
     assert body['success'] is True
     assert float(body['prediction']['caloric_needs']) == pytest.approx(250.0)
 
-    # Call recommend by id
+    # Call recommend by id (the queried item is excluded from its own results)
     r2 = client.get('/predict/recommend', params={'by_id': 'food_a', 'top_k': 2})
     assert r2.status_code == 200
     b2 = r2.json()
     assert b2['success'] is True
-    assert len(b2['items']) == 2
+    assert [item['id'] for item in b2['items']] == ['food_b']
+
+    # Batch recommend: one search for many ids, unknown ids reported per query
+    r3 = client.post('/predict/recommend/batch', json={'by_ids': ['food_a', 'food_b', 'nope'], 'top_k': 1})
+    assert r3.status_code == 200
+    results = r3.json()['results']
+    assert [r['items'][0]['id'] for r in results[:2]] == ['food_b', 'food_a']
+    assert results[2]['success'] is False
+
+
+def test_predict_batch_single_model_call(tmp_models_dir, monkeypatch):
+    import backend.api.models.loader as loader_mod
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+
+    loader = loader_mod.ModelLoader(local_model_dir=tmp_models_dir)
+
+    calls = []
+
+    class CountingModel(DummyModel):
+        def predict(self, X):
+            calls.append(len(X))
+            if any(v < 0 for v in np.asarray(X, dtype=float)[:, 0]):
+                raise ValueError("negative energy")
+            return [self._v] * len(X)
+
+    loader.models['local_xgboost']['model'] = CountingModel(250.0)
+
+    rows = [{k: 1.0 for k in loader.feature_names} for _ in range(5)]
+    results = loader.predict_batch(rows)
+    assert calls == [5]
+    assert [r['success'] for r in results] == [True] * 5
+
+    # A bad row only fails itself
+    calls.clear()
+    rows[2] = dict(rows[2])
+    rows[2][loader.feature_names[0]] = -1.0
+    results = loader.predict_batch(rows)
+    assert [r['success'] for r in results] == [True, True, False, True, True]
+    assert results[2]['status'] == 'error'
+
+
+def test_feature_plan_compiled_at_load(tmp_models_dir, monkeypatch):
+    import backend.api.models.loader as loader_mod
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+
+    loader = loader_mod.ModelLoader(local_model_dir=tmp_models_dir)
+    plan = loader.models['local_xgboost']['feature_plan']
+    assert plan == tuple(loader.feature_names)
+
+    # A model expecting a column NutritionInput cannot provide is rejected at load
+    with open(tmp_models_dir / "xgboost_feature_names_20251103.pkl", "wb") as f:
+        pickle.dump(["energy_kcal_per_serving", "sodium_mg_per_serving"], f)
+    loader = loader_mod.ModelLoader(local_model_dir=tmp_models_dir)
+    assert loader.models['local_xgboost']['available'] is False
@@ -0,0 +1,147 @@
+import pytest
+from conftest import sample
+
+CSV_HEADER = (
+    "food_id,food_name_english,food_category,edible_portion_percent,energy_kcal_per_100g,protein_g_per_100g,"
+    "fat_g_per_100g,carbohydrate_g_per_100g,fiber_g_per_100g,calcium_mg_per_100g,iron_mg_per_100g,"
+    "zinc_mg_per_100g,vitamin_a_mcg_per_100g,vitamin_c_mg_per_100g,sodium_mg_per_100g,"
+    "potassium_mg_per_100g,preparation_state,seasonality,avg_market_price_ugx_per_kg,availability_score,region\n"
+)
+# The same nutrients for every food, dense enough to meet every daily target
+NUTRIENTS = "200,10,5,25,6,250,2,2,150,20,10,700"
+
+
+@pytest.fixture
+def foods_csv(tmp_path):
+    path = tmp_path / "food_composition_clean.csv"
+    path.write_text(CSV_HEADER + "".join(
+        f"UG{i},{name},Staples,100,{NUTRIENTS},boiled,{season},{price},{availability},{region}\n"
+        for i, (name, season, price, availability, region) in enumerate([
+            ("Cheap staple", "Year-round", 1000, 0.9, "Central"),
+            ("Dear staple", "Year-round", 2000, 0.9, "National"),
+            ("Rainy greens", "Rainy season", 500, 0.9, "Central"),
+            ("Scarce mix", "Year-round", 100, 0.2, "Central"),
+            ("Western mix", "Year-round", 100, 0.9, "Western"),
+        ])
+    ))
+    return path
+
+
+@pytest.fixture
+def catalogue(foods_csv):
+    from backend.api.services import FoodCatalogue
+    return FoodCatalogue(candidates=[foods_csv]).get()
+
+
+def plan_foods(plan):
+    return [(food['name'], food['grams']) for food in plan['foods']]
+
+
+def test_targets_follow_condition_and_energy():
+    from backend.api.services.meal_planner import nutrient_targets
+
+    hypertension = nutrient_targets(0, 2000)
+    assert hypertension['energy_kcal'] == (1900, 2100)
+    assert hypertension['sodium_mg'] == (None, 1500)
+    assert hypertension['potassium_mg'] == (3500, None)
+    assert hypertension['protein_g'] == (75, None)
+
+    diabetes = nutrient_targets(7, 2000)
+    assert diabetes['carbs_g'] == (None, 250)
+    assert diabetes['sodium_mg'] == (None, 2300)
+
+
+def test_integer_candidates_add_the_cheapest_sources_of_required_nutrients():
+    import numpy as np
+    from scipy import sparse
+    from backend.api.services.meal_planner import integer_candidates
+
+    A = sparse.csc_matrix(np.array([
+        [1, 0, 4, 3, 0, 0],
+        [0, 0, 0, 0, 9, 9],  # no minimum: its sources are left out
+        [0, 5, 0, 0, 0, 0],
+    ], dtype=float))
+    cost = np.array([1, 1, 1, 2, 1, 1], dtype=float)
+    x = np.array([0.5, 0, 0, 0, 0, 0])
+    assert integer_candidates(A, cost, np.array([10, 0, 5]), x).tolist() == [0, 1, 2, 3]
+
+
+def test_cheapest_plan_uses_the_regional_seasonal_market(catalogue):
+    from backend.api.services import MealPlanner
+
+    planner = MealPlanner()
+    dry = planner.plan(catalogue, region=0, season=0, condition=0, caloric_needs=2000)
+    assert dry['status'] == 'optimal'
+    assert dry['candidates'] == 2
+    assert plan_foods(dry) == [('Cheap staple', 500.0), ('Dear staple', 450.0)]
+    assert dry['cost_ugx'] == pytest.approx(1400)
+    assert dry['nutrients']['energy_kcal'] == pytest.approx(1900)
+
+    wet = planner.plan(catalogue, region=0, season=1, condition=0, caloric_needs=2000)
+    assert plan_foods(wet) == [('Rainy greens', 500.0), ('Cheap staple', 450.0)]
+
+    scarce = planner.plan(catalogue, region=0, season=0, condition=0, caloric_needs=2000, min_availability=0.1)
+    assert plan_foods(scarce)[0] == ('Scarce mix', 500.0)
+
+    # Repeat requests come from the plan cache
+    assert planner.plan(catalogue, region=0, season=0, condition=0, caloric_needs=2000) is dry
+
+
+def test_whole_portions_and_infeasible_plans(catalogue):
+    from backend.api.services import MealPlanner
+
+    planner = MealPlanner()
+    plan = planner.plan(catalogue, region=0, season=0, condition=0, caloric_needs=2000, portion_step_g=100)
+    assert plan['status'] == 'optimal'
+    assert plan_foods(plan) == [('Cheap staple', 500.0), ('Dear staple', 500.0)]
+    assert plan['cost_ugx'] == pytest.approx(1500)
+    assert plan['lower_bound_ugx'] == pytest.approx(1400)
+
+    # 200 g portions allow only 400 g of each food: not enough energy
+    plan = planner.plan(catalogue, region=0, season=0, condition=0, caloric_needs=2000, portion_step_g=200)
+    assert plan['success'] is False
+    assert plan['status'] == 'infeasible'
+    assert plan['foods'] == []
+
+    plan = planner.plan(catalogue, region=3, season=0, condition=0, caloric_needs=2000, min_availability=0.95)
+    assert (plan['status'], plan['candidates']) == ('infeasible', 0)
+
+
+@pytest.fixture
+def planner_client(client, foods_csv, monkeypatch):
+    from backend.api.routers import foods, predict
+    from backend.api.services import FoodCatalogue, MealPlanner
+    monkeypatch.setattr(foods, "food_catalogue", FoodCatalogue(candidates=[foods_csv]))
+    monkeypatch.setattr(predict, "meal_planner", MealPlanner())
+    return client
+
+
+def test_meal_plan_endpoint_predicts_the_energy_target(planner_client):
+    r = planner_client.post('/predict/meal-plan', json={
+        'region_encoded': 0, 'condition_encoded': 0, 'season_encoded': 0, 'nutrition': sample(1000)
+    })
+    assert r.status_code == 200
+    body = r.json()
+    assert body['caloric_needs'] == 2000
+    assert body['prediction_model']
+    assert [food['name'] for food in body['foods']] == ['Cheap staple', 'Dear staple']
+    assert body['targets']['sodium_mg'] == {'min': None, 'max': 1500}
+
+    r = planner_client.post('/predict/meal-plan',
+                            json={'region_encoded': 0, 'condition_encoded': 0, 'season_encoded': 0})
+    assert r.status_code == 422
+
+
+@pytest.mark.parametrize('model', [{'base': 500.0, 'weights': {}}, {'base': 6000.0, 'weights': {}}], indirect=True)
+def test_meal_plan_rejects_predictions_outside_the_energy_range(planner_client):
+    r = planner_client.post('/predict/meal-plan', json={
+        'region_encoded': 0, 'condition_encoded': 0, 'season_encoded': 0, 'nutrition': sample(1000)
+    })
+    assert r.status_code == 422
+    assert '800-5000 kcal/day' in r.json()['detail']
+
+    # An explicit target needs no prediction
+    r = planner_client.post('/predict/meal-plan', json={
+        'region_encoded': 0, 'condition_encoded': 0, 'season_encoded': 0, 'caloric_needs': 2000
+    })
+    assert r.status_code == 200
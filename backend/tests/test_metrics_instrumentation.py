@@ -0,0 +1,74 @@
+import json
+
+import pytest
+from conftest import FakeModel, sample
+from prometheus_client import REGISTRY, CollectorRegistry
+
+
+@pytest.fixture
+def model():
+    return FakeModel(1500.0, weights={})
+
+
+def value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture(autouse=True)
+def observed(loader):
+    from backend.api.services import observe_predictions
+    loader.metrics_observer = observe_predictions
+
+
+def test_predict_records_counts_and_phases(client):
+    before = {
+        'success': value('predictions_total', model='local_xgboost', status='success'),
+        'error': value('predictions_total', model='huggingface', status='error'),
+        'inference': value('model_phase_seconds_count', model='local_xgboost', phase='inference'),
+        'validation': value('request_phase_seconds_count', endpoint='predict', phase='validation'),
+        'serialization': value('request_phase_seconds_count', endpoint='predict', phase='serialization'),
+        'total': value('prediction_duration_seconds_count'),
+        'batch': value('prediction_request_duration_seconds_count', endpoint='batch'),
+        'rows': value('model_batch_rows_sum', model='local_xgboost'),
+    }
+
+    assert client.post('/predict/', json=sample()).status_code == 200
+    r = client.post('/predict/batch', json={'inputs': [sample(), sample(), sample()]})
+    assert r.status_code == 200
+    # The explicit model is not loaded: counted as errors against the requested key
+    assert client.post('/predict/?model=huggingface', json=sample()).status_code == 500
+
+    assert value('predictions_total', model='local_xgboost', status='success') - before['success'] == 4
+    assert value('predictions_total', model='huggingface', status='error') - before['error'] == 1
+    assert value('model_phase_seconds_count', model='local_xgboost', phase='inference') - before['inference'] == 2
+    assert value('model_batch_rows_sum', model='local_xgboost') - before['rows'] == 4
+    # Failed requests are validated but never reach serialization
+    assert value('request_phase_seconds_count', endpoint='predict', phase='validation') - before['validation'] == 2
+    assert value('request_phase_seconds_count', endpoint='predict', phase='serialization') - before['serialization'] == 1
+    # The unlabelled total keeps its original series; endpoints are broken out separately
+    assert value('prediction_duration_seconds_count') - before['total'] == 3
+    assert value('prediction_request_duration_seconds_count', endpoint='batch') - before['batch'] == 1
+
+
+def test_stream_records_validation_and_serialization(client):
+    before = value('request_phase_seconds_count', endpoint='stream', phase='validation')
+    body = "\n".join(json.dumps(sample()) for _ in range(3)) + "\n"
+    r = client.post('/predict/stream', content=body, headers={'Content-Type': 'application/x-ndjson'})
+    assert r.status_code == 200
+    assert value('request_phase_seconds_count', endpoint='stream', phase='validation') - before == 1
+    assert value('request_phase_seconds_count', endpoint='stream', phase='serialization') >= 1
+
+
+def test_runtime_collector_reads_live_state(loader):
+    from backend.api.services import InferenceExecutor, RuntimeCollector
+    executor = InferenceExecutor(max_workers=1, max_queue=1)
+    registry = CollectorRegistry()
+    registry.register(RuntimeCollector(loader, executor))
+    try:
+        assert registry.get_sample_value('model_accuracy', {'model': 'local_xgboost'}) == pytest.approx(0.6710)
+        assert registry.get_sample_value(
+            'model_load_seconds', {'loader': 'local_xgboost', 'state': 'ready'}
+        ) >= 0
+        assert registry.get_sample_value('inference_queue_depth') == 0
+    finally:
+        executor.shutdown()
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+
+def make_batcher(calls, **kwargs):
+    from backend.api.services import MicroBatcher
+
+    async def score_batch(inputs, model_preference):
+        calls.append((model_preference, len(inputs)))
+        return [{'success': True, 'value': row['x'], 'model': model_preference} for row in inputs]
+
+    return MicroBatcher(score_batch, **kwargs)
+
+
+def test_concurrent_requests_share_one_model_call():
+    calls = []
+    batcher = make_batcher(calls, max_wait_ms=20, max_batch_size=100)
+
+    async def scenario():
+        return await asyncio.gather(*[batcher.submit({'x': i}) for i in range(10)])
+
+    results = asyncio.run(scenario())
+    assert calls == [('auto', 10)]
+    assert [r['value'] for r in results] == list(range(10))
+
+
+def test_batches_split_by_size_and_model_key():
+    calls = []
+    batcher = make_batcher(calls, max_wait_ms=20, max_batch_size=4)
+
+    async def scenario():
+        jobs = [batcher.submit({'x': i}) for i in range(6)]
+        jobs.append(batcher.submit({'x': 99}, model_preference='offline'))
+        return await asyncio.gather(*jobs)
+
+    results = asyncio.run(scenario())
+    assert sorted(calls) == [('auto', 2), ('auto', 4), ('offline', 1)]
+    assert results[-1]['model'] == 'offline'
+
+
+def test_batch_failure_propagates_to_every_caller():
+    from backend.api.services import MicroBatcher
+
+    async def score_batch(inputs, model_preference):
+        raise RuntimeError("model exploded")
+
+    batcher = MicroBatcher(score_batch, max_wait_ms=1, max_batch_size=8)
+
+    async def scenario():
+        return await asyncio.gather(
+            *[batcher.submit({'x': i}) for i in range(3)], return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+def test_short_or_cancelled_batches_fail_every_waiting_caller():
+    from backend.api.services import MicroBatcher
+
+    async def short_batch(inputs, model_preference):
+        return [{'success': True}] * (len(inputs) - 1)
+
+    async def scenario(batcher):
+        return await asyncio.wait_for(asyncio.gather(
+            *[batcher.submit({'x': i}) for i in range(3)], return_exceptions=True
+        ), timeout=1)
+
+    results = asyncio.run(scenario(MicroBatcher(short_batch, max_wait_ms=1, max_batch_size=8)))
+    assert all(isinstance(r, RuntimeError) and '2 results for 3 inputs' in str(r) for r in results)
+
+    async def cancelled(batcher):
+        jobs = [asyncio.ensure_future(batcher.submit({'x': i})) for i in range(2)]
+        await asyncio.sleep(0.01)
+        for task in list(batcher._tasks):
+            task.cancel()
+        return await asyncio.wait_for(asyncio.gather(*jobs, return_exceptions=True), timeout=1)
+
+    async def hang(inputs, model_preference):
+        await asyncio.sleep(10)
+
+    results = asyncio.run(cancelled(MicroBatcher(hang, max_wait_ms=1, max_batch_size=8)))
+    assert all(isinstance(r, RuntimeError) for r in results)
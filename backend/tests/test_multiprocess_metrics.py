@@ -0,0 +1,59 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Multiprocess mode is chosen when prometheus_client is imported, so every
+# "worker" here is a fresh interpreter with PROMETHEUS_MULTIPROC_DIR set.
+ROOT = Path(__file__).resolve().parents[2]
+
+WORKER = """
+from types import SimpleNamespace
+from backend.api.services import RuntimeCollector, observe_predictions
+observe_predictions('local_xgboost', 'success', 3, {'inference': 0.001})
+loader = SimpleNamespace(models={'local_xgboost': {'available': True, 'test_r2': 0.5}}, load_seconds={}, load_state={})
+RuntimeCollector(loader).publish()
+"""
+
+SCRAPE = """
+import json
+from backend.api.routers.metrics import MULTIPROCESS_DIR, metrics_registry
+from backend.api.services import prune_dead_workers
+
+def sample(name, **labels):
+    return metrics_registry().get_sample_value(name, labels)
+
+before = sample('model_accuracy', model='local_xgboost')
+dead = prune_dead_workers(MULTIPROCESS_DIR)
+print(json.dumps({
+    'success': sample('predictions_total', model='local_xgboost', status='success'),
+    'inference': sample('model_phase_seconds_count', model='local_xgboost', phase='inference'),
+    'accuracy_before': before,
+    'accuracy_after': sample('model_accuracy', model='local_xgboost'),
+    'dead': len(dead),
+}))
+"""
+
+
+def run(code, directory):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(directory), HF_HUB_OFFLINE='1')
+    out = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert out.returncode == 0, out.stderr
+    return out.stdout
+
+
+def test_metrics_aggregate_across_workers(tmp_path):
+    run(WORKER, tmp_path)
+    run(WORKER, tmp_path)
+    result = json.loads(run(SCRAPE, tmp_path).strip().splitlines()[-1])
+
+    # Counters and histograms are summed over both workers
+    assert result['success'] == 6
+    assert result['inference'] == 2
+    # Live gauges of exited workers are dropped by the next worker to start
+    assert result['accuracy_before'] == 0.5
+    assert result['dead'] == 2
+    assert result['accuracy_after'] is None
@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+import pytest
+from conftest import FEATURES, sample
+
+
+pytestmark = pytest.mark.usefixtures("small_stream_chunks")
+
+
+def read_lines(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_ndjson_stream_scores_in_chunks(client, loader):
+    rows = [sample(100), sample(200), {"Energy_kcal_per_serving": 5}, sample(300)]
+    body = "\n".join(json.dumps(r) for r in rows[:2]) + "\nnot json\n\n" + \
+        "\n".join(json.dumps(r) for r in rows[2:]) + "\n"
+
+    r = client.post('/predict/stream', content=body, headers={'Content-Type': 'application/x-ndjson'})
+    assert r.status_code == 200
+    assert r.headers['content-type'].startswith('application/x-ndjson')
+
+    lines = read_lines(r)
+    assert [line.get('line') for line in lines[:-1]] == [1, 2, 3, 5, 6]
+    assert [line['success'] for line in lines[:-1]] == [True, True, False, False, True]
+    assert lines[0]['prediction']['caloric_needs'] == 1100.0
+    assert lines[4]['prediction']['caloric_needs'] == 1300.0
+    assert 'Invalid JSON' in lines[2]['error']
+    assert 'Protein_g_per_serving' in lines[3]['error']
+    assert lines[-1] == {'summary': {'total': 5, 'successful': 3, 'failed': 2}}
+
+    # Only valid rows reach the model, at most one chunk at a time
+    assert loader.models['local_xgboost']['model'].calls == [2, 1]
+
+
+def test_csv_stream(client):
+    header = ",".join(FEATURES)
+    rows = [",".join(str(v) for v in sample(e).values()) for e in (10, 20, 30)]
+    body = "\r\n".join([header] + rows + ["1,2"])
+
+    r = client.post('/predict/stream', content=body, headers={'Content-Type': 'text/csv; charset=utf-8'})
+    lines = read_lines(r)
+    assert [line['prediction']['caloric_needs'] for line in lines[:3]] == [1010.0, 1020.0, 1030.0]
+    assert lines[3]['line'] == 5 and 'Expected 18 columns' in lines[3]['error']
+    assert lines[-1]['summary']['successful'] == 3
+
+
+def test_unsupported_content_type(client):
+    r = client.post('/predict/stream', json=[sample(1)])
+    assert r.status_code == 415
+
+
+def test_lines_split_across_chunks():
+    from backend.api.services.stream_scoring import iter_lines
+
+    async def chunks():
+        for part in (b'{"a"', b': 1}\n{"b": 2', b'}\r\n', b'', b'{"c": 3}'):
+            yield part
+
+    async def collect():
+        return [item async for item in iter_lines(chunks())]
+
+    assert asyncio.run(collect()) == [(1, '{"a": 1}'), (2, '{"b": 2}'), (3, '{"c": 3}')]
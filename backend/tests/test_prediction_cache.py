@@ -0,0 +1,98 @@
+import sqlite3
+
+import numpy as np
+from conftest import FakeModel, sample, write_model
+
+
+def test_cache_hits_skip_the_model(loader):
+    from backend.api.services import PredictionCache
+    from backend.api.services.metrics import prediction_cache_hits, prediction_cache_misses
+
+    loader.prediction_cache = PredictionCache(max_entries=8, ttl_s=60)
+    model = loader.models['local_xgboost']['model']
+    hits = prediction_cache_hits.labels(tier='memory')._value.get()
+    misses = prediction_cache_misses._value.get()
+
+    first = loader.predict(sample(100))
+    # Same values in another key order and as floats hit the cache
+    reordered = dict(reversed(list({k: float(v) for k, v in sample(100).items()}.items())))
+    assert loader.predict(reordered) == first
+    assert model.calls == [1]
+
+    # Only the uncached rows of a batch reach the model
+    results = loader.predict_batch([sample(100), sample(200), sample(300)])
+    assert model.calls == [1, 2]
+    assert [r['prediction']['caloric_needs'] for r in results] == [1100.0, 1200.0, 1300.0]
+
+    assert prediction_cache_hits.labels(tier='memory')._value.get() - hits == 2
+    assert prediction_cache_misses._value.get() - misses == 3
+
+
+def test_large_batches_bypass_the_cache(loader):
+    from backend.api.services import PredictionCache
+
+    loader.prediction_cache = PredictionCache(max_entries=8, ttl_s=60, max_batch=2)
+    model = loader.models['local_xgboost']['model']
+    loader.predict_batch([sample(100), sample(200)])
+    assert len(loader.prediction_cache) == 2
+
+    # Over max_batch: every row reaches the model and nothing is stored
+    results = loader.predict_batch([sample(100), sample(200), sample(300)])
+    assert model.calls == [2, 3]
+    assert [r['prediction']['caloric_needs'] for r in results] == [1100.0, 1200.0, 1300.0]
+    assert len(loader.prediction_cache) == 2
+
+
+def test_lru_and_ttl_limits(monkeypatch):
+    from backend.api.services import PredictionCache
+    import backend.api.services.prediction_cache as cache_mod
+
+    cache = PredictionCache(max_entries=2, ttl_s=10)
+    keys = [cache.key('local_xgboost', 'v1', np.array([float(i)])) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.set(key, 'local_xgboost', {'i': i})
+    assert len(cache) == 2
+    assert cache.get(keys[0]) is None
+    assert cache.get(keys[2]) == {'i': 2}
+
+    now = cache_mod.time.time()
+    monkeypatch.setattr(cache_mod.time, 'time', lambda: now + 11)
+    assert cache.get(keys[2]) is None
+
+    assert cache.key('local_xgboost', 'v1', np.array([1.0])) != cache.key('local_xgboost', 'v2', np.array([1.0]))
+
+
+def test_reload_invalidates_cached_predictions(loader):
+    from backend.api.services import PredictionCache
+
+    loader.prediction_cache = PredictionCache(max_entries=8, ttl_s=60)
+    assert loader.predict(sample(100))['prediction']['caloric_needs'] == 1100.0
+    assert len(loader.prediction_cache) == 1
+
+    write_model(loader.local_model_dir, FakeModel(2000.0), "xgboost_nutrition_model_20251120.pkl")
+    loader.reload_model('local_xgboost')
+    assert len(loader.prediction_cache) == 0
+    assert loader.predict(sample(100))['prediction']['caloric_needs'] == 2100.0
+
+    loader.rollback_model('local_xgboost')
+    assert loader.predict(sample(100))['prediction']['caloric_needs'] == 1100.0
+
+
+def test_sqlite_backend_is_shared(loader, tmp_path):
+    from backend.api.services import PredictionCache
+
+    path = str(tmp_path / "predictions.sqlite3")
+    loader.prediction_cache = PredictionCache(max_entries=8, ttl_s=60, sqlite_path=path)
+    first = loader.predict(sample(100))
+
+    # A second worker with an empty memory tier is served from the shared file
+    other = PredictionCache(max_entries=8, ttl_s=60, sqlite_path=path)
+    model = loader.models['local_xgboost']['model']
+    loader.prediction_cache = other
+    assert loader.predict(sample(100)) == first
+    assert model.calls == [1]
+    assert len(other) == 1
+
+    other.invalidate('local_xgboost')
+    with sqlite3.connect(path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM predictions").fetchone()[0] == 0
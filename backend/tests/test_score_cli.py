@@ -0,0 +1,88 @@
+import pyarrow.parquet as pq
+import pytest
+from conftest import FEATURES, FakeModel
+
+
+@pytest.fixture
+def model():
+    # Depends on the input so row alignment is checked
+    return FakeModel(0.0, weights={0: 2.0})
+
+
+@pytest.fixture
+def survey_csv(tmp_path):
+    # An extra id column, a lowercased header, one row with a missing value
+    # and one above NutritionInput's 3000 kcal bound
+    names = ["household_id", "energy_kcal_per_serving"] + FEATURES[1:]
+    lines = [",".join(names)]
+    for i in range(25):
+        energy = {7: "", 12: "5000"}.get(i, str(100 + i))
+        lines.append(",".join([f"h{i}", energy] + ["1"] * (len(names) - 2)))
+    path = tmp_path / "survey.csv"
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_scores_csv_into_parquet_parts(model_dir, survey_csv, tmp_path):
+    from backend.score import run
+
+    out = tmp_path / "scored"
+    stats = run(survey_csv, out, workers=1, chunk_rows=10, model_dir=str(model_dir))
+    assert stats["rows"] == 25
+    assert stats["invalid_rows"] == 2
+    assert stats["rows_per_second"] > 0 and stats["peak_rss_mb"] > 0
+
+    parts = sorted(out.glob("part-*.parquet"))
+    assert [p.name for p in parts] == ["part-00000.parquet", "part-00001.parquet", "part-00002.parquet"]
+    table = pq.read_table(out).to_pandas().sort_values("household_id", key=lambda s: s.str[1:].astype(int))
+    assert len(table) == 25
+    assert table.iloc[0]["prediction"] == 200.0
+    assert set(table["model_key"]) == {"local_xgboost"}
+    assert table["model_version"].iloc[0].startswith("xgboost_nutrition_model_20251103.pkl@")
+
+
+def test_resume_skips_finished_parts(model_dir, survey_csv, tmp_path):
+    from backend.score import run
+
+    out = tmp_path / "scored"
+    run(survey_csv, out, workers=1, chunk_rows=10, model_dir=str(model_dir))
+    # Simulate an interruption after the first part was written
+    (out / "part-00001.parquet").unlink()
+    (out / "part-00002.parquet").unlink()
+
+    stats = run(survey_csv, out, workers=1, chunk_rows=10, model_dir=str(model_dir))
+    assert stats["rows"] == 15
+    assert stats["skipped_rows"] == 10
+    assert pq.read_table(out).num_rows == 25
+
+    with pytest.raises(SystemExit):
+        run(survey_csv, out, workers=1, chunk_rows=5, model_dir=str(model_dir))
+
+
+def test_missing_feature_column_stops_before_writing(model_dir, tmp_path):
+    from backend.score import main
+
+    names = [name for name in FEATURES if name != "Magnesium_mg_per_serving"]
+    path = tmp_path / "partial.csv"
+    path.write_text(",".join(names) + "\n" + ",".join(["1"] * len(names)) + "\n")
+
+    out = tmp_path / "scored"
+    with pytest.raises(SystemExit, match="Magnesium_mg_per_serving"):
+        main([str(path), str(out), "--workers", "1", "--model-dir", str(model_dir)])
+    assert not out.exists()
+
+
+def test_cli_leaves_invalid_rows_unscored(model_dir, survey_csv, tmp_path, capsys):
+    from backend.score import main
+
+    out = tmp_path / "scored"
+    assert main([str(survey_csv), str(out), "--workers", "1", "--chunk-rows", "10", "--model-dir", str(model_dir)]) == 0
+    assert "2 invalid" in capsys.readouterr().err
+
+    table = pq.read_table(out).to_pandas().set_index("household_id")
+    # Nulls and out-of-range values never reach the model
+    assert table.loc[["h7", "h12"], "prediction"].isna().all()
+    assert table.loc["h7", "error"] == "Energy_kcal_per_serving: Input should be greater than or equal to 0"
+    assert table.loc["h12", "error"] == "Energy_kcal_per_serving: Input should be less than or equal to 3000"
+    assert table["error"].notna().sum() == 2
+    assert table.loc["h13", "prediction"] == 226.0
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+
+def clustered_embeddings(n=4000, dim=32, clusters=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    emb = centers[rng.integers(0, clusters, n)] + 0.2 * rng.normal(size=(n, dim))
+    return emb / np.linalg.norm(emb, axis=1, keepdims=True)
+
+
+def test_exact_index_matches_brute_force():
+    from backend.api.models.vector_index import build_index
+
+    emb = clustered_embeddings(n=500)
+    index = build_index(emb, backend='exact')
+    idx, scores, latency = index.search(emb[:3], 5)
+
+    expected = np.argsort(-(emb[:3] @ emb.T), axis=1)[:, :5]
+    assert np.array_equal(idx, expected)
+    assert latency >= 0
+    assert index.estimated_recall == 1.0
+
+
+def test_ivf_index_recall_and_params():
+    from backend.api.models.vector_index import build_index, recall_at_k
+
+    emb = clustered_embeddings()
+    index = build_index(emb, backend='ivf', n_lists=32, n_probe=4)
+    assert index.info()['n_lists'] == 32
+    assert index.info()['n_probe'] == 4
+    assert index.estimated_recall > 0.8
+
+    queries = emb[::200]
+    approx, _, _ = index.search(queries, 10)
+    exact, _, _ = build_index(emb, backend='exact').search(queries, 10)
+    assert recall_at_k(approx, exact) > 0.8
+
+    with pytest.raises(ValueError):
+        build_index(emb, backend='annoy')
+
+
+def test_recommend_reports_index_stats(monkeypatch, tmp_path):
+    import backend.api.models.loader as loader_mod
+    from backend.api.models.vector_index import build_index
+    monkeypatch.setattr(loader_mod, "HF_AVAILABLE", False)
+
+    loader = loader_mod.ModelLoader(local_model_dir=tmp_path)
+    emb = clustered_embeddings(n=1000)
+    loader.models['ensemble'] = {
+        'embeddings': emb,
+        'index': build_index(emb, backend='ivf', n_lists=16, n_probe=2),
+        'ids': [f"food_{i}" for i in range(len(emb))],
+        'metadata': {},
+        'available': True
+    }
+
+    res = loader.recommend_foods(query_vector=emb[7], top_k=5, measure_recall=True)
+    assert res['success'] is True
+    assert res['items'][0]['id'] == 'food_7'
+    assert res['index']['backend'] == 'ivf'
+    assert res['index']['recall_measured'] is True
+    assert 0.0 <= res['index']['recall'] <= 1.0
+    assert res['index']['latency_ms'] >= 0
+
+
+def test_exclude_and_partial_selection():
+    from backend.api.models.vector_index import build_index, top_k_rows
+
+    sims = np.array([[0.1, 0.9, 0.5, 0.7], [0.3, 0.2, 0.8, 0.1]])
+    assert top_k_rows(sims, 2).tolist() == [[1, 3], [2, 0]]
+    assert top_k_rows(sims, 4).tolist() == [[1, 3, 2, 0], [2, 0, 1, 3]]
+
+    emb = clustered_embeddings(n=300)
+    index = build_index(emb, backend='exact')
+    idx, _, _ = index.search(emb[[5, 9]], 3, exclude=np.array([5, -1]))
+    assert 5 not in idx[0]
+    assert idx[1][0] == 9
+    assert idx.shape == (2, 3)
+
+
+def test_recommend_endpoints_use_the_executor_and_reject_ragged_vectors(client, loader):
+    from backend.api.routers import predict as predict_router
+    from backend.api.services import QueueFullError
+
+    emb = clustered_embeddings(n=50, dim=4)
+    loader.models['ensemble'] = {
+        'embeddings': emb,
+        'ids': [f"food_{i}" for i in range(len(emb))],
+        'metadata': {},
+        'available': True
+    }
+    vector = ",".join(str(x) for x in emb[3])
+    r = client.get('/predict/recommend', params={'vector': vector, 'top_k': 1})
+    assert r.json()['items'][0]['id'] == 'food_3'
+
+    r = client.post('/predict/recommend/batch', json={'vectors': [[1, 0, 0, 0], [0, 1, 0]]})
+    assert r.status_code == 422
+    assert 'same length' in r.json()['detail'][0]['msg']
+    assert client.post('/predict/recommend/batch', json={'vectors': [[]]}).status_code == 422
+
+    class FullExecutor:
+        async def run(self, fn, *args, **kwargs):
+            raise QueueFullError("Inference queue full")
+
+    predict_router.set_inference_executor(FullExecutor())
+    try:
+        assert client.get('/predict/recommend', params={'vector': vector}).status_code == 503
+    finally:
+        predict_router.set_inference_executor(None)
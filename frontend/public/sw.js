@@ -85,7 +85,8 @@ self.addEventListener('fetch', (event) => {
   }
 
   // Handle API requests (network first, fallback to cache)
-  if (url.pathname.startsWith('/api/') || url.pathname.startsWith('/predict/') || url.pathname.startsWith('/health/')) {
+  // /foods/ responses carry ETags, so the network fetch revalidates with a cheap 304
+  if (url.pathname.startsWith('/api/') || url.pathname.startsWith('/predict/') || url.pathname.startsWith('/health/') || url.pathname.startsWith('/foods/')) {
     event.respondWith(
       fetch(request)
         .then((response) => {
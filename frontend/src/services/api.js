@@ -12,10 +12,13 @@ const api = axios.create({
 // Request interceptor
 api.interceptors.request.use(
   (config) => {
-    // Add timestamp to prevent caching
-    config.params = {
-      ...config.params,
-      _t: Date.now()
+    // Add timestamp to prevent caching, unless the endpoint supports
+    // ETag revalidation (the URL must stay stable for If-None-Match)
+    if (!config.revalidate) {
+      config.params = {
+        ...config.params,
+        _t: Date.now()
+      }
     }
     return config
   },
@@ -100,7 +103,7 @@ export const apiService = {
 
   // Foods dataset (served by backend)
   async getLocalFoods(params = {}) {
-    const response = await api.get('/foods/local', { params })
+    const response = await api.get('/foods/local', { params, revalidate: true })
     return response.data
   },
 